@@ -1,9 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlmodel import Session, select
 from app.models.category import Category
 from app.models.user import User, RoleEnum
 from app.db.session import get_session
 from app.api.deps import get_current_user
+from app.api.pagination import PageParams, page_params, paginate
+from app.models.job import InferenceJob
+from app.services import metrics
+from app.services.counters import reconcile_counters
+from app.services.runtime_profiles import PROFILES, get_profile, profile_benchmarks
+from app.services.warmup import warmup_models
+import json
 
 router = APIRouter()
 
@@ -19,8 +26,13 @@ def create_category(category: Category, session: Session = Depends(get_session),
     return category
 
 @router.get("/users")
-def list_users(session: Session = Depends(get_session), _=Depends(require_admin)):
-    return session.exec(select(User)).all()
+def list_users(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    session: Session = Depends(get_session),
+    _=Depends(require_admin),
+):
+    return paginate(session, select(User), User, page, response, filtered=False)
 
 @router.put("/users/{user_id}/role")
 def update_user_role(user_id: int, new_role: RoleEnum, session: Session = Depends(get_session), _=Depends(require_admin)):
@@ -42,4 +54,52 @@ def delete_category(category_id: int, session: Session = Depends(get_session), _
         raise HTTPException(status_code=404, detail="Kategori bulunamadı.")
     session.delete(category)
     session.commit()
-    return {"message": "Kategori silindi."}
\ No newline at end of file
+    return {"message": "Kategori silindi."}
+
+@router.post("/warmup")
+def warmup(_=Depends(require_admin)):
+    return warmup_models()
+
+@router.get("/metrics")
+def inference_metrics(session: Session = Depends(get_session), _=Depends(require_admin)):
+    """
+    API sürecindeki aşama süreleri, son işlerin aşama dökümü, etkin çalışma zamanı profili
+    ve profil kıyaslama sonuçları (benchmarks/bench_inference.py --profiles).
+    """
+    from app.services import clip_labeler
+    from app.services.label_cache import text_feature_cache
+    from app.services.result_cache import result_cache
+
+    jobs = session.exec(
+        select(InferenceJob).where(InferenceJob.stage_timings.is_not(None)).order_by(InferenceJob.id.desc()).limit(10)
+    ).all()
+    return {
+        "profile": get_profile()._asdict(),
+        "profiles": {name: profile._asdict() for name, profile in PROFILES.items()},
+        "spans": metrics.registry.snapshot(),
+        "broker": clip_labeler._broker.stats() if clip_labeler._broker is not None else None,
+        "caches": {"text_features": text_feature_cache.stats(), "results": result_cache.stats()},
+        "recent_jobs": [
+            {"job_id": job.id, "kind": job.kind, "status": job.status, "done": job.done,
+             "stage_timings": json.loads(job.stage_timings)}
+            for job in jobs
+        ],
+        "profile_benchmarks": profile_benchmarks(),
+    }
+
+@router.post("/metrics/reset")
+def reset_metrics(_=Depends(require_admin)):
+    metrics.registry.reset()
+    return {"message": "Metrikler sıfırlandı."}
+
+
+@router.get("/counters")
+def counter_drift(session: Session = Depends(get_session), _=Depends(require_admin)):
+    """Sayaç sütunlarının kaynak tablolardan sapmasını raporlar (değiştirmez)."""
+    return reconcile_counters(session, fix=False)
+
+
+@router.post("/counters/reconcile")
+def reconcile_counter_columns(session: Session = Depends(get_session), _=Depends(require_admin)):
+    """Sapan sayaçları kaynak tablolardan yeniden hesaplar; düzeltilmeden önceki sapmayı döndürür."""
+    return reconcile_counters(session, fix=True)
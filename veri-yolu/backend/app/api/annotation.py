@@ -5,19 +5,21 @@ from app.models.image import Image
 from app.models.topic import Topic
 from app.db.session import get_session
 from typing import List, Optional
-from app.services.clip_labeler import suggest_clip_label, is_image_relevant
+from pydantic import BaseModel, Field
+from app.services.clip_labeler import relevance_from_features, suggest_labels_for_boxes, top_k_labels
+from app.services.counters import increment
+from app.services.embedding_store import get_or_compute_features
 from app.api.deps import get_current_user
 from app.models.user import User, RoleEnum
 import os
-from app.services.yolo_labeler import run_yolov8_onnx, map_yolo_to_candidates
 import json
 from fastapi.responses import FileResponse
 import csv
-from PIL import Image as PILImage
+from app.models.job import InferenceJob, InferenceJobResult
+from app.services.jobs import submit_job, request_cancel, job_progress
+from app.services.auto_annotate import export_path
 
 UPLOAD_DIR = "uploaded_images"
-TMP_DIR = os.path.join(os.path.dirname(__file__), "../services/tmp")
-os.makedirs(TMP_DIR, exist_ok=True)
 
 router = APIRouter()
 
@@ -35,6 +37,7 @@ def create_annotation(
     annotation = Annotation(**data)
     annotation.image_id = image_id
     session.add(annotation)
+    increment(session, Image, image_id, "annotation_count")
     session.commit()
     session.refresh(annotation)
     return annotation
@@ -82,16 +85,42 @@ def delete_annotation(annotation_id: int, session: Session = Depends(get_session
     if not annotation:
         raise HTTPException(status_code=404, detail="Etiket bulunamadı.")
     session.delete(annotation)
+    increment(session, Image, annotation.image_id, "annotation_count", -1)
     session.commit()
     return {"detail": "Silindi"}
 
 
+class BoxIn(BaseModel):
+    # Annotation ile aynı biçim: sol üst köşe ve boyutlar, görsel pikseli cinsinden
+    x: float
+    y: float
+    width: float = Field(gt=0)
+    height: float = Field(gt=0)
+
+
+class SuggestLabelRequest(BaseModel):
+    box: Optional[BoxIn] = None
+    boxes: Optional[List[BoxIn]] = None
+    top_k: int = Field(3, ge=1, le=20)
+
+
+MAX_SUGGEST_BOXES = 64
+
+
+def _ranked(labels: List[tuple]) -> List[dict]:
+    return [{"label": label, "score": score} for label, score in labels]
+
+
 @router.post("/image/{image_id}/suggest_label")
 def suggest_label_endpoint(
     image_id: int,
-    box: Optional[dict] = Body(None),
+    data: SuggestLabelRequest = Body(SuggestLabelRequest()),
     session: Session = Depends(get_session)
 ):
+    """
+    Kutu verilmezse tüm görsel için etiket önerir. `box` ya da `boxes` verilirse
+    her kutu bölgesi tek çözümden kırpılır ve tek CLIP batch'inde puanlanır.
+    """
     image = session.get(Image, image_id)
     if not image:
         raise HTTPException(status_code=404, detail="Görsel bulunamadı.")
@@ -101,12 +130,34 @@ def suggest_label_endpoint(
         raise HTTPException(status_code=404, detail="İlgili konu bulunamadı.")
 
     path = os.path.join(UPLOAD_DIR, image.filename)
-    if box:
-        # Gelecekte bbox kırpma desteklenebilir
-        raise HTTPException(status_code=501, detail="Kutu destekli etiketleme henüz desteklenmiyor.")
+    candidate_labels = topic.get_candidate_labels()
+    boxes = data.boxes if data.boxes is not None else ([data.box] if data.box else [])
+    if len(boxes) > MAX_SUGGEST_BOXES:
+        raise HTTPException(status_code=400, detail=f"En fazla {MAX_SUGGEST_BOXES} kutu gönderilebilir.")
+
+    if boxes:
+        ranked = suggest_labels_for_boxes(
+            path, [[b.x, b.y, b.x + b.width, b.y + b.height] for b in boxes], candidate_labels, data.top_k
+        )
+        results = [
+            {
+                "box": box.dict(),
+                "label": labels[0][0] if labels else "",
+                "score": labels[0][1] if labels else 0.0,
+                "labels": _ranked(labels),
+            }
+            for box, labels in zip(boxes, ranked)
+        ]
+        if data.boxes is None:
+            return results[0]
+        return {"results": results}
 
-    label, score = suggest_clip_label(path, topic.get_candidate_labels())
-    return {"label": label, "score": score}
+    if not candidate_labels:
+        return {"label": "", "score": 0.0, "labels": []}
+    features = get_or_compute_features(session, [image.id], [path])
+    labels = top_k_labels(features, candidate_labels, data.top_k)[0]
+    label, score = labels[0]
+    return {"label": label, "score": score, "labels": _ranked(labels)}
 
 
 @router.post("/image/{image_id}/check_relevance")
@@ -123,11 +174,50 @@ def check_relevance_endpoint(
         raise HTTPException(status_code=404, detail="İlgili konu bulunamadı.")
 
     path = os.path.join(UPLOAD_DIR, image.filename)
-    result = is_image_relevant(path, topic.get_candidate_labels())
+    features = get_or_compute_features(session, [image.id], [path])
+    result = relevance_from_features(features, topic.get_candidate_labels())[0]
     return {"relevant": result}
 
 
-@router.post("/topic/{topic_id}/auto_annotate")
+@router.post("/topic/{topic_id}/rescore")
+def rescore_topic(
+    topic_id: int,
+    session: Session = Depends(get_session),
+    user: User = Depends(get_current_user)
+):
+    """
+    Aday etiketler değiştikten sonra konunun görsellerini saklanan gömülerle yeniden puanlar.
+    Gömüsü olmayan görseller bir kez kodlanıp saklanır; onay durumu ve puanlar değişmez.
+    """
+    topic = session.get(Topic, topic_id)
+    if not topic:
+        raise HTTPException(status_code=404, detail="Konu bulunamadı.")
+    if topic.owner_id != user.id and user.role != RoleEnum.admin:
+        raise HTTPException(status_code=403, detail="Bu konuyu yeniden puanlayamazsınız.")
+
+    images = session.exec(select(Image).where(Image.topic_id == topic_id).order_by(Image.id)).all()
+    features = get_or_compute_features(
+        session,
+        [img.id for img in images],
+        [os.path.join(UPLOAD_DIR, img.filename) for img in images],
+    )
+    scores = relevance_from_features(features, topic.get_candidate_labels())
+    for img, (is_relevant, ai_score, auto_label) in zip(images, scores):
+        img.is_relevant = is_relevant
+        img.ai_score = ai_score
+        img.auto_label = auto_label
+        session.add(img)
+    session.commit()
+    return {
+        "rescored": len(images),
+        "results": [
+            {"image_id": img.id, "is_relevant": img.is_relevant, "ai_score": img.ai_score, "auto_label": img.auto_label}
+            for img in images
+        ],
+    }
+
+
+@router.post("/topic/{topic_id}/auto_annotate", status_code=202)
 def auto_annotate_topic(
     topic_id: int,
     session: Session = Depends(get_session),
@@ -136,48 +226,65 @@ def auto_annotate_topic(
     topic = session.get(Topic, topic_id)
     if not topic:
         raise HTTPException(status_code=404, detail="Konu bulunamadı.")
-    candidate_labels = topic.get_candidate_labels()
-    images = session.exec(select(Image).where(Image.topic_id == topic_id)).all()
-    if not images:
+    has_images = session.exec(select(Image.id).where(Image.topic_id == topic_id)).first()
+    if not has_images:
         raise HTTPException(status_code=404, detail="Bu konuda görsel yok.")
 
-    results = []
-    for image in images:
-        image_path = os.path.join(UPLOAD_DIR, image.filename)
-        yolo_boxes = run_yolov8_onnx(image_path)
-        image_annots = []
-        for box in yolo_boxes:
-            # Crop bbox region for CLIP
-            x1, y1, x2, y2 = map(int, box["bbox"])
-            with PILImage.open(image_path) as im:
-                crop = im.crop((x1, y1, x2, y2))
-                crop_path = os.path.join(TMP_DIR, f"clip_crop_{image.id}_{x1}_{y1}_{x2}_{y2}.jpg")
-                crop.save(crop_path)
-            # Use CLIP to map to candidate labels
-            from app.services.clip_labeler import suggest_clip_label
-            label, score = suggest_clip_label(crop_path, candidate_labels)
-            if not label or score < 0.3:
-                # fallback to YOLO class mapping
-                label = map_yolo_to_candidates(box["class_name"], candidate_labels)
-            image_annots.append({
-                "bbox": box["bbox"],
-                "label": label,
-                "score": float(box["score"]),
-                "source": "auto"
-            })
-        results.append({
-            "image_id": image.filename,
-            "annotations": image_annots
-        })
-    # Save to JSON for export
-    out_path = f"auto_annotations_topic_{topic_id}.json"
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump({
-            "topic": topic.title,
-            "candidate_labels": candidate_labels,
-            "images": results
-        }, f, ensure_ascii=False, indent=2)
-    return {"results": results, "json_file": out_path}
+    # YOLO+CLIP işi arka planda çalışır; istemci ilerlemeyi /jobs/{job_id} üzerinden izler
+    job = submit_job(session, "auto_annotate", user_id=user.id, topic_id=topic_id)
+    return job_progress(job)
+
+
+def _get_job(session: Session, job_id: int, user: User) -> InferenceJob:
+    job = session.get(InferenceJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="İş bulunamadı.")
+    if job.user_id != user.id and user.role != RoleEnum.admin:
+        raise HTTPException(status_code=403, detail="Bu işe erişim yetkiniz yok.")
+    return job
+
+
+@router.get("/jobs/{job_id}")
+def get_job_status(
+    job_id: int,
+    session: Session = Depends(get_session),
+    user: User = Depends(get_current_user)
+):
+    return job_progress(_get_job(session, job_id, user))
+
+
+@router.get("/jobs/{job_id}/results")
+def get_job_results(
+    job_id: int,
+    after: int = Query(0, description="Son alınan sonucun imleci"),
+    limit: int = Query(100, ge=1, le=1000),
+    session: Session = Depends(get_session),
+    user: User = Depends(get_current_user)
+):
+    job = _get_job(session, job_id, user)
+    rows = session.exec(
+        select(InferenceJobResult)
+        .where((InferenceJobResult.job_id == job_id) & (InferenceJobResult.id > after))
+        .order_by(InferenceJobResult.id)
+        .limit(limit)
+    ).all()
+    return {
+        "status": job.status,
+        "done": job.done,
+        "total": job.total,
+        "results": [json.loads(r.payload) for r in rows],
+        "next_after": rows[-1].id if rows else after,
+    }
+
+
+@router.post("/jobs/{job_id}/cancel")
+def cancel_job(
+    job_id: int,
+    session: Session = Depends(get_session),
+    user: User = Depends(get_current_user)
+):
+    job = request_cancel(session, _get_job(session, job_id, user))
+    return job_progress(job)
 
 
 @router.get("/topic/{topic_id}/export_annotations")
@@ -185,7 +292,7 @@ def export_annotations_topic(
     topic_id: int,
     format: str = Query("json", description="Export format: json or csv")
 ):
-    out_path = f"auto_annotations_topic_{topic_id}.json"
+    out_path = export_path(topic_id)
     if not os.path.exists(out_path):
         raise HTTPException(status_code=404, detail="Annotation JSON bulunamadı. Önce otomatik etiketleme yapın.")
     if format == "csv":
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from pydantic import BaseModel, EmailStr, constr
 from sqlmodel import Session, select
 from app.db.session import get_session
 from app.models.contact_message import ContactMessage
 from typing import List
 from app.api.admin import require_admin
+from app.api.pagination import PageParams, page_params, paginate
 
 
 router = APIRouter()
@@ -35,8 +36,11 @@ def create_contact_message(data: ContactMessageCreate, session: Session = Depend
 
 @router.get("/", response_model=List[ContactMessage])
 def list_contact_messages(
-    session: Session = Depends(get_session), _=Depends(require_admin)
+    response: Response,
+    page: PageParams = Depends(page_params),
+    session: Session = Depends(get_session),
+    _=Depends(require_admin),
 ):
-    return session.exec(select(ContactMessage)).all()
+    return paginate(session, select(ContactMessage), ContactMessage, page, response, filtered=False)
 
 
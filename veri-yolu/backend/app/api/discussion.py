@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from pydantic import BaseModel, constr, Field
+from collections import Counter
 from typing import List, Optional
 from sqlmodel import Session, select
-from sqlalchemy import func
+from sqlalchemy import and_, delete, literal, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from datetime import datetime
 
 from app.db.session import get_session
 from app.api.deps import get_current_user
@@ -17,6 +20,9 @@ from app.models.discussion import (
 from app.core.security import SECRET_KEY, ALGORITHM
 from jose import jwt, JWTError
 from app.models.topic import Topic
+from app.api.pagination import PageParams, page_params, paginate
+from app.services.counters import increment
+from app.services.forum_overview import forum_overview, invalidate_forum_overview
 
 
 router = APIRouter()
@@ -43,30 +49,17 @@ class ForumOut(BaseModel):
     id: int
     name: str
     description: Optional[str] = None
+    topic_id: Optional[int] = None
+    thread_count: int = 0
+    post_count: int = 0
+    last_activity: Optional[str] = None
     participant_avatars: List[str] = Field(default_factory=list)
 
 
 @router.get("/forums", response_model=List[ForumOut])
 def list_forums(session: Session = Depends(get_session)):
-    forums = session.exec(select(Forum)).all()
-    results: List[ForumOut] = []
-    for f in forums:
-        threads = session.exec(select(DiscussionThread).where(DiscussionThread.forum_id == f.id)).all()
-        user_ids = {t.author_id for t in threads}
-        avatars = []
-        for uid in list(user_ids)[:3]:
-            u = session.get(User, uid)
-            if getattr(u, "profile_image", None):
-                avatars.append(f"/uploaded_images/{u.profile_image}")
-        results.append(
-            ForumOut(
-                id=f.id,
-                name=f.name,
-                description=f.description,
-                participant_avatars=avatars
-            )
-        )
-    return results
+    # Tek pencere fonksiyonlu sorgu; yazma uçlarında ve TTL sonunda yenilenir
+    return [ForumOut(**item) for item in forum_overview(session)]
 
 
 @router.post("/forums", response_model=Forum)
@@ -75,34 +68,46 @@ def create_forum(data: ForumCreate, session: Session = Depends(get_session), use
     session.add(forum)
     session.commit()
     session.refresh(forum)
+    invalidate_forum_overview()
     return forum
 
 
 @router.get("/topic/{topic_id}/threads", response_model=List[ThreadOut])
-def list_topic_threads(topic_id: int, session: Session = Depends(get_session)):
+def list_topic_threads(
+    topic_id: int,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    session: Session = Depends(get_session),
+):
     topic = session.get(Topic, topic_id)
     if not topic:
         raise HTTPException(status_code=404, detail="Konu bulunamadı.")
-    threads = session.exec(select(DiscussionThread).where(DiscussionThread.topic_id == topic_id)).all()
-    results: List[ThreadOut] = []
-    for thr in threads:
-        author = session.get(User, thr.author_id)
-        avatar = None
-        if getattr(author, "profile_image", None):
-            avatar = f"/uploaded_images/{author.profile_image}"
-        results.append(
-            ThreadOut(
-                id=thr.id,
-                forum_id=thr.forum_id,
-                topic_id=thr.topic_id,
-                title=thr.title,
-                author_id=thr.author_id,
-                author_email=getattr(author, "email", None),
-                author_avatar_url=avatar,
-                created_at=thr.created_at.isoformat(),
-            )
+    query = _threads_query().where(DiscussionThread.topic_id == topic_id)
+    return _thread_outs(paginate(session, query, DiscussionThread, page, response))
+
+
+def _threads_query():
+    # Yazar bilgisi başlıklarla aynı sorguda gelir
+    return (
+        select(DiscussionThread, User.email, User.profile_image)
+        .outerjoin(User, User.id == DiscussionThread.author_id)
+    )
+
+
+def _thread_outs(rows) -> List[ThreadOut]:
+    return [
+        ThreadOut(
+            id=thr.id,
+            forum_id=thr.forum_id,
+            topic_id=thr.topic_id,
+            title=thr.title,
+            author_id=thr.author_id,
+            author_email=email,
+            author_avatar_url=f"/uploaded_images/{profile_image}" if profile_image else None,
+            created_at=thr.created_at.isoformat(),
         )
-    return results
+        for thr, email, profile_image in rows
+    ]
 
 
 @router.get("/forums/{forum_id}", response_model=Forum)
@@ -123,35 +128,14 @@ class UserStatsOut(BaseModel):
 
 @router.get("/stats/me", response_model=UserStatsOut)
 def get_my_stats(session: Session = Depends(get_session), user: User = Depends(get_current_user)):
-    posts_count = session.exec(
-        select(func.count(DiscussionPost.id)).where(DiscussionPost.author_id == user.id)
-    ).one()
-    if isinstance(posts_count, tuple):
-        posts_count = posts_count[0]
-
-    threads_count = session.exec(
-        select(func.count(DiscussionThread.id)).where(DiscussionThread.author_id == user.id)
-    ).one()
-    if isinstance(threads_count, tuple):
-        threads_count = threads_count[0]
-
-    return UserStatsOut(discussions=posts_count, threads=threads_count)
+    return get_user_stats(user.id, session)
 
 
 @router.get("/stats/{user_id}", response_model=UserStatsOut)
 def get_user_stats(user_id: int, session: Session = Depends(get_session)):
-    posts_count = session.exec(
-        select(func.count(DiscussionPost.id)).where(DiscussionPost.author_id == user_id)
-    ).one()
-    if isinstance(posts_count, tuple):
-        posts_count = posts_count[0]
-
-    threads_count = session.exec(
-        select(func.count(DiscussionThread.id)).where(DiscussionThread.author_id == user_id)
-    ).one()
-    if isinstance(threads_count, tuple):
-        threads_count = threads_count[0]
-
+    # Sayaç sütunlarından okunur (services.counters)
+    row = session.exec(select(User.post_count, User.thread_count).where(User.id == user_id)).first()
+    posts_count, threads_count = row if row else (0, 0)
     return UserStatsOut(discussions=posts_count, threads=threads_count)
 
 
@@ -164,41 +148,30 @@ class ThreadCreate(BaseModel):
 
 
 @router.get("/forums/{forum_id}/threads", response_model=List[ThreadOut])
-def list_threads(forum_id: int, q: Optional[str] = Query(None), session: Session = Depends(get_session)):
-    query = select(DiscussionThread).where(DiscussionThread.forum_id == forum_id)
+def list_threads(
+    forum_id: int,
+    response: Response,
+    q: Optional[str] = Query(None),
+    page: PageParams = Depends(page_params),
+    session: Session = Depends(get_session),
+):
+    query = _threads_query().where(DiscussionThread.forum_id == forum_id)
     if q:
         like = f"%{q.lower()}%"
         query = query.where(DiscussionThread.title.ilike(like))
-    threads = session.exec(query).all()
-    results: List[ThreadOut] = []
-    for thr in threads:
-        author = session.get(User, thr.author_id)
-        avatar = None
-        if getattr(author, "profile_image", None):
-            avatar = f"/uploaded_images/{author.profile_image}"
-        results.append(
-            ThreadOut(
-                id=thr.id,
-                forum_id=thr.forum_id,
-                title=thr.title,
-                topic_id=thr.topic_id,
-                author_id=thr.author_id,
-                author_email=getattr(author, "email", None),
-                author_avatar_url=avatar,
-                created_at=thr.created_at.isoformat(),
-            )
-        )
-    return results
+    return _thread_outs(paginate(session, query, DiscussionThread, page, response))
 
 
 @router.get("/threads", response_model=List[ThreadOut])
 def list_threads_general(
+    response: Response,
     author_id: Optional[int] = Query(None),
     forum_id: Optional[int] = Query(None),
     q: Optional[str] = Query(None),
+    page: PageParams = Depends(page_params),
     session: Session = Depends(get_session),
 ):
-    query = select(DiscussionThread)
+    query = _threads_query()
     if author_id is not None:
         query = query.where(DiscussionThread.author_id == author_id)
     if forum_id is not None:
@@ -206,28 +179,8 @@ def list_threads_general(
     if q:
         like = f"%{q.lower()}%"
         query = query.where(DiscussionThread.title.ilike(like))
-    query = query.order_by(DiscussionThread.created_at.desc())
-
-    threads = session.exec(query).all()
-    results: List[ThreadOut] = []
-    for thr in threads:
-        author = session.get(User, thr.author_id)
-        avatar = None
-        if getattr(author, "profile_image", None):
-            avatar = f"/uploaded_images/{author.profile_image}"
-        results.append(
-            ThreadOut(
-                id=thr.id,
-                forum_id=thr.forum_id,
-                topic_id=thr.topic_id,
-                title=thr.title,
-                author_id=thr.author_id,
-                author_email=getattr(author, "email", None),
-                author_avatar_url=avatar,
-                created_at=thr.created_at.isoformat(),
-            )
-        )
-    return results
+    filtered = author_id is not None or forum_id is not None or bool(q)
+    return _thread_outs(paginate(session, query, DiscussionThread, page, response, filtered=filtered))
 
 
 @router.post("/threads", response_model=DiscussionThread)
@@ -242,41 +195,26 @@ def create_thread(data: ThreadCreate, session: Session = Depends(get_session), u
         author_id=user.id,
     )
     session.add(thread)
-    session.commit()
-    session.refresh(thread)
+    session.flush()
     post = DiscussionPost(thread_id=thread.id, author_id=user.id, content=data.content)
     session.add(post)
+    increment(session, User, user.id, "thread_count")
+    increment(session, User, user.id, "post_count")
     session.commit()
+    session.refresh(thread)
+    invalidate_forum_overview()
     return thread
 
 
 @router.get("/threads/me", response_model=List[ThreadOut])
-def list_my_threads(session: Session = Depends(get_session), user: User = Depends(get_current_user)):
-    query = (
-        select(DiscussionThread)
-        .where(DiscussionThread.author_id == user.id)
-        .order_by(DiscussionThread.created_at.desc())
-    )
-    threads = session.exec(query).all()
-    results: List[ThreadOut] = []
-    for thr in threads:
-        author = session.get(User, thr.author_id)
-        avatar = None
-        if getattr(author, "profile_image", None):
-            avatar = f"/uploaded_images/{author.profile_image}"
-        results.append(
-            ThreadOut(
-                id=thr.id,
-                forum_id=thr.forum_id,
-                topic_id=thr.topic_id,
-                title=thr.title,
-                author_id=thr.author_id,
-                author_email=getattr(author, "email", None),
-                author_avatar_url=avatar,
-                created_at=thr.created_at.isoformat(),
-            )
-        )
-    return results
+def list_my_threads(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    session: Session = Depends(get_session),
+    user: User = Depends(get_current_user),
+):
+    query = _threads_query().where(DiscussionThread.author_id == user.id)
+    return _thread_outs(paginate(session, query, DiscussionThread, page, response))
 
 
 # Post endpoints
@@ -300,8 +238,13 @@ class PostOut(BaseModel):
 
 
 @router.get("/threads/{thread_id}/posts", response_model=List[PostOut])
-def list_posts(thread_id: int, request: Request, session: Session = Depends(get_session)):
-    posts = session.exec(select(DiscussionPost).where(DiscussionPost.thread_id == thread_id)).all()
+def list_posts(
+    thread_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    session: Session = Depends(get_session),
+):
     current_user_id: Optional[int] = None
     auth_header = request.headers.get("Authorization")
     if auth_header and auth_header.lower().startswith("bearer "):
@@ -312,32 +255,38 @@ def list_posts(thread_id: int, request: Request, session: Session = Depends(get_
         except JWTError:
             current_user_id = None
 
-    results: List[PostOut] = []
-    for p in posts:
-        author = session.get(User, p.author_id)
-        avatar = None
-        if getattr(author, "profile_image", None):
-            avatar = f"/uploaded_images/{author.profile_image}"
-        votes = session.exec(select(DiscussionPostVote).where(DiscussionPostVote.post_id == p.id)).all()
-        score = sum(v.value for v in votes)
-        user_liked = (
-            current_user_id is not None and any(v.user_id == current_user_id and v.value == 1 for v in votes)
+    # Skor sayaç sütunundan gelir; kullanıcının beğenisi için yalnızca kendi oyu (benzersiz
+    # (post_id, user_id) indeksiyle en fazla bir satır) birleştirilir
+    if current_user_id is not None:
+        liked = DiscussionPostVote.value == 1
+        query = select(DiscussionPost, User.email, User.profile_image, liked).outerjoin(
+            DiscussionPostVote,
+            and_(DiscussionPostVote.post_id == DiscussionPost.id, DiscussionPostVote.user_id == current_user_id),
         )
-        results.append(
-            PostOut(
-                id=p.id,
-                thread_id=p.thread_id,
-                author_id=p.author_id,
-                author_email=getattr(author, "email", None),
-                author_avatar_url=avatar,
-                content=p.content,
-                created_at=p.created_at.isoformat(),
-                score=score,
-                user_liked=user_liked,
-                parent_id=p.parent_id,
-            )
+    else:
+        query = select(DiscussionPost, User.email, User.profile_image, literal(False))
+    query = (
+        query.outerjoin(User, User.id == DiscussionPost.author_id)
+        .where(DiscussionPost.thread_id == thread_id)
+    )
+    # Gönderiler kronolojik (eskiden yeniye) sayfalanır
+    rows = paginate(session, query, DiscussionPost, page, response, descending=False)
+
+    return [
+        PostOut(
+            id=p.id,
+            thread_id=p.thread_id,
+            author_id=p.author_id,
+            author_email=email,
+            author_avatar_url=f"/uploaded_images/{profile_image}" if profile_image else None,
+            content=p.content,
+            created_at=p.created_at.isoformat(),
+            score=p.score,
+            user_liked=bool(user_liked),
+            parent_id=p.parent_id,
         )
-    return results
+        for p, email, profile_image, user_liked in rows
+    ]
 
 
 @router.post("/posts", response_model=DiscussionPost)
@@ -357,8 +306,10 @@ def create_post(data: PostCreate, session: Session = Depends(get_session), user:
     
     post = DiscussionPost(thread_id=data.thread_id, author_id=user.id, content=data.content, parent_id=parent_id)
     session.add(post)
+    increment(session, User, user.id, "post_count")
     session.commit()
     session.refresh(post)
+    invalidate_forum_overview()
     return post
 
 
@@ -372,17 +323,26 @@ def vote_post(data: VoteRequest, session: Session = Depends(get_session), user:
     post = session.get(DiscussionPost, data.post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Gönderi bulunamadı.")
-    existing = session.exec(
-        select(DiscussionPostVote).where(
+    # Beğeni geri alma: tek DELETE; oy yoksa benzersiz (post_id, user_id) indeksine karşı
+    # çakışmada hiçbir şey yapmayan tek INSERT (eşzamanlı çift tıklamada kopya oluşmaz)
+    # Skor sayacı aynı transaction'da silinen/eklenen oy kadar güncellenir
+    removed = session.exec(
+        delete(DiscussionPostVote).where(
             (DiscussionPostVote.post_id == data.post_id)
             & (DiscussionPostVote.user_id == user.id)
-        )
-    ).first()
-    if existing:
-        session.delete(existing)
+        ).returning(DiscussionPostVote.value)
+    ).scalars().all()
+    if removed:
+        increment(session, DiscussionPost, data.post_id, "score", -sum(removed))
         session.commit()
         return {"detail": "Like kaldırıldı"}
-    session.add(DiscussionPostVote(post_id=data.post_id, user_id=user.id, value=1))
+    inserted = session.exec(
+        pg_insert(DiscussionPostVote)
+        .values(post_id=data.post_id, user_id=user.id, value=1, created_at=datetime.utcnow())
+        .on_conflict_do_nothing(index_elements=["post_id", "user_id"])
+    ).rowcount
+    if inserted:
+        increment(session, DiscussionPost, data.post_id, "score", 1)
     session.commit()
     return {"detail": "Like eklendi"}
 
@@ -417,13 +377,15 @@ def block_post(
     # Yeni kayıt ekle
     block = DiscussionPostBlock(post_id=data.post_id, user_id=user.id)
     session.add(block)
-    session.commit()
 
-    # Kaç kişi engellemiş?
-    count_row = session.exec(
-        select(func.count()).where(DiscussionPostBlock.post_id == data.post_id)
-    ).first()
-    count = count_row or 0   # ✅ düzeltme yapıldı
+    # Kaç kişi engellemiş? Sayaç artırılıp yeni değeri aynı UPDATE'ten okunur
+    count = session.exec(
+        update(DiscussionPost)
+        .where(DiscussionPost.id == data.post_id)
+        .values(block_count=DiscussionPost.block_count + 1)
+        .returning(DiscussionPost.block_count)
+    ).scalar_one()
+    session.commit()
 
     # 20+ ise gönderiyi ve ilişkilerini sil
     if count >= 20:
@@ -440,7 +402,9 @@ def block_post(
             session.delete(b)
 
         session.delete(post)
+        increment(session, User, post.author_id, "post_count", -1)
         session.commit()
+        invalidate_forum_overview()
         return {"detail": "Gönderi 20’den fazla engelleme aldığı için silindi."}
 
     return {"detail": "Gönderi engellendi."}
@@ -470,9 +434,13 @@ def delete_thread(thread_id: int, session: Session = Depends(get_session), user:
         # posts
         for p in posts:
             session.delete(p)
+        for author_id, n in Counter(p.author_id for p in posts).items():
+            increment(session, User, author_id, "post_count", -n)
 
     session.delete(thr)
+    increment(session, User, thr.author_id, "thread_count", -1)
     session.commit()
+    invalidate_forum_overview()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -501,5 +469,7 @@ def delete_post(post_id: int, session: Session = Depends(get_session), user: Use
 
     # son olarak post'u sil
     session.delete(p)
+    increment(session, User, p.author_id, "post_count", -1)
     session.commit()
+    invalidate_forum_overview()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,26 +1,109 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
-import shutil, os
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+import os, io, json, time, uuid
+from PIL import Image as PILImage
 from app.db.session import get_session
 from app.models.image import Image
 from app.models.topic import Topic
 from app.models.user import User, RoleEnum
-from app.services.clip_labeler import is_image_relevant
+from app.services.clip_labeler import encode_images, relevance_from_features
+from app.services.embedding_store import save_embeddings, delete_embeddings
 from app.api.deps import get_current_user
 from sqlmodel import Session, select
 from app.api.admin import require_admin
-from typing import List
-from app.models.annotation import Annotation
-from sqlalchemy import func
+from app.api.pagination import PageParams, page_params, paginate
+from typing import List, Optional
+from app.models.job import InferenceJob, InferenceJobResult
+from app.services.jobs import create_job, enqueue_job, job_progress, FINAL_STATUSES
+from app.db.session import engine
+from app.core.config import DEDUP_MAX_DISTANCE
+from app.services.dedup import BKTree, dhash, get_topic_index, to_signed64
+from app.services.quality import check_quality
+from sqlalchemy import update
 
 
 router = APIRouter()
 UPLOAD_DIR = "uploaded_images"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+def _unique_filename(filename: str) -> str:
+    # Aynı adla yüklenen dosyalar birbirinin üzerine yazılmasın
+    name = os.path.basename(filename or "") or "image"
+    if not os.path.exists(os.path.join(UPLOAD_DIR, name)):
+        return name
+    stem, ext = os.path.splitext(name)
+    return f"{stem}_{uuid.uuid4().hex[:8]}{ext}"
+
+
+def _save_uploads(session: Session, topic_id: int, files: List[UploadFile], duplicates: str):
+    """
+    Dosyaları diske yazar ve dHash ile konudaki (ve aynı yüklemedeki) yakın kopyaları
+    model çalıştırılmadan önce tespit eder. 'skip' modunda kopyalar kaydedilmez.
+    Kalite ön filtresinin sonucu da burada hesaplanır; filtreye takılanlar modele gönderilmez.
+    """
+    index = get_topic_index(topic_id)
+    batch_tree = BKTree()  # aynı istek içindeki kopyalar için
+    saved, skipped = [], []
+    for file in files:
+        print("Processing file:", file.filename)
+        data = file.file.read()
+        try:
+            image_hash = dhash(PILImage.open(io.BytesIO(data)))
+        except Exception:
+            image_hash = None
+
+        duplicate_of = None
+        duplicate_in_batch = None
+        if image_hash is not None:
+            duplicate_of = index.find(session, image_hash, DEDUP_MAX_DISTANCE)
+            if duplicate_of is None:
+                matches = batch_tree.search(image_hash, DEDUP_MAX_DISTANCE)
+                duplicate_in_batch = matches[0][1] if matches else None
+
+        if duplicates == "skip" and (duplicate_of is not None or duplicate_in_batch is not None):
+            skipped.append({
+                "filename": file.filename,
+                "status": "duplicate",
+                "duplicate_of": duplicate_of,
+                "duplicate_of_filename": saved[duplicate_in_batch]["filename"] if duplicate_in_batch is not None else None,
+            })
+            continue
+
+        stored_name = _unique_filename(file.filename)
+        file_path = os.path.join(UPLOAD_DIR, stored_name)
+        with open(file_path, "wb") as buffer:
+            buffer.write(data)
+        if image_hash is not None and duplicate_in_batch is None:
+            batch_tree.add(image_hash, len(saved))
+        saved.append({
+            "filename": stored_name,
+            "path": file_path,
+            "dhash": to_signed64(image_hash) if image_hash is not None else None,
+            "duplicate_of": duplicate_of,
+            "duplicate_in_batch": duplicate_in_batch,
+            "quality": check_quality(data),
+        })
+    return saved, skipped
+
+
+def _needs_scoring(item: dict) -> bool:
+    # Kopyalar ve kalite filtresine takılan görseller modele gönderilmez
+    return item["duplicate_of"] is None and item["duplicate_in_batch"] is None and item["quality"].ok
+
+
+def _resolve_batch_duplicates(saved: List[dict], images: List[Image]):
+    # Aynı yüklemedeki kopyalar, id'ler oluştuktan sonra asıl görsele bağlanır
+    for item, img in zip(saved, images):
+        if item["duplicate_in_batch"] is not None:
+            img.duplicate_of = images[item["duplicate_in_batch"]].id
+
+
 @router.post("/{topic_id}/upload")
 def upload_image(
     topic_id: int,
     files: List[UploadFile] = File(...),
+    mode: str = Query("sync", pattern="^(sync|async)$", description="async: dosyaları kaydet, puanlamayı arka planda yap"),
+    duplicates: str = Query("skip", pattern="^(skip|flag)$", description="Yakın kopyalar: skip = kaydetme, flag = işaretleyip kaydet"),
     session: Session = Depends(get_session),
     user: User = Depends(get_current_user)
 ):
@@ -30,99 +113,259 @@ def upload_image(
         print("Topic not found!")
         raise HTTPException(status_code=404, detail="Konu bulunamadı.")
 
-    results = []
-    uploader = session.get(User, user.id)
-    for file in files:
-        print("Processing file:", file.filename)
-        file_path = f"{UPLOAD_DIR}/{file.filename}"
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+    saved, skipped = _save_uploads(session, topic_id, files, duplicates)
+
+    if mode == "async":
+        return _enqueue_ingest(session, topic_id, user, saved, skipped)
 
+    # Kopyalar ve düşük kaliteli görseller modele gönderilmez; kalanlar tek metin özniteliği matrisine karşı batch'ler halinde puanlanır
+    to_score = [item for item in saved if _needs_scoring(item)]
+    features, scores = None, []
+    if to_score:  # hepsi kopya/düşük kalite ise CLIP hiç yüklenmez
         try:
-            is_relevant, ai_score, auto_label = is_image_relevant(file_path, topic.get_candidate_labels())
+            features = encode_images([item["path"] for item in to_score])
+            scores = relevance_from_features(features, topic.get_candidate_labels())
         except Exception as e:
-            print("Error in is_image_relevant:", e)
+            print("Error in relevance scoring:", e)
             raise HTTPException(status_code=500, detail=str(e))
+    score_by_path = {item["path"]: score for item, score in zip(to_score, scores)}
 
-        status = "approved" if is_relevant else "pending"
+    results = []
+    uploader = session.get(User, user.id)
+    new_images = []
+    for item in saved:
+        is_relevant, ai_score, auto_label = score_by_path.get(item["path"], (None, None, None))
+        quality = item["quality"]
+        status = quality.status or ("approved" if is_relevant else "pending")
         points_awarded = 5 if is_relevant else 0
         new_image = Image(
-            filename=file.filename,
-            path=file_path,
+            filename=item["filename"],
             topic_id=topic_id,
             uploader_id=user.id,
             is_relevant=is_relevant,
             points_awarded=points_awarded,
             status=status,
             ai_score=ai_score,
-            auto_label=auto_label
+            auto_label=auto_label,
+            dhash=item["dhash"],
+            duplicate_of=item["duplicate_of"],
+            quality_reason=quality.reason,
+            quality_checked=quality.checked,
         )
         session.add(new_image)
+        new_images.append(new_image)
         if uploader:
             uploader.points = (uploader.points or 0) + new_image.points_awarded
         results.append({
-            "filename": file.filename,
+            "filename": item["filename"],
             "is_relevant": is_relevant,
             "ai_score": ai_score,
             "auto_label": auto_label,
             "status": status,
-            "points_awarded": points_awarded
+            "points_awarded": points_awarded,
+            "duplicate_of": item["duplicate_of"],
+            "quality_reason": quality.reason,
         })
 
+    # Gömüler bir kez hesaplanıp saklanır; sonraki uygunluk/etiket sorguları yeniden kodlamaz
+    session.flush()
+    _resolve_batch_duplicates(saved, new_images)
+    for result, img in zip(results, new_images):
+        result["duplicate_of"] = img.duplicate_of
+    scored_ids = [img.id for item, img in zip(saved, new_images) if item["path"] in score_by_path]
+    if scored_ids:
+        save_embeddings(session, scored_ids, features)
     session.commit()
-    return {"status": "success", "results": results}
+    return {"status": "success", "results": results + skipped}
 
 
-@router.get("/{topic_id}/list")
-def list_images(topic_id: int, session: Session = Depends(get_session)):
-    images = session.exec(select(Image).where((Image.topic_id == topic_id) & (Image.status == "approved"))).all()
-    result = []
-    for img in images:
-        uploader = session.get(User, img.uploader_id)
-        uploader_name = uploader.email if uploader else None
+def _enqueue_ingest(session: Session, topic_id: int, user: User, saved: List[dict], skipped: List[dict]) -> dict:
+    # Satırlar hemen 'pending' olarak yazılır; CLIP puanlaması ve puan ödülü ingest işinde yapılır.
+    # İşaretlenen kopyalar ve kalite filtresine takılanlar işe bağlanmaz.
+    to_score = [_needs_scoring(item) for item in saved]
+    job = create_job(session, "ingest", user_id=user.id, topic_id=topic_id, total=sum(to_score))
+    images = []
+    for item, scored in zip(saved, to_score):
+        new_image = Image(
+            filename=item["filename"],
+            topic_id=topic_id,
+            uploader_id=user.id,
+            status=item["quality"].status or "pending",
+            ingest_job_id=job.id if scored else None,
+            dhash=item["dhash"],
+            duplicate_of=item["duplicate_of"],
+            quality_reason=item["quality"].reason,
+            quality_checked=item["quality"].checked,
+        )
+        session.add(new_image)
+        images.append(new_image)
+    session.flush()
+    _resolve_batch_duplicates(saved, images)
+    session.commit()
+    enqueue_job(job.id)
+    return {
+        "status": "accepted",
+        "job_id": job.id,
+        "results": [
+            {"image_id": img.id, "filename": img.filename, "status": img.status, "duplicate_of": img.duplicate_of,
+             "quality_reason": img.quality_reason}
+            for img in images
+        ] + skipped,
+    }
 
-        # Annotation sayısını doğrudan veritabanında say
-        annotation_count = session.exec(
-            select(func.count()).where(Annotation.image_id == img.id)
-        ).one()
 
-        result.append({
-            "id": img.id,
+def _upload_batch_status(session: Session, job: InferenceJob) -> dict:
+    images = session.exec(select(Image).where(Image.ingest_job_id == job.id).order_by(Image.id)).all()
+    out = job_progress(job)
+    out["results"] = [
+        {
+            "image_id": img.id,
             "filename": img.filename,
-            "uploader_name": uploader_name,
-            "annotation_count": annotation_count,
-            "type": None,  # Eğer modeline eklersen güncellenebilir
             "is_relevant": img.is_relevant,
-        })
+            "ai_score": img.ai_score,
+            "auto_label": img.auto_label,
+            "status": img.status,
+            "points_awarded": img.points_awarded,
+        }
+        for img in images
+    ]
+    return out
+
+
+def _get_upload_job(session: Session, job_id: int, user: User) -> InferenceJob:
+    job = session.get(InferenceJob, job_id)
+    if not job or job.kind != "ingest":
+        raise HTTPException(status_code=404, detail="Yükleme işi bulunamadı.")
+    if job.user_id != user.id and user.role != RoleEnum.admin:
+        raise HTTPException(status_code=403, detail="Bu yükleme işine erişim yetkiniz yok.")
+    return job
+
+
+@router.get("/uploads/{job_id}")
+def get_upload_status(job_id: int, session: Session = Depends(get_session), user: User = Depends(get_current_user)):
+    return _upload_batch_status(session, _get_upload_job(session, job_id, user))
+
+
+@router.get("/uploads/{job_id}/events")
+def stream_upload_status(job_id: int, session: Session = Depends(get_session), user: User = Depends(get_current_user)):
+    _get_upload_job(session, job_id, user)
+
+    # Server-Sent Events: ilerleme değiştikçe durum gönderilir, iş bitince akış kapanır
+    def events():
+        last = None
+        while True:
+            with Session(engine) as s:
+                job = s.get(InferenceJob, job_id)
+                state = _upload_batch_status(s, job)
+            if (state["status"], state["done"]) != last:
+                last = (state["status"], state["done"])
+                yield f"data: {json.dumps(state, ensure_ascii=False)}\n\n"
+            if state["status"] in FINAL_STATUSES:
+                return
+            time.sleep(1)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+LIST_FIELDS = ("id", "filename", "uploader_name", "annotation_count", "type", "is_relevant")
+
+
+@router.get("/{topic_id}/list")
+def list_images(
+    topic_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Sayfa boyutu; verilmezse tüm onaylı görseller"),
+    after_id: Optional[int] = Query(None, description="Önceki sayfanın son görsel id'si (X-Next-After-Id)"),
+    fields: Optional[str] = Query(None, description=f"Virgülle ayrılmış alanlar: {', '.join(LIST_FIELDS)}"),
+    session: Session = Depends(get_session),
+):
+    """
+    Konunun onaylı görselleri; yükleyen tek sorguda JOIN ile, annotation sayısı sayaç sütunundan gelir.
+    Sayfalama id üzerinden keyset ile yapılır: sonraki sayfanın imleci X-Next-After-Id başlığındadır.
+    """
+    wanted = LIST_FIELDS if fields is None else tuple(f for f in LIST_FIELDS if f in {x.strip() for x in fields.split(",")})
+    if not wanted:
+        raise HTTPException(status_code=422, detail=f"Geçerli alan yok. Seçenekler: {', '.join(LIST_FIELDS)}")
+    # id sayfalama imleci olduğundan her zaman döner
+    wanted = ("id",) + tuple(f for f in wanted if f != "id")
+
+    # İstenmeyen alanın JOIN'i hiç kurulmaz
+    columns = [Image.id]
+    if "filename" in wanted:
+        columns.append(Image.filename)
+    if "is_relevant" in wanted:
+        columns.append(Image.is_relevant)
+    if "uploader_name" in wanted:
+        columns.append(User.email.label("uploader_name"))
+    if "annotation_count" in wanted:
+        columns.append(Image.annotation_count)
+
+    query = select(*columns).where((Image.topic_id == topic_id) & (Image.status == "approved"))
+    if "uploader_name" in wanted:
+        query = query.outerjoin(User, User.id == Image.uploader_id)
+    if after_id is not None:
+        query = query.where(Image.id > after_id)
+    query = query.order_by(Image.id)
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    # Tek sütunlu seçimde session.exec skaler döndürür; mappings() her durumda sütun adlarıyla satır verir
+    rows = session.execute(query).mappings().all()
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-After-Id"] = str(rows[-1]["id"])
+
+    result = []
+    for row in rows:
+        values = dict(row)
+        values["type"] = None  # Eğer modeline eklersen güncellenebilir
+        result.append({field: values[field] for field in wanted})
     return result
 
 
 @router.get("/me")
-def get_my_images(session: Session = Depends(get_session), user: User = Depends(get_current_user)):
-    images = session.exec(select(Image).where(Image.uploader_id == user.id)).all()
-    return images
+def get_my_images(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    session: Session = Depends(get_session),
+    user: User = Depends(get_current_user),
+):
+    return paginate(session, select(Image).where(Image.uploader_id == user.id), Image, page, response)
 
 
 @router.get("/all")
-def get_all_images(session: Session = Depends(get_session), user: User = Depends(get_current_user)):
+def get_all_images(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    session: Session = Depends(get_session),
+    user: User = Depends(get_current_user),
+):
     if user.role != RoleEnum.admin:
         raise HTTPException(status_code=403, detail="Sadece admin erişebilir.")
-    return session.exec(select(Image)).all()
+    return paginate(session, select(Image), Image, page, response, filtered=False)
 
 
 @router.get("/pending")
-def get_pending_images(session: Session = Depends(get_session), user: User = Depends(get_current_user)):
+def get_pending_images(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    session: Session = Depends(get_session),
+    user: User = Depends(get_current_user),
+):
     if user.role != RoleEnum.admin:
         raise HTTPException(status_code=403, detail="Sadece admin erişebilir.")
-    images = session.exec(select(Image).where(Image.status == "pending")).all()
-    return images
+    return paginate(session, select(Image).where(Image.status == "pending"), Image, page, response)
 
 @router.get("/approved")
-def get_approved_images(session: Session = Depends(get_session), user: User = Depends(get_current_user)):
+def get_approved_images(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    session: Session = Depends(get_session),
+    user: User = Depends(get_current_user),
+):
     if user.role != RoleEnum.admin:
         raise HTTPException(status_code=403, detail="Sadece admin erişebilir.")
-    images = session.exec(select(Image).where(Image.status == "approved")).all()
-    return images
+    return paginate(session, select(Image).where(Image.status == "approved"), Image, page, response)
 
 
 @router.get("/detail/{image_id}")
@@ -142,6 +385,9 @@ def delete_image(image_id: int, session: Session = Depends(get_session), user: U
     if image.uploader_id != user.id and user.role != RoleEnum.admin:
         raise HTTPException(status_code=403, detail="Bu görseli silemezsiniz.")
 
+    delete_embeddings(session, image.id)
+    session.exec(update(Image).where(Image.duplicate_of == image.id).values(duplicate_of=None))
+    session.exec(update(InferenceJobResult).where(InferenceJobResult.image_id == image.id).values(image_id=None))
     session.delete(image)
     session.commit()
     return {"detail": "Görsel silindi."}
@@ -0,0 +1,97 @@
+"""
+Liste uçları için ortak keyset (imleç) sayfalama.
+
+İmleç, sayfanın son satırının (created_at, id) değerlerini taşıyan opak bir base64
+dizisidir; sonraki sayfa OFFSET yerine bu anahtarın ötesinden okunur, bu yüzden tablo
+büyüdükçe yavaşlamaz ve araya yeni satır eklense de kaymaz. Gövde düz liste olarak
+kalır; sonraki sayfanın imleci X-Next-Cursor, istenirse toplam sayı X-Total-Count
+başlığında döner.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, func, or_, text
+from sqlmodel import Session, select
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+# Bu satır sayısının üzerindeki filtresiz tablolarda toplam, istatistiklerden tahmin edilir
+ESTIMATE_TOTAL_ABOVE = 100_000
+
+
+class PageParams(NamedTuple):
+    cursor: Optional[str]
+    limit: int
+    total: bool
+
+
+def page_params(
+    cursor: Optional[str] = Query(None, description="Önceki yanıtın X-Next-Cursor başlığı"),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    total: bool = Query(False, description="X-Total-Count başlığında toplam sayıyı döndür"),
+) -> PageParams:
+    return PageParams(cursor, limit, total)
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    payload = json.dumps([created_at.isoformat(), row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Geçersiz sayfalama imleci.")
+
+
+def _entity(row: Any, model):
+    # select(Model) satırı modelin kendisi; select(Model, sütunlar...) satırında model ilk öğedir
+    return row if isinstance(row, model) else row[0]
+
+
+def _estimated_rows(session: Session, table_name: str) -> Optional[int]:
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+    value = session.connection().execute(
+        text("SELECT reltuples FROM pg_class WHERE relname = :name"), {"name": table_name}
+    ).scalar()
+    return int(value) if value is not None and value >= 0 else None
+
+
+def paginate(session: Session, query, model, page: PageParams, response: Response,
+             descending: bool = True, filtered: bool = True) -> List[Any]:
+    """
+    `query`yu `model`in (created_at, id) anahtarı üzerinden sıralayıp imleçten sonraki en
+    fazla `limit` satırı döndürür; sorgu birden çok öğe seçiyorsa `model` ilk öğe olmalıdır.
+    `filtered=False` (WHERE içermeyen sorgu) ise büyük tablolarda toplam, COUNT(*) yerine
+    Postgres istatistiklerinden tahmin edilir.
+    """
+    created_at, row_id = model.created_at, model.id
+    if page.total:
+        total = None
+        if not filtered:
+            estimate = _estimated_rows(session, model.__tablename__)
+            total = estimate if estimate is not None and estimate > ESTIMATE_TOTAL_ABOVE else None
+        if total is None:
+            total = session.exec(select(func.count()).select_from(query.order_by(None).subquery())).one()
+        response.headers["X-Total-Count"] = str(total)
+
+    if page.cursor:
+        after_at, after_id = decode_cursor(page.cursor)
+        if descending:
+            query = query.where(or_(created_at < after_at, and_(created_at == after_at, row_id < after_id)))
+        else:
+            query = query.where(or_(created_at > after_at, and_(created_at == after_at, row_id > after_id)))
+    order = (created_at.desc(), row_id.desc()) if descending else (created_at, row_id)
+    rows = session.exec(query.order_by(None).order_by(*order).limit(page.limit + 1)).all()
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = _entity(rows[-1], model)
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    return rows
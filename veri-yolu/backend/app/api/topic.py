@@ -8,7 +8,7 @@ from app.models.category import Category
 from app.models.user import User, RoleEnum
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
-from sqlalchemy import desc
+from sqlalchemy import desc, func, update
 from app.models.user import User as UserModel
 from app.models.discussion import Forum
 from app.models.image import Image  # Görseller için
@@ -16,6 +16,7 @@ from app.models.annotation import Annotation  # <-- Annotation modeli
 import os, time, json, io, zipfile, csv  # ZIP ve CSV için gerekli
 
 # ✅ METRİK SERVİSLERİ (unique view/download ve sayım)
+from app.services.forum_overview import invalidate_forum_overview
 from app.services.topic_metrics import (
     track_unique_view,
     track_unique_download,
@@ -70,12 +71,10 @@ def create_topic(
     try:
         forum_name = f"{title} Tartışmaları"
         forum_desc = f"'{title}' veri seti hakkında konuşmalar"
-        topic_forum = Forum(name=forum_name, description=forum_desc)
-        # If Forum has topic_id field, set it
-        if hasattr(Forum, '__table__') and 'topic_id' in Forum.__table__.columns:
-            topic_forum.topic_id = topic.id
+        topic_forum = Forum(name=forum_name, description=forum_desc, topic_id=topic.id)
         session.add(topic_forum)
         session.commit()
+        invalidate_forum_overview()
     except Exception:
         session.rollback()
 
@@ -102,25 +101,26 @@ def list_topics(
     search: str = Query(None),
     category_id: int = Query(None),
     sort: str = Query("-created_at"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Sayfa boyutu; verilmezse tüm konular"),
+    offset: int = Query(0, ge=0),
     session: Session = Depends(get_session)
 ):
-    query = select(Topic)
+    query = _topic_cards_query()
     if search:
         search_lower = f"%{search.lower()}%"
         query = query.where((Topic.title.ilike(search_lower)) | (Topic.description.ilike(search_lower)))
     if category_id:
         query = query.where(Topic.category_id == category_id)
-    # Sıralama
+    # Sıralama (eşit değerlerde sayfalar kararlı kalsın diye id ile)
     if sort == "created_at":
-        query = query.order_by(Topic.created_at)
+        query = query.order_by(Topic.created_at, Topic.id)
     elif sort == "-created_at":
-        query = query.order_by(desc(Topic.created_at))
+        query = query.order_by(desc(Topic.created_at), desc(Topic.id))
     elif sort == "title":
-        query = query.order_by(Topic.title)
+        query = query.order_by(Topic.title, Topic.id)
     elif sort == "-title":
-        query = query.order_by(desc(Topic.title))
-    topics = session.exec(query).all()
-    return [_build_topic_out(session, t) for t in topics]
+        query = query.order_by(desc(Topic.title), desc(Topic.id))
+    return _build_topic_outs(session, _paginate(query, limit, offset))
 
 
 @router.get("/categories")
@@ -129,17 +129,26 @@ def list_categories(session: Session = Depends(get_session)):
 
 
 @router.get("/mine", response_model=List[TopicOut])
-def get_my_topics(session: Session = Depends(get_session), user: User = Depends(get_current_user)):
-    topics = session.exec(select(Topic).where(Topic.owner_id == user.id)).all()
-    return [_build_topic_out(session, t) for t in topics]
+def get_my_topics(
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    session: Session = Depends(get_session),
+    user: User = Depends(get_current_user)
+):
+    query = _topic_cards_query().where(Topic.owner_id == user.id).order_by(Topic.id)
+    return _build_topic_outs(session, _paginate(query, limit, offset))
 
 
 @router.get("/all", response_model=List[TopicOut])
-def get_all_topics(session: Session = Depends(get_session), user: User = Depends(get_current_user)):
+def get_all_topics(
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    session: Session = Depends(get_session),
+    user: User = Depends(get_current_user)
+):
     if user.role != RoleEnum.admin:
         raise HTTPException(status_code=403, detail="Sadece admin erişebilir.")
-    topics = session.exec(select(Topic)).all()
-    return [_build_topic_out(session, t) for t in topics]
+    return _build_topic_outs(session, _paginate(_topic_cards_query().order_by(Topic.id), limit, offset))
 
 
 @router.get("/{topic_id}")
@@ -156,54 +165,57 @@ def get_topic(topic_id: int, session: Session = Depends(get_session)):
         if getattr(owner, "profile_image", None):
             result["owner_avatar_url"] = f"/uploaded_images/{owner.profile_image}"
     # Attach per-topic forum if found
-    try:
-        # If Forum has topic_id column, prefer exact match
-        forum = None
-        if hasattr(Forum, '__table__') and 'topic_id' in Forum.__table__.columns:
-            forum = session.exec(select(Forum).where(Forum.topic_id == topic_id)).first()
-        if not forum:
-            forum = session.exec(select(Forum).where(Forum.name.ilike(f"%{topic.title}%"))).first()
-        if forum:
-            result["forum_id"] = forum.id
-    except Exception:
-        pass
+    forum_id = session.exec(select(func.min(Forum.id)).where(Forum.topic_id == topic_id)).one()
+    if forum_id is not None:
+        result["forum_id"] = forum_id
     return result
 
 
-def _build_topic_out(session: Session, t: Topic) -> TopicOut:
-    owner = session.get(UserModel, t.owner_id) if getattr(t, "owner_id", None) else None
-    category = session.get(Category, t.category_id) if getattr(t, "category_id", None) else None
-    avatar = None
-    if getattr(owner, "profile_image", None):
-        avatar = f"/uploaded_images/{owner.profile_image}"
-    # find forum by topic_id column if exists, else by name pattern
-    forum_id: Optional[int] = None
-    try:
-        forum = None
-        if hasattr(Forum, '__table__') and 'topic_id' in Forum.__table__.columns:
-            forum = session.exec(select(Forum).where(Forum.topic_id == t.id)).first()
-        if not forum:
-            forum = session.exec(select(Forum).where(Forum.name.ilike(f"%{t.title}%"))).first()
-        if forum:
-            forum_id = forum.id
-    except Exception:
-        forum_id = None
-    return TopicOut(
-        id=t.id,
-        title=t.title,
-        description=t.description,
-        category_id=t.category_id,
-        owner_id=t.owner_id,
-        created_at=t.created_at.isoformat(),
-        candidate_labels=t.candidate_labels,
-        cover_image=t.cover_image,
-        category_name=getattr(category, "name_tr", None) or getattr(category, "name_en", None),
-        owner_email=getattr(owner, "email", None),
-        owner_avatar_url=avatar,
-        forum_id=forum_id,
+def _paginate(query, limit: Optional[int], offset: int):
+    if offset:
+        query = query.offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def _topic_cards_query():
+    """
+    Konu kartları için tek sorgu: sahibi ve kategorisi JOIN ile, konu forumu Forum.topic_id
+    indeksi üzerinden ilişkili alt sorguyla gelir. Çağıran filtre, sıralama ve sayfalama ekler.
+    """
+    forum_id = select(func.min(Forum.id)).where(Forum.topic_id == Topic.id).scalar_subquery().label("forum_id")
+    return (
+        select(Topic, UserModel.email, UserModel.profile_image, Category.name_tr, Category.name_en, forum_id)
+        .outerjoin(UserModel, UserModel.id == Topic.owner_id)
+        .outerjoin(Category, Category.id == Topic.category_id)
     )
 
 
+def _build_topic_outs(session: Session, query) -> List[TopicOut]:
+    return [
+        TopicOut(
+            id=t.id,
+            title=t.title,
+            description=t.description,
+            category_id=t.category_id,
+            owner_id=t.owner_id,
+            created_at=t.created_at.isoformat(),
+            candidate_labels=t.candidate_labels,
+            cover_image=t.cover_image,
+            category_name=name_tr or name_en,
+            owner_email=email,
+            owner_avatar_url=f"/uploaded_images/{profile_image}" if profile_image else None,
+            forum_id=forum_id,
+        )
+        for t, email, profile_image, name_tr, name_en, forum_id in session.exec(query).all()
+    ]
+
+
+def _build_topic_out(session: Session, t: Topic) -> TopicOut:
+    return _build_topic_outs(session, _topic_cards_query().where(Topic.id == t.id))[0]
+
+
 class TopicUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -324,8 +336,11 @@ def delete_topic(
     if topic.owner_id != user.id and user.role != RoleEnum.admin:
         raise HTTPException(status_code=403, detail="Bu konuyu silemezsiniz.")
 
+    # Konu forumu (ve tartışmaları) kalır; yalnızca konuya bağı kaldırılır
+    session.exec(update(Forum).where(Forum.topic_id == topic_id).values(topic_id=None))
     session.delete(topic)
     session.commit()
+    invalidate_forum_overview()
     return {"detail": "Konu silindi."}
 
 
@@ -4,15 +4,24 @@ from app.models.category import Category
 from app.models.topic import Topic
 from app.models.image import Image
 from app.db.session import engine
+from app.services.counters import counters_need_backfill, increment, reconcile_counters
+from app.db.migrations import add_missing_columns, backfill_forum_topics, dedupe_post_votes
 from app.models.contact_message import ContactMessage  # ensure table creation
 from app.core.security import hash_password
 from app.models.annotation import Annotation
 from app.models.discussion import Forum, DiscussionThread, DiscussionPost, DiscussionPostVote
 from app.models.password_reset import PasswordResetToken  # ensure table
+from app.models.job import InferenceJob, InferenceJobResult  # ensure table
+from app.models.image_embedding import ImageEmbedding  # ensure table
 
 def init_db():
+    # Sayaç sütunları yeni eklenecekse mevcut verilerden bir kez doldurulur
+    backfill_counters = counters_need_backfill(engine)
     # Create tables if they don't exist
     SQLModel.metadata.create_all(engine)
+    dedupe_post_votes(engine)
+    add_missing_columns(engine)
+    backfill_forum_topics(engine)
 
     with Session(engine) as session:
         # Kullanıcılar
@@ -107,10 +116,9 @@ def init_db():
 
         # Forums - per topic
         def ensure_topic_forum(t: Topic):
-            forum_name = f"{t.title} Tartışmaları"
-            forum = session.query(Forum).filter(Forum.name == forum_name).first()
+            forum = session.query(Forum).filter(Forum.topic_id == t.id).first()
             if not forum:
-                forum = Forum(name=forum_name, description=f"'{t.title}' veri seti hakkında konuşmalar")
+                forum = Forum(name=f"{t.title} Tartışmaları", description=f"'{t.title}' veri seti hakkında konuşmalar", topic_id=t.id)
                 session.add(forum)
                 session.commit()
             return forum
@@ -172,6 +180,8 @@ def init_db():
             )
             session.add(ann1)
             session.add(ann2)
+            increment(session, Image, img1.id, "annotation_count")
+            increment(session, Image, img2.id, "annotation_count")
         session.commit()
 
         # Seed example threads/posts for per-topic forums
@@ -187,6 +197,8 @@ def init_db():
             session.commit()
             pst = DiscussionPost(thread_id=thr.id, author_id=author_id, content=content)
             session.add(pst)
+            increment(session, User, author_id, "thread_count")
+            increment(session, User, author_id, "post_count")
             session.commit()
             return thr
 
@@ -204,3 +216,6 @@ def init_db():
             annotator.id,
             "Hangi alt kategoriler eklenmeli?"
         )
+
+        if backfill_counters:
+            reconcile_counters(session, fix=True)
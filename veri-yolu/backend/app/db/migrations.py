@@ -0,0 +1,95 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel
+
+
+def _default_sql(column) -> str:
+    default = column.default
+    if default is None or not default.is_scalar:
+        return ""
+    value = default.arg
+    if isinstance(value, bool):
+        return " DEFAULT TRUE" if value else " DEFAULT FALSE"
+    if isinstance(value, (int, float)):
+        return f" DEFAULT {value}"
+    if isinstance(value, str):
+        escaped = value.replace("'", "''")
+        return f" DEFAULT '{escaped}'"
+    return ""
+
+
+def add_missing_columns(engine: Engine):
+    """
+    create_all mevcut tablolara yeni sütun eklemez. Modellere sonradan eklenen
+    sütunları ve indeksleri var olan tablolara ekler; tekrar çalıştırmak güvenlidir.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column.type.compile(dialect=engine.dialect)}'
+                default_sql = _default_sql(column)
+                ddl += default_sql
+                if not column.nullable and default_sql:
+                    ddl += " NOT NULL"
+                for fk in column.foreign_keys:
+                    ddl += f' REFERENCES "{fk.column.table.name}" ("{fk.column.name}")'
+                conn.execute(text(ddl))
+
+            existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+
+
+def dedupe_post_votes(engine: Engine):
+    """
+    (post_id, user_id) benzersiz indeksi oluşturulmadan önce aynı kullanıcının bir
+    gönderiye verdiği yinelenen oyları siler; her çiftin en eski oyu kalır.
+    add_missing_columns'tan önce çalışmalıdır. İndeks zaten varsa yineleme olamaz,
+    tablo taranmaz.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table("discussionpostvote"):
+        return
+    if "ux_discussionpostvote_post_user" in {i["name"] for i in inspector.get_indexes("discussionpostvote")}:
+        return
+    with engine.begin() as conn:
+        conn.execute(text(
+            "DELETE FROM discussionpostvote WHERE id NOT IN "
+            "(SELECT MIN(id) FROM discussionpostvote GROUP BY post_id, user_id)"
+        ))
+
+
+def backfill_forum_topics(engine: Engine):
+    """
+    Forum.topic_id sütunundan önce oluşturulan konu forumlarını konularına bağlar.
+    Önce create_topic'in verdiği "<başlık> Tartışmaları" adıyla birebir, yoksa eski
+    ilike araması gibi adında başlık geçen ilk forumla eşleştirir. Yalnızca forumu
+    olmayan konulara ve bağlanmamış forumlara dokunur; tekrar çalıştırmak güvenlidir.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table("forum") or not inspector.has_table("topic"):
+        return
+    with engine.begin() as conn:
+        topics = conn.execute(text(
+            "SELECT id, title FROM topic WHERE id NOT IN "
+            "(SELECT topic_id FROM forum WHERE topic_id IS NOT NULL) ORDER BY id"
+        )).all()
+        if not topics:
+            return
+        forums = conn.execute(text("SELECT id, name FROM forum WHERE topic_id IS NULL ORDER BY id")).all()
+        for topic_id, title in topics:
+            exact = f"{title} Tartışmaları"
+            match = next((f for f in forums if f.name == exact), None) or next(
+                (f for f in forums if title.lower() in f.name.lower()), None
+            )
+            if match is None:
+                continue
+            conn.execute(text("UPDATE forum SET topic_id = :topic_id WHERE id = :id"), {"topic_id": topic_id, "id": match.id})
+            forums.remove(match)
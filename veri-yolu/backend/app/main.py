@@ -2,8 +2,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from app.api import auth, topic, image, admin, communication, discussion
+from app.api import auth, topic, image, admin, communication, discussion, annotation
 from app.db.init_db import init_db
+from app.services.jobs import recover_jobs
+from app.services.warmup import warmup_in_background
+from app.core.config import MODEL_WARMUP
 import os
 
 app = FastAPI()
@@ -15,6 +18,9 @@ def read_root():
 @app.on_event("startup")
 def on_startup():
     init_db()
+    recover_jobs()
+    if MODEL_WARMUP:
+        warmup_in_background()
 
 # ⬇️ CORS: React/Vite olası origin'leri ekledik
 origins = [
@@ -30,6 +36,7 @@ app.add_middleware(
     allow_credentials=True,         # cookie kullanıyorsan gerekli
     allow_methods=["*"],            # OPTIONS dahil
     allow_headers=["*"],            # Authorization vs.
+    expose_headers=["X-Next-After-Id", "X-Next-Cursor", "X-Total-Count"],  # sayfalama başlıkları tarayıcıdan okunabilsin
 )
 
 # Router'lar (CORS middleware'den SONRA geliyor olmalı)
@@ -42,6 +49,7 @@ app.include_router(image.router, prefix="/images", tags=["images"])
 app.include_router(admin.router, prefix="/admin", tags=["admin"])
 app.include_router(communication.router, prefix="/contact", tags=["contact"])
 app.include_router(discussion.router, prefix="/discussions", tags=["discussions"])
+app.include_router(annotation.router, prefix="/annotation", tags=["annotation"])
 
 app.mount(
     "/uploaded_images",
@@ -8,6 +8,6 @@ class Annotation(SQLModel, table=True):
     y: float
     width: float
     height: float
-    image_id: int = Field(foreign_key="image.id")
+    image_id: int = Field(foreign_key="image.id", index=True)
     category_id: int = Field(foreign_key="category.id")
 
@@ -10,7 +10,7 @@ class ContactMessage(SQLModel, table=True):
     last_name: Optional[str] = None
     email: str
     message: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     is_processed: bool = Field(default=False)
 
 
@@ -1,4 +1,5 @@
 from datetime import datetime
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 from typing import Optional
 
@@ -7,6 +8,7 @@ class Forum(SQLModel, table=True):
     name: str
     description: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    topic_id: Optional[int] = Field(default=None, foreign_key="topic.id", index=True)  # konuya özel forum; genel forumlarda boş
 
 class DiscussionThread(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -14,15 +16,17 @@ class DiscussionThread(SQLModel, table=True):
     topic_id: Optional[int] = Field(default=None, foreign_key="topic.id")
     title: str
     author_id: int = Field(foreign_key="user.id")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 class DiscussionPost(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    thread_id: int = Field(foreign_key="discussionthread.id")
+    thread_id: int = Field(foreign_key="discussionthread.id", index=True)
     author_id: int = Field(foreign_key="user.id")
     content: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    score: int = Field(default=0)  # oy toplamı (sayaç)
+    block_count: int = Field(default=0)  # engelleme sayısı (sayaç)
 
     # ✅ YENİ: iç içe yorumlar için parent
     parent_id: Optional[int] = Field(
@@ -32,6 +36,8 @@ class DiscussionPost(SQLModel, table=True):
     )
 
 class DiscussionPostVote(SQLModel, table=True):
+    # Kullanıcı başına gönderi başına tek oy; mevcut kopyalar migrations.dedupe_post_votes ile temizlenir
+    __table_args__ = (Index("ux_discussionpostvote_post_user", "post_id", "user_id", unique=True),)
     id: Optional[int] = Field(default=None, primary_key=True)
     post_id: int = Field(foreign_key="discussionpost.id")
     user_id: int = Field(foreign_key="user.id")
@@ -1,15 +1,22 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, BigInteger
 from typing import Optional
 from datetime import datetime
 
 class Image(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     filename: str
-    topic_id: int = Field(foreign_key="topic.id")
+    topic_id: int = Field(foreign_key="topic.id", index=True)
     uploader_id: int = Field(foreign_key="user.id")
     is_relevant: Optional[bool] = None  # CLIP ile otomatik işlenecek
     points_awarded: Optional[int] = 0
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     status: str = Field(default="pending")  # 'pending', 'approved', 'rejected'
     ai_score: Optional[float] = None  # AI similarity/confidence score
     auto_label: Optional[str] = None  # CLIP tarafından önerilen en iyi etiket
+    ingest_job_id: Optional[int] = Field(default=None, foreign_key="inference_job.id", index=True)  # asenkron yükleme işi
+    dhash: Optional[int] = Field(default=None, sa_column=Column(BigInteger, nullable=True, index=True))  # algısal hash (işaretli 64 bit)
+    duplicate_of: Optional[int] = Field(default=None, foreign_key="image.id")  # yakın kopyası olduğu görsel
+    annotation_count: int = Field(default=0)  # sayaç; services.counters ile güncellenir
+    quality_reason: Optional[str] = None  # kalite filtresi nedeni: 'corrupt', 'too_small', 'blank', 'blurry'
+    quality_checked: bool = Field(default=False)  # kalite filtresi çalıştı mı (geçenler için quality_reason None kalır)
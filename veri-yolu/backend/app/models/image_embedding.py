@@ -0,0 +1,11 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, LargeBinary
+from datetime import datetime
+
+
+class ImageEmbedding(SQLModel, table=True):
+    __tablename__ = "image_embedding"
+    image_id: int = Field(primary_key=True, foreign_key="image.id")
+    model: str = Field(primary_key=True)  # örn. 'ViT-B/32'
+    vector: bytes = Field(sa_column=Column(LargeBinary, nullable=False))  # float16, normalize edilmiş
+    created_at: datetime = Field(default_factory=datetime.utcnow)
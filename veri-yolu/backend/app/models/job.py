@@ -0,0 +1,32 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class InferenceJob(SQLModel, table=True):
+    __tablename__ = "inference_job"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str = Field(index=True)  # 'auto_annotate'
+    topic_id: Optional[int] = Field(default=None, foreign_key="topic.id", index=True)
+    user_id: int = Field(foreign_key="user.id")
+    status: str = Field(default="queued", index=True)  # 'queued', 'running', 'completed', 'failed', 'cancelled'
+    total: int = 0
+    done: int = 0
+    cancel_requested: bool = Field(default=False)
+    error: Optional[str] = None
+    output_path: Optional[str] = None
+    stage_timings: Optional[str] = None  # JSON: aşama adı -> süre özeti (metrics.span)
+    owner: Optional[str] = None  # işi çalıştıran işçi süreci: "host:pid"
+    heartbeat_at: Optional[datetime] = None  # işçinin son canlılık bildirimi
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class InferenceJobResult(SQLModel, table=True):
+    __tablename__ = "inference_job_result"
+    id: Optional[int] = Field(default=None, primary_key=True)  # kısmi sonuçlar için sıra/imleç
+    job_id: int = Field(foreign_key="inference_job.id", index=True)
+    image_id: Optional[int] = Field(default=None, foreign_key="image.id")
+    payload: str  # JSON
+    created_at: datetime = Field(default_factory=datetime.utcnow)
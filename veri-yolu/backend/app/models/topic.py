@@ -17,11 +17,19 @@ class Topic(SQLModel, table=True):
     # Cover image path
     cover_image: Optional[str] = Field(default=None, sa_column_kwargs={"nullable": True})
 
+    # Tekil görüntülenme/indirme sayaçları (topic_metrics ile güncellenir)
+    view_count: int = Field(default=0)
+    download_count: int = Field(default=0)
+
     # Accessor/helper methods
     def get_candidate_labels(self) -> List[str]:
         return json.loads(self.candidate_labels or "[]")
 
     def set_candidate_labels(self, labels: List[str]):
+        # Eski etiket kümesinin CLIP metin öznitelikleri artık geçersiz
+        from app.services.label_cache import invalidate_label_set
+        if self.candidate_labels:
+            invalidate_label_set(self.get_candidate_labels())
         self.candidate_labels = json.dumps(labels)
 
     def get_cover_image_url(self) -> Optional[str]:
@@ -16,7 +16,7 @@ class User(SQLModel, table=True):
     is_active: bool = True
     is_verified: bool = False
     role: RoleEnum = Field(default=RoleEnum.user)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     points: int = 0
     profile_image: Optional[str] = Field(default=None, sa_column_kwargs={"nullable": True})
 
@@ -25,3 +25,7 @@ class User(SQLModel, table=True):
     last_login: Optional[date] = Field(default=None, sa_column_kwargs={"nullable": True})
     streak: int = Field(default=0)
 
+    # Forum sayaçları (services.counters ile güncellenir)
+    post_count: int = Field(default=0)
+    thread_count: int = Field(default=0)
+
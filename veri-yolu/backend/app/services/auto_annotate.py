@@ -0,0 +1,59 @@
+import json
+from typing import List
+
+
+from app.core.config import CLIP_MODEL_ID, YOLOV8_ONNX_PATH, YOLO_TILED
+from app.services.clip_labeler import suggest_clip_labels_for_crops
+from app.services.metrics import span
+from app.services.preprocessing import decode
+from app.services.result_cache import file_digest, model_version, result_cache, result_key
+from app.services.yolo_labeler import run_yolov8_onnx, map_yolo_to_candidates
+
+
+def annotate_image(image_path: str, candidate_labels: List[str]) -> List[dict]:
+    """
+    YOLO ile kutuları bulur, CLIP ile her kutuyu konunun aday etiketlerine eşler.
+    Sonuç içerik adresli önbellekten gelir; değişmemiş bir konuyu yeniden etiketlemek görselleri çözmez.
+    """
+    key = result_key(
+        "auto_annotate", file_digest(image_path), candidate_labels,
+        f"{model_version(YOLOV8_ONNX_PATH)}|{CLIP_MODEL_ID}", YOLO_TILED,
+    )
+    with span("auto_annotate.image"):
+        return result_cache.get_or_set(key, lambda: _annotate_image(image_path, candidate_labels))
+
+
+def _annotate_image(image_path: str, candidate_labels: List[str]) -> List[dict]:
+    # Görsel tam çözünürlükte bir kez çözülür; YOLO girdisi ve CLIP kırpıntıları aynı tampondan üretilir
+    pil_image = decode(image_path).image
+    yolo_boxes = run_yolov8_onnx(pil_image)
+    with span("clip.crops"):
+        clip_labels = suggest_clip_labels_for_crops(pil_image, [box["bbox"] for box in yolo_boxes], candidate_labels)
+    image_annots = []
+    for box, (label, score) in zip(yolo_boxes, clip_labels):
+        if not label or score < 0.3:
+            # fallback to YOLO class mapping
+            label = map_yolo_to_candidates(box["class_name"], candidate_labels)
+        image_annots.append({
+            "bbox": box["bbox"],
+            "label": label,
+            "score": float(box["score"]),
+            "source": "auto"
+        })
+    return image_annots
+
+
+def export_path(topic_id: int) -> str:
+    return f"auto_annotations_topic_{topic_id}.json"
+
+
+def write_export(topic_id: int, topic_title: str, candidate_labels: List[str], results: List[dict]) -> str:
+    # Save to JSON for export
+    out_path = export_path(topic_id)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "topic": topic_title,
+            "candidate_labels": candidate_labels,
+            "images": results
+        }, f, ensure_ascii=False, indent=2)
+    return out_path
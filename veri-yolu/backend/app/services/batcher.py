@@ -0,0 +1,112 @@
+import queue
+import threading
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+
+class _Request:
+    __slots__ = ("inputs", "result", "error", "done")
+
+    def __init__(self, inputs: np.ndarray):
+        self.inputs = inputs
+        self.result: Optional[np.ndarray] = None
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+
+
+class MicroBatcher:
+    """
+    Süreç içi dinamik mikro-batch aracısı. Eşzamanlı çağrıların girdileri (ilk eksende
+    satırlar) kuyruğa alınır, en fazla `max_wait_ms` boyunca ya da `max_batch_size`
+    satıra ulaşılana kadar birleştirilir, tek ileri geçişte çalıştırılır ve sonuç
+    satırları çağıranlara geri dağıtılır.
+    """
+
+    def __init__(self, fn: Callable[[np.ndarray], np.ndarray], max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0, workers: int = 1, name: str = "batcher"):
+        self.fn = fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.workers = max(1, workers)
+        self.name = name
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.requests = 0
+
+    def _ensure_workers(self):
+        if len(self._threads) >= self.workers:
+            return
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._loop, name=f"{self.name}-{len(self._threads)}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, inputs: np.ndarray) -> np.ndarray:
+        """Girdileri kuyruğa koyar ve kendi satırlarının çıktısını bekleyip döndürür."""
+        if len(inputs) == 0:
+            return self.fn(inputs)
+        self._ensure_workers()
+        request = _Request(inputs)
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _collect(self) -> List[_Request]:
+        pending = [self._queue.get()]
+        size = len(pending[0].inputs)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            pending.append(request)
+            size += len(request.inputs)
+        return pending
+
+    def _loop(self):
+        while True:
+            self._run(self._collect())
+
+    def _run(self, pending: List[_Request]):
+        try:
+            inputs = np.concatenate([request.inputs for request in pending], axis=0)
+            # Büyük tek istekler de max_batch_size'lık parçalara bölünür
+            outputs = np.concatenate([
+                self.fn(inputs[start:start + self.max_batch_size])
+                for start in range(0, len(inputs), self.max_batch_size)
+            ], axis=0)
+        except BaseException as e:
+            for request in pending:
+                request.error = e
+                request.done.set()
+            return
+        with self._lock:
+            self.batches += -(-len(inputs) // self.max_batch_size)
+            self.items += len(inputs)
+            self.requests += len(pending)
+        offset = 0
+        for request in pending:
+            request.result = outputs[offset:offset + len(request.inputs)]
+            offset += len(request.inputs)
+            request.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "requests": self.requests,
+                "items": self.items,
+                "batches": self.batches,
+                "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+                "queued": self._queue.qsize(),
+            }
@@ -1,37 +1,280 @@
-import torch
-import clip
+import threading
+import numpy as np
 from PIL import Image
-from typing import List, Tuple
+from typing import List, Sequence, Tuple, Union
 
-device = "cuda" if torch.cuda.is_available() else "cpu"
-model, preprocess = clip.load("ViT-B/32", device=device)
+from app.core.config import (
+    CLIP_MODEL_NAME, CLIP_MODEL_ID, CLIP_BATCH_SIZE, CLIP_BACKEND,
+    INFERENCE_BATCHING, INFERENCE_MAX_BATCH_SIZE, INFERENCE_MAX_WAIT_MS, INFERENCE_WORKERS,
+)
+from app.services.label_cache import text_feature_cache, text_cache_key
+from app.services.metrics import span
+from app.services.preprocessing import clip_batch, decode, decode_for_clip, open_image
+from app.services.runtime_profiles import get_profile, torch_grad_context
 
-def preprocess_image(image_path: str) -> torch.Tensor:
-    pil_image = Image.open(image_path).convert("RGB")
-    image_tensor = preprocess(pil_image)  # preprocess returns a torch.Tensor
-    image_tensor = image_tensor.unsqueeze(0)  # Add batch dimension
-    return image_tensor.to(device)
+# torch/CLIP içe aktarımı ve ağırlık yükleme ilk kullanıma kadar ertelenir
+device = None
+model = None
+preprocess = None
+_load_lock = threading.Lock()
+
+def load_model():
+    global device, model, preprocess
+    if model is None:
+        with _load_lock:
+            if model is None:
+                import torch
+                import clip
+                profile = get_profile()
+                if profile.torch_threads:
+                    torch.set_num_threads(profile.torch_threads)
+                device = "cuda" if torch.cuda.is_available() else "cpu"
+                loaded_model, preprocess = clip.load(CLIP_MODEL_NAME, device=device)
+                loaded_model.eval()
+                if profile.channels_last:
+                    loaded_model = loaded_model.to(memory_format=torch.channels_last)
+                model = loaded_model
+    return model, preprocess, device
+
+def is_loaded() -> bool:
+    return model is not None
+
+def _use_onnx() -> bool:
+    # CLIP_BACKEND=onnx / onnx-int8: torch hiç içe aktarılmaz
+    return CLIP_BACKEND != "torch"
+
+def _logit_scale() -> float:
+    if _use_onnx():
+        from app.services.clip_onnx import get_encoder
+        return get_encoder().logit_scale
+    model, _, _ = load_model()
+    return float(model.logit_scale.exp())
+
+# OpenAI CLIP modellerinin görsel öznitelik boyutları; boş girdinin şekli model yüklenmeden verilir
+_EMBED_DIMS = {
+    "RN50": 1024, "RN101": 512, "RN50x4": 640, "RN50x16": 768, "RN50x64": 1024,
+    "ViT-B/32": 512, "ViT-B/16": 512, "ViT-L/14": 768, "ViT-L/14@336px": 768,
+}
+
+def embedding_dim() -> int:
+    if _use_onnx():
+        from app.services.clip_onnx import embed_dim
+        return embed_dim()
+    if model is None and CLIP_MODEL_NAME in _EMBED_DIMS:
+        return _EMBED_DIMS[CLIP_MODEL_NAME]
+    return load_model()[0].visual.output_dim
+
+def _normalize(features: np.ndarray) -> np.ndarray:
+    return features / np.linalg.norm(features, axis=-1, keepdims=True).clip(1e-12)
+
+def encode_text(candidate_labels: Sequence[str]) -> np.ndarray:
+    """
+    Normalize edilmiş metin özniteliklerini (L, D) döndürür; etiket kümesi başına bir kez hesaplanır.
+    """
+    def compute() -> np.ndarray:
+        with span("clip.text_encode"):
+            if _use_onnx():
+                from app.services.clip_onnx import get_encoder
+                return _normalize(get_encoder().encode_text(candidate_labels))
+            import clip
+            model, _, device = load_model()
+            text_tokens = clip.tokenize(list(candidate_labels)).to(device)
+            with torch_grad_context(get_profile()):
+                features = model.encode_text(text_tokens)
+            return _normalize(features.float().cpu().numpy())
+
+    return text_feature_cache.get_or_set(text_cache_key(CLIP_MODEL_ID, candidate_labels), compute)
+
+def _preprocess_images(images: Sequence[Union[str, Image.Image]]) -> np.ndarray:
+    # Çözme ve ön işleme çağıranın iş parçacığında yapılır; aracı yalnızca ileri geçişi çalıştırır
+    with span("clip.preprocess"):
+        if _use_onnx():
+            from app.services.clip_onnx import get_encoder
+            return get_encoder().preprocess(images)
+        # torch modeli de ONNX ile aynı NumPy ön işlemesini kullanır (torchvision dönüşümlerinin eşleniği)
+        model, _, _ = load_model()
+        resolution = model.visual.input_resolution
+        return clip_batch([decode_for_clip(item, resolution) for item in images], resolution)
+
+def _encode_pixels(pixels: np.ndarray) -> np.ndarray:
+    if _use_onnx():
+        from app.services.clip_onnx import get_encoder
+        with span("clip.image_encode"):
+            return get_encoder().encode_pixels(pixels)
+    import torch
+    model, _, device = load_model()
+    if len(pixels) == 0:
+        return np.empty((0, model.visual.output_dim), dtype=np.float32)
+    profile = get_profile()
+    with span("clip.image_encode"), torch_grad_context(profile):
+        tensor = torch.from_numpy(pixels).to(device)
+        if profile.channels_last:
+            tensor = tensor.contiguous(memory_format=torch.channels_last)
+        features = model.encode_image(tensor)
+    return features.float().cpu().numpy()
+
+_broker = None
+_broker_lock = threading.Lock()
+
+def get_image_broker():
+    """
+    Görsel kodlayıcının süreç genelindeki mikro-batch aracısı: eşzamanlı uç nokta
+    çağrıları tek ileri geçişte birleştirilir.
+    """
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                from app.services.batcher import MicroBatcher
+                _broker = MicroBatcher(
+                    _encode_pixels,
+                    max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+                    max_wait_ms=INFERENCE_MAX_WAIT_MS,
+                    workers=INFERENCE_WORKERS,
+                    name="clip-image",
+                )
+    return _broker
+
+def encode_images(images: Sequence[Union[str, Image.Image]], batch_size: int = CLIP_BATCH_SIZE) -> np.ndarray:
+    """
+    Görselleri (dosya yolu ya da PIL görseli) batch'ler halinde kodlar;
+    normalize edilmiş (N, D) float32 öznitelik matrisi döndürür.
+    INFERENCE_BATCHING açıkken ileri geçiş paylaşılan aracı üzerinden yapılır.
+    Boş girdi modele dokunmadan (0, D) döndürür.
+    """
+    if len(images) == 0:
+        return np.empty((0, embedding_dim()), dtype=np.float32)
+    chunks = []
+    for start in range(0, len(images), batch_size):
+        pixels = _preprocess_images(images[start:start + batch_size])
+        if INFERENCE_BATCHING:
+            # Kuyrukta bekleme + paylaşılan ileri geçiş
+            with span("clip.broker_submit"):
+                chunks.append(get_image_broker().submit(pixels))
+        else:
+            chunks.append(_encode_pixels(pixels))
+    return _normalize(np.concatenate(chunks, axis=0))
+
+def _label_probs(image_features: np.ndarray, candidate_labels: Sequence[str]) -> np.ndarray:
+    # Kosinüs benzerliği üzerinde logit_scale'li softmax; (N, L) olasılık matrisi
+    text_features = encode_text(candidate_labels)
+    logits = _logit_scale() * (_normalize(image_features.astype(np.float32)) @ text_features.T)
+    logits -= logits.max(axis=1, keepdims=True)
+    probs = np.exp(logits)
+    probs /= probs.sum(axis=1, keepdims=True)
+    return probs
+
+def score_image_features(image_features: np.ndarray, candidate_labels: Sequence[str]) -> List[Tuple[str, float]]:
+    """
+    Önceden hesaplanmış (N, D) görsel özniteliklerini aday etiketlere göre puanlar.
+    """
+    if not candidate_labels:
+        return [("", 0.0) for _ in range(len(image_features))]
+    if len(image_features) == 0:
+        return []
+    probs = _label_probs(image_features, candidate_labels)
+    best_idx = probs.argmax(axis=1)
+    return [(candidate_labels[i], float(probs[row, i])) for row, i in enumerate(best_idx)]
+
+def top_k_labels(image_features: np.ndarray, candidate_labels: Sequence[str], k: int = 3) -> List[List[Tuple[str, float]]]:
+    """
+    Her görsel için en olası `k` etiketi (etiket, olasılık) çiftleri halinde azalan sırada döndürür.
+    """
+    if not candidate_labels or len(image_features) == 0:
+        return [[] for _ in range(len(image_features))]
+    probs = _label_probs(image_features, candidate_labels)
+    k = max(1, min(k, len(candidate_labels)))
+    order = np.argsort(-probs, axis=1)[:, :k]
+    return [[(candidate_labels[i], float(probs[row, i])) for i in idx] for row, idx in enumerate(order)]
 
 def suggest_clip_label(image_path: str, candidate_labels: List[str]) -> Tuple[str, float]:
     if not candidate_labels:
         return "", 0.0
-    image_input = preprocess_image(image_path)
-    text_tokens = clip.tokenize(candidate_labels).to(device)
+    # Aynı dosya içeriği + etiket kümesi + model için sonuç önbellekten döner
+    from app.services.result_cache import file_digest, result_cache, result_key
+    key = result_key("clip_label", file_digest(image_path), candidate_labels, CLIP_MODEL_ID)
+    label, score = result_cache.get_or_set(
+        key, lambda: score_image_features(encode_images([image_path]), candidate_labels)[0]
+    )
+    return label, float(score)
+
+def suggest_clip_labels(image_paths: Sequence[str], candidate_labels: List[str], batch_size: int = CLIP_BATCH_SIZE) -> List[Tuple[str, float]]:
+    """
+    Birden çok görseli sınırlı boyutlu batch'ler halinde kodlar ve hepsini
+    tek seferde hesaplanan etiket özniteliklerine göre puanlar.
+    """
+    if not candidate_labels:
+        return [("", 0.0) for _ in image_paths]
+    return score_image_features(encode_images(image_paths, batch_size), candidate_labels)
+
+def crop_boxes(image: Image.Image, boxes: Sequence[Sequence[float]]) -> List[Image.Image]:
+    # Kutular piksel cinsinden (x1, y1, x2, y2); görsel sınırlarına kırpılır
+    width, height = image.size
+    crops = []
+    for x1, y1, x2, y2 in boxes:
+        x1, y1 = min(max(0, int(x1)), width - 1), min(max(0, int(y1)), height - 1)
+        x2, y2 = min(width, max(int(x2), x1 + 1)), min(height, max(int(y2), y1 + 1))
+        crops.append(image.crop((x1, y1, x2, y2)))
+    return crops
 
-    with torch.no_grad():
-        image_features = model.encode_image(image_input)
-        text_features = model.encode_text(text_tokens)
-        logits_per_image = (image_features @ text_features.T).squeeze()
-        probs = logits_per_image.softmax(dim=0).tolist()
-        # Ensure probs is always a list, even for a single label
-        if isinstance(probs, float):
-            probs = [probs]
+def suggest_clip_labels_for_crops(image: Image.Image, boxes: Sequence[Sequence[float]], candidate_labels: List[str], batch_size: int = CLIP_BATCH_SIZE) -> List[Tuple[str, float]]:
+    """
+    Bellekte çözülmüş tek bir görselden kutu bölgelerini kırpar ve tüm kırpıntıları
+    batch halinde puanlar; geçici dosya yazılmaz.
+    """
+    if not candidate_labels or not boxes:
+        return [("", 0.0) for _ in boxes]
+    crops = crop_boxes(image.convert("RGB"), boxes)
+    return score_image_features(encode_images(crops, batch_size), candidate_labels)
 
-    best_idx = max(range(len(probs)), key=lambda i: probs[i])
-    return candidate_labels[best_idx], probs[best_idx]
+def open_for_crops(image_path: str, boxes: Sequence[Sequence[float]], resolution: int = 224) -> Tuple[Image.Image, List[List[float]]]:
+    """
+    Görseli kırpma için bir kez çözer. JPEG'lerde en küçük kutu CLIP çözünürlüğünün
+    altına düşmeyecek kadar küçültülmüş (draft) çözme kullanılır; kutular çözülen
+    boyuta ölçeklenmiş olarak döner.
+    """
+    img = open_image(image_path)
+    width, height = img.size
+    min_size = None
+    if boxes:
+        min_side = min(min(x2 - x1, y2 - y1) for x1, y1, x2, y2 in boxes)
+        scale = max(1.0, min_side / resolution)
+        min_size = (width / scale, height / scale)
+    decoded = decode(img, min_size).image
+    sx, sy = decoded.size[0] / width, decoded.size[1] / height
+    return decoded, [[x1 * sx, y1 * sy, x2 * sx, y2 * sy] for x1, y1, x2, y2 in boxes]
+
+def suggest_labels_for_boxes(image_path: str, boxes: Sequence[Sequence[float]], candidate_labels: List[str], k: int = 3) -> List[List[Tuple[str, float]]]:
+    """
+    Tek çözümden kırpılan tüm kutu bölgelerini tek CLIP batch'inde kodlar ve
+    her kutu için en olası `k` etiketi döndürür. Kutular piksel cinsinden (x1, y1, x2, y2).
+    """
+    if not candidate_labels or not boxes:
+        return [[] for _ in boxes]
+    img, scaled = open_for_crops(image_path, boxes)
+    return top_k_labels(encode_images(crop_boxes(img, scaled), max(CLIP_BATCH_SIZE, len(scaled))), candidate_labels, k)
+
+def relevance_from_features(image_features: np.ndarray, candidate_labels: List[str], threshold: float = 0.7) -> List[tuple[bool, float, str]]:
+    if not candidate_labels:
+        return [(True, 1.0, "") for _ in range(len(image_features))]
+    return [
+        (best_score >= threshold, best_score, best_label)
+        for best_label, best_score in score_image_features(image_features, candidate_labels)
+    ]
 
 def is_image_relevant(image_path: str, candidate_labels: List[str], threshold: float = 0.7) -> tuple[bool, float, str]:
     if not candidate_labels:
         return True, 1.0, ""
+    # En iyi etiket/puan eşikten bağımsız önbelleklenir; eşik sonuca burada uygulanır
     best_label, best_score = suggest_clip_label(image_path, candidate_labels)
     return best_score >= threshold, best_score, best_label
+
+def are_images_relevant(image_paths: Sequence[str], candidate_labels: List[str], threshold: float = 0.7) -> List[tuple[bool, float, str]]:
+    if not candidate_labels:
+        return [(True, 1.0, "") for _ in image_paths]
+    return relevance_from_features(encode_images(image_paths), candidate_labels, threshold)
+
+def warmup():
+    """Modeli yükler ve küçük bir ileri geçişle çekirdekleri ısıtır."""
+    encode_images([Image.new("RGB", (224, 224))])
+    encode_text(["warmup"])
@@ -0,0 +1,86 @@
+import json
+import os
+import threading
+from typing import Optional, Sequence, Union
+
+import numpy as np
+from PIL import Image
+
+from app.core.config import CLIP_BACKEND, CLIP_ONNX_DIR, CLIP_BATCH_SIZE
+from app.services.clip_tokenizer import SimpleTokenizer
+from app.services.preprocessing import clip_batch, decode_for_clip
+from app.services.onnx_pool import get_session_pool
+
+VISUAL_FILE = "visual.onnx"
+TEXT_FILE = "text.onnx"
+VOCAB_FILE = "bpe_simple_vocab_16e6.txt.gz"
+META_FILE = "meta.json"
+
+
+def quantized_name(filename: str) -> str:
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}.int8{ext}"
+
+
+class ClipOnnxEncoder:
+    """
+    scripts/export_clip_onnx.py ile üretilen görsel/metin kodlayıcılarını onnxruntime ile çalıştırır.
+    """
+
+    def __init__(self, model_dir: str = CLIP_ONNX_DIR, quantized: bool = False):
+        self.model_dir = model_dir
+        self.quantized = quantized
+        with open(os.path.join(model_dir, META_FILE), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.resolution = int(self.meta["input_resolution"])
+        self.context_length = int(self.meta["context_length"])
+        self.logit_scale = float(self.meta["logit_scale"])
+        self.tokenizer = SimpleTokenizer(os.path.join(model_dir, VOCAB_FILE))
+        self.visual = get_session_pool(self._path(VISUAL_FILE))
+        self.text = get_session_pool(self._path(TEXT_FILE))
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.model_dir, quantized_name(filename) if self.quantized else filename)
+
+    def preprocess(self, images: Sequence[Union[str, Image.Image]]) -> np.ndarray:
+        return clip_batch([decode_for_clip(item, self.resolution) for item in images], self.resolution)
+
+    def encode_pixels(self, pixels: np.ndarray) -> np.ndarray:
+        """Ön işlenmiş (N, 3, H, W) girdiyi tek ileri geçişte kodlar."""
+        if len(pixels) == 0:
+            return np.empty((0, int(self.meta["embed_dim"])), dtype=np.float32)
+        return self.visual.run(np.ascontiguousarray(pixels, dtype=np.float32))[0].astype(np.float32)
+
+    def encode_images(self, images: Sequence[Union[str, Image.Image]], batch_size: int = CLIP_BATCH_SIZE) -> np.ndarray:
+        chunks = [
+            self.encode_pixels(self.preprocess(images[start:start + batch_size]))
+            for start in range(0, len(images), batch_size)
+        ]
+        if not chunks:
+            return self.encode_pixels(self.preprocess([]))
+        return np.concatenate(chunks, axis=0)
+
+    def encode_text(self, texts: Sequence[str]) -> np.ndarray:
+        tokens = self.tokenizer.tokenize(list(texts), self.context_length)
+        return self.text.run(tokens)[0].astype(np.float32)
+
+
+_encoder: Optional[ClipOnnxEncoder] = None
+_encoder_lock = threading.Lock()
+
+
+def embed_dim() -> int:
+    # Boş girdinin şekli için oturumlar açılmadan yalnızca meta.json okunur
+    if _encoder is not None:
+        return int(_encoder.meta["embed_dim"])
+    with open(os.path.join(CLIP_ONNX_DIR, META_FILE), encoding="utf-8") as f:
+        return int(json.load(f)["embed_dim"])
+
+
+def get_encoder() -> ClipOnnxEncoder:
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                _encoder = ClipOnnxEncoder(CLIP_ONNX_DIR, quantized=(CLIP_BACKEND == "onnx-int8"))
+    return _encoder
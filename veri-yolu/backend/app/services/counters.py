@@ -0,0 +1,92 @@
+"""
+Sık okunan toplamlar için denormalize sayaç sütunları.
+
+Sayaçlar yazma uçlarında, kaynağı değiştiren işlemle aynı transaction içinde atomik
+`UPDATE ... SET c = c + n` ile güncellenir; okuma uçları COUNT(*) çalıştırmaz.
+reconcile_counters() sayaçları kaynak tablolardan yeniden hesaplayıp sapmayı raporlar
+(istenirse düzeltir).
+"""
+from typing import Dict, List, NamedTuple
+
+from sqlalchemy import func, inspect, update
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.models.annotation import Annotation
+from app.models.discussion import DiscussionPost, DiscussionPostBlock, DiscussionPostVote, DiscussionThread
+from app.models.image import Image
+from app.models.topic import Topic
+from app.models.user import User
+from app.services.topic_metrics import TopicDownload, TopicView
+
+
+def increment(session: Session, model, row_id: int, column: str, delta: int = 1) -> None:
+    """Sayaç sütununu yarış koşulsuz artırır/azaltır; commit çağıranın transaction'ıyla yapılır."""
+    if not delta:
+        return
+    col = getattr(model, column)
+    session.exec(update(model).where(model.id == row_id).values({column: col + delta}))
+
+
+class Counter(NamedTuple):
+    name: str
+    model: type
+    column: str
+    source: object  # sayaç sahibinin id'sine bağlı (korelasyonlu) skaler alt sorgu
+
+
+def _counters() -> List[Counter]:
+    return [
+        Counter("image.annotation_count", Image, "annotation_count",
+                select(func.count(Annotation.id)).where(Annotation.image_id == Image.id).scalar_subquery()),
+        Counter("post.score", DiscussionPost, "score",
+                select(func.coalesce(func.sum(DiscussionPostVote.value), 0))
+                .where(DiscussionPostVote.post_id == DiscussionPost.id).scalar_subquery()),
+        Counter("post.block_count", DiscussionPost, "block_count",
+                select(func.count(DiscussionPostBlock.id))
+                .where(DiscussionPostBlock.post_id == DiscussionPost.id).scalar_subquery()),
+        Counter("topic.view_count", Topic, "view_count",
+                select(func.count()).select_from(TopicView).where(TopicView.topic_id == Topic.id).scalar_subquery()),
+        Counter("topic.download_count", Topic, "download_count",
+                select(func.count()).select_from(TopicDownload).where(TopicDownload.topic_id == Topic.id).scalar_subquery()),
+        Counter("user.post_count", User, "post_count",
+                select(func.count(DiscussionPost.id)).where(DiscussionPost.author_id == User.id).scalar_subquery()),
+        Counter("user.thread_count", User, "thread_count",
+                select(func.count(DiscussionThread.id)).where(DiscussionThread.author_id == User.id).scalar_subquery()),
+    ]
+
+
+def reconcile_counters(session: Session, fix: bool = False, sample: int = 20) -> Dict[str, dict]:
+    """
+    Her sayacı kaynak tablolardan hesaplanan değerle karşılaştırır. Dönen rapor sayaç
+    başına sapan satır sayısını ve en fazla `sample` örneği içerir; `fix` verilirse
+    sapan satırlar düzeltilir.
+    """
+    report: Dict[str, dict] = {}
+    for counter in _counters():
+        stored = getattr(counter.model, counter.column)
+        drifted = stored != counter.source
+        rows = session.exec(
+            select(counter.model.id, stored, counter.source).where(drifted).order_by(counter.model.id)
+        ).all()
+        report[counter.name] = {
+            "drifted": len(rows),
+            "samples": [{"id": row_id, "stored": value, "actual": actual} for row_id, value, actual in rows[:sample]],
+        }
+        if fix and rows:
+            session.exec(update(counter.model).where(drifted).values({counter.column: counter.source}))
+    if fix:
+        session.commit()
+    return report
+
+
+def counters_need_backfill(engine: Engine) -> bool:
+    """Sayaç sütunlarından biri (ya da tablosu) henüz yoksa True; create_all'dan önce çağrılır."""
+    inspector = inspect(engine)
+    for counter in _counters():
+        table = counter.model.__tablename__
+        if not inspector.has_table(table):
+            return True
+        if counter.column not in {c["name"] for c in inspector.get_columns(table)}:
+            return True
+    return False
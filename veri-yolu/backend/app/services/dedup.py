@@ -0,0 +1,154 @@
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image as PILImage
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.models.image import Image
+
+HASH_SIZE = 8  # 64 bit dHash
+
+
+def dhash(image: Union[str, PILImage.Image], hash_size: int = HASH_SIZE) -> int:
+    """
+    Fark hash'i (dHash): gri tonlamalı (hash_size+1)x(hash_size) küçük görselde
+    yatay komşu piksellerin karşılaştırılması. JPEG'ler küçültülmüş (draft) çözülür.
+    """
+    img = image if isinstance(image, PILImage.Image) else PILImage.open(image)
+    if img.format == "JPEG":
+        img.draft("L", (hash_size * 8, hash_size * 8))
+    small = img.convert("L").resize((hash_size + 1, hash_size), PILImage.BILINEAR)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def to_signed64(value: int) -> int:
+    # Postgres BIGINT işaretli olduğu için 64 bitlik hash işaretli tamsayı olarak saklanır
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def to_unsigned64(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """
+    Hamming mesafesi için BK-ağacı; üçgen eşitsizliği sayesinde yarıçap
+    sorgularında ağacın yalnızca küçük bir kısmı gezilir.
+    """
+
+    def __init__(self):
+        self._root: Optional[list] = None  # [hash, [öğeler], {mesafe: alt düğüm}]
+        self.size = 0
+
+    def add(self, value: int, item) -> None:
+        self.size += 1
+        if self._root is None:
+            self._root = [value, [item], {}]
+            return
+        node = self._root
+        while True:
+            dist = hamming(value, node[0])
+            if dist == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(dist)
+            if child is None:
+                node[2][dist] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, object]]:
+        if self._root is None:
+            return []
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            dist = hamming(value, node[0])
+            if dist <= max_distance:
+                found.extend((dist, item) for item in node[1])
+            for child_dist, child in node[2].items():
+                if dist - max_distance <= child_dist <= dist + max_distance:
+                    stack.append(child)
+        found.sort(key=lambda pair: pair[0])
+        return found
+
+
+class TopicHashIndex:
+    """
+    Bir konunun görsel hash'lerinin süreç içi indeksi. Diğer işçilerin eklediği
+    görseller her sorguda artımlı olarak okunur.
+
+    Postgres'te id'ler commit'ten önce dağıtılır: daha küçük id'li bir satır, daha büyük
+    id'li satır görüldükten sonra commit edilebilir. Bu yüzden artımlı okuma son görülen
+    id'nin REFRESH_WINDOW altından başlar; daha uzun süren geç commit'ler (ve silinen
+    görseller) satır sayısı indeksle tutmadığında tam yeniden kurulumla yakalanır.
+    """
+
+    REFRESH_WINDOW = 1000
+
+    def __init__(self, topic_id: int):
+        self.topic_id = topic_id
+        self.tree = BKTree()
+        self.last_id = 0
+        self._ids = set()
+        self._lock = threading.Lock()
+
+    def _hashed(self):
+        return (Image.topic_id == self.topic_id) & (Image.dhash.is_not(None))
+
+    def _add_rows(self, rows) -> None:
+        for image_id, value in rows:
+            if image_id not in self._ids:
+                self._ids.add(image_id)
+                self.tree.add(to_unsigned64(value), image_id)
+                self.last_id = max(self.last_id, image_id)
+
+    def refresh(self, session: Session) -> None:
+        rows = session.exec(
+            select(Image.id, Image.dhash).where(
+                self._hashed() & (Image.id > self.last_id - self.REFRESH_WINDOW)
+            ).order_by(Image.id)
+        ).all()
+        total = session.exec(select(func.count()).select_from(Image).where(self._hashed())).one()
+        with self._lock:
+            self._add_rows(rows)
+            if total == len(self._ids):
+                return
+        rows = session.exec(select(Image.id, Image.dhash).where(self._hashed()).order_by(Image.id)).all()
+        with self._lock:
+            self.tree, self._ids, self.last_id = BKTree(), set(), 0
+            self._add_rows(rows)
+
+    def find(self, session: Session, value: int, max_distance: int) -> Optional[int]:
+        self.refresh(session)
+        with self._lock:
+            matches = self.tree.search(value, max_distance)
+        for _, image_id in matches:
+            # İndeks silinen görselleri tutmaya devam eder; varlığını doğrula
+            if session.get(Image, image_id) is not None:
+                return image_id
+        return None
+
+
+_indexes: Dict[int, TopicHashIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_topic_index(topic_id: int) -> TopicHashIndex:
+    index = _indexes.get(topic_id)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.setdefault(topic_id, TopicHashIndex(topic_id))
+    return index
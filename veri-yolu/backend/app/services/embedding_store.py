@@ -0,0 +1,57 @@
+from typing import Dict, Sequence
+
+import numpy as np
+from sqlmodel import Session, select
+
+from app.core.config import CLIP_MODEL_ID
+from app.models.image_embedding import ImageEmbedding
+
+EMBEDDING_DTYPE = np.float16
+
+
+def save_embeddings(session: Session, image_ids: Sequence[int], features: np.ndarray, model_name: str = CLIP_MODEL_ID):
+    """
+    Görsel özniteliklerini float16 olarak saklar; commit çağırana bırakılır.
+    """
+    for image_id, vector in zip(image_ids, features):
+        session.merge(ImageEmbedding(
+            image_id=image_id,
+            model=model_name,
+            vector=np.asarray(vector, dtype=EMBEDDING_DTYPE).tobytes(),
+        ))
+
+
+def load_embeddings(session: Session, image_ids: Sequence[int], model_name: str = CLIP_MODEL_ID) -> Dict[int, np.ndarray]:
+    if not image_ids:
+        return {}
+    rows = session.exec(
+        select(ImageEmbedding.image_id, ImageEmbedding.vector).where(
+            (ImageEmbedding.model == model_name) & (ImageEmbedding.image_id.in_(list(image_ids)))
+        )
+    ).all()
+    return {image_id: np.frombuffer(vector, dtype=EMBEDDING_DTYPE).astype(np.float32) for image_id, vector in rows}
+
+
+def delete_embeddings(session: Session, image_id: int):
+    for row in session.exec(select(ImageEmbedding).where(ImageEmbedding.image_id == image_id)).all():
+        session.delete(row)
+
+
+def get_or_compute_features(session: Session, image_ids: Sequence[int], paths: Sequence[str], model_name: str = CLIP_MODEL_ID) -> np.ndarray:
+    """
+    Kayıtlı öznitelikleri kullanır, eksik olanları CLIP ile hesaplayıp saklar.
+    Sonuç (N, D) matrisi image_ids sırasındadır.
+    """
+    from app.services.clip_labeler import encode_images
+
+    stored = load_embeddings(session, image_ids, model_name)
+    missing = [i for i, image_id in enumerate(image_ids) if image_id not in stored]
+    if missing:
+        computed = encode_images([paths[i] for i in missing])
+        save_embeddings(session, [image_ids[i] for i in missing], computed, model_name)
+        session.commit()
+        for i, vector in zip(missing, computed):
+            stored[image_ids[i]] = vector
+    if not image_ids:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.stack([stored[image_id] for image_id in image_ids]).astype(np.float32)
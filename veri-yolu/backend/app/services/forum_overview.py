@@ -0,0 +1,95 @@
+from typing import Dict, List
+
+from sqlalchemy import and_, case, desc, func, literal, union_all
+from sqlmodel import Session, select
+
+from app.core.config import FORUM_OVERVIEW_TTL, FORUM_PARTICIPANT_AVATARS
+from app.models.discussion import Forum, DiscussionThread, DiscussionPost
+from app.models.user import User
+from app.utils.cache import LRUCache
+
+# Tek kayıtlık önbellek; yazma uçları invalidate_forum_overview() çağırır. Birden çok
+# süreçte diğer süreçlerin kopyaları en geç TTL sonunda yenilenir.
+_cache = LRUCache(maxsize=1, ttl=FORUM_OVERVIEW_TTL)
+_KEY = "forums"
+
+
+def invalidate_forum_overview() -> None:
+    _cache.discard(_KEY)
+
+
+def forum_overview(session: Session) -> List[dict]:
+    return _cache.get_or_set(_KEY, lambda: _compute(session))
+
+
+def _compute(session: Session) -> List[dict]:
+    """
+    Tüm forumların özeti tek sorguda: konu/gönderi sayıları, son etkinlik zamanı ve
+    en son etkin (profil fotoğrafı olan) ilk N katılımcı (ROW_NUMBER penceresiyle).
+    """
+    # Forum başına etkinlik: başlık açma ve gönderi yazma
+    activity = union_all(
+        select(
+            DiscussionThread.forum_id, DiscussionThread.author_id.label("user_id"),
+            DiscussionThread.created_at.label("at"), literal(1).label("is_thread"),
+        ),
+        select(
+            DiscussionThread.forum_id, DiscussionPost.author_id.label("user_id"),
+            DiscussionPost.created_at.label("at"), literal(0).label("is_thread"),
+        ).join(DiscussionThread, DiscussionThread.id == DiscussionPost.thread_id),
+    ).subquery()
+
+    stats = (
+        select(
+            activity.c.forum_id,
+            func.sum(activity.c.is_thread).label("thread_count"),
+            func.sum(case((activity.c.is_thread == 0, 1), else_=0)).label("post_count"),
+            func.max(activity.c.at).label("last_activity"),
+        )
+        .group_by(activity.c.forum_id)
+        .subquery()
+    )
+
+    participants = (
+        select(activity.c.forum_id, activity.c.user_id, func.max(activity.c.at).label("last_at"))
+        .group_by(activity.c.forum_id, activity.c.user_id)
+        .subquery()
+    )
+    ranked = (
+        select(
+            participants.c.forum_id,
+            User.profile_image,
+            func.row_number().over(
+                partition_by=participants.c.forum_id,
+                order_by=(desc(participants.c.last_at), participants.c.user_id),
+            ).label("rank"),
+        )
+        .join(User, User.id == participants.c.user_id)
+        .where(User.profile_image.is_not(None))
+        .subquery()
+    )
+
+    rows = session.exec(
+        select(Forum, stats.c.thread_count, stats.c.post_count, stats.c.last_activity, ranked.c.profile_image)
+        .outerjoin(stats, stats.c.forum_id == Forum.id)
+        .outerjoin(ranked, and_(ranked.c.forum_id == Forum.id, ranked.c.rank <= FORUM_PARTICIPANT_AVATARS))
+        .order_by(Forum.id, ranked.c.rank)
+    ).all()
+
+    overview: Dict[int, dict] = {}
+    for forum, thread_count, post_count, last_activity, profile_image in rows:
+        item = overview.get(forum.id)
+        if item is None:
+            item = overview[forum.id] = {
+                "id": forum.id,
+                "name": forum.name,
+                "description": forum.description,
+                "topic_id": forum.topic_id,
+                "thread_count": int(thread_count or 0),
+                "post_count": int(post_count or 0),
+                "last_activity": last_activity.isoformat() if last_activity else None,
+                "participant_avatars": [],
+            }
+        if profile_image:
+            item["participant_avatars"].append(f"/uploaded_images/{profile_image}")
+    return list(overview.values())
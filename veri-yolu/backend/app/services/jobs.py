@@ -0,0 +1,389 @@
+import json
+import multiprocessing
+import os
+import socket
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from app.core.config import JOB_WORKERS, JOB_HEARTBEAT_TIMEOUT, CLIP_BATCH_SIZE
+from app.db.session import engine
+from app.models.image import Image
+from app.models.job import InferenceJob, InferenceJobResult
+from app.models.topic import Topic
+from app.models.user import User
+from app.services import metrics
+
+UPLOAD_DIR = "uploaded_images"
+
+ACTIVE_STATUSES = ("queued", "running")
+FINAL_STATUSES = ("completed", "failed", "cancelled")
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # fork yerine spawn: işçiler model/iş parçacığı durumunu API sürecinden devralmaz
+                _executor = ProcessPoolExecutor(
+                    max_workers=max(1, JOB_WORKERS),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+
+def _reset_executor(broken: ProcessPoolExecutor) -> None:
+    # Bir işçinin ölmesi (OOM, yerel kütüphanede çökme) havuzu kalıcı olarak bozar;
+    # referans bırakılır, sonraki gönderim yeni bir havuz kurar
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+
+
+def create_job(session: Session, kind: str, user_id: int, topic_id: Optional[int] = None, total: int = 0) -> InferenceJob:
+    """
+    İş kaydını oluşturur ama kuyruğa almaz; ilişkili satırlar aynı işlemde eklenebilsin diye
+    commit çağırana bırakılır. Commit sonrası enqueue_job çağrılmalıdır.
+    """
+    job = InferenceJob(kind=kind, topic_id=topic_id, user_id=user_id, total=total)
+    session.add(job)
+    session.flush()
+    return job
+
+
+def enqueue_job(job_id: int, lost_retries: int = 1) -> Future:
+    """
+    İşi havuza gönderir. Havuz bozuksa yenisi kurulup bir kez daha denenir. İş, havuz
+    çalışırken bozulduğu için kaybolursa `lost_retries` kez yeniden kuyruğa alınır.
+    """
+    executor = _get_executor()
+    try:
+        future = executor.submit(run_job, job_id)
+    except BrokenProcessPool:
+        _reset_executor(executor)
+        executor = _get_executor()
+        future = executor.submit(run_job, job_id)
+    future.add_done_callback(lambda f: _on_job_done(f, executor, job_id, lost_retries))
+    return future
+
+
+def _on_job_done(future: Future, executor: ProcessPoolExecutor, job_id: int, lost_retries: int):
+    if future.cancelled() or not isinstance(future.exception(), BrokenProcessPool):
+        return
+    _reset_executor(executor)
+    _handle_lost_job(job_id, lost_retries)
+
+
+def _handle_lost_job(job_id: int, lost_retries: int):
+    """
+    Bozulan havuzdaki işçilerin hepsi sonlandırıldığı için iş sahipsiz kalmıştır. Hakkı
+    varsa kuyruğa geri alınır; yoksa (işçiyi düşüren iş olabilir) başarısız sayılır.
+    """
+    if lost_retries > 0:
+        values = dict(status="queued", owner=None)
+    else:
+        values = dict(status="failed", error="İşçi süreci beklenmedik şekilde sonlandı.", finished_at=datetime.utcnow())
+    with Session(engine) as session:
+        changed = session.exec(
+            update(InferenceJob)
+            .where((InferenceJob.id == job_id) & InferenceJob.status.in_(ACTIVE_STATUSES))
+            .values(**values)
+        ).rowcount
+        session.commit()
+    if changed and lost_retries > 0:
+        enqueue_job(job_id, lost_retries - 1)
+
+
+def submit_job(session: Session, kind: str, user_id: int, topic_id: Optional[int] = None) -> InferenceJob:
+    job = create_job(session, kind, user_id=user_id, topic_id=topic_id)
+    session.commit()
+    session.refresh(job)
+    enqueue_job(job.id)
+    return job
+
+
+def request_cancel(session: Session, job: InferenceJob) -> InferenceJob:
+    if job.status in FINAL_STATUSES:
+        return job
+    job.cancel_requested = True
+    if job.status == "queued":
+        job.status = "cancelled"
+        job.finished_at = datetime.utcnow()
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    return job
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_alive(owner: Optional[str], heartbeat_at: Optional[datetime], now: datetime) -> bool:
+    """
+    Sahip bu makinedeki ölü bir süreçse iş hemen devralınır. Aksi halde (başka makine,
+    ya da yeniden başlatmadan sonra aynı PID'i almış başka bir süreç) son canlılık
+    bildiriminin JOB_HEARTBEAT_TIMEOUT'tan yeni olması gerekir.
+    """
+    if owner:
+        host, _, pid = owner.rpartition(":")
+        if host == socket.gethostname() and pid.isdigit():
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                return False
+            except PermissionError:
+                pass
+    return heartbeat_at is not None and now - heartbeat_at < timedelta(seconds=JOB_HEARTBEAT_TIMEOUT)
+
+
+def recover_jobs():
+    """
+    Yeniden başlatma sonrası sahibi kalmamış işleri kuyruğa geri alır; işçi, sonucu
+    zaten kaydedilmiş görselleri atlayarak kaldığı yerden devam eder.
+
+    Birden çok API süreci ya da kopya aynı veritabanını paylaşabildiği için yalnızca
+    sahibi ölmüş (ya da canlılık bildirimi JOB_HEARTBEAT_TIMEOUT'u aşmış) 'running' işler
+    devralınır. 'queued' işler yeniden gönderilir; run_job'daki atomik sahiplenme
+    sayesinde başka bir süreç onları zaten almışsa bu gönderim hiçbir şey yapmaz.
+    """
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        jobs = session.exec(select(InferenceJob).where(InferenceJob.status.in_(ACTIVE_STATUSES))).all()
+        job_ids = []
+        for job in jobs:
+            if job.status == "queued":
+                job_ids.append(job.id)
+                continue
+            if _owner_alive(job.owner, job.heartbeat_at, now):
+                continue
+            # Karar verildikten sonra sahibi bildirimde bulunduysa iş ona kalır
+            reclaimed = session.exec(
+                update(InferenceJob)
+                .where(
+                    (InferenceJob.id == job.id)
+                    & (InferenceJob.status == "running")
+                    & (InferenceJob.owner == job.owner if job.owner is not None else InferenceJob.owner.is_(None))
+                    & (InferenceJob.heartbeat_at == job.heartbeat_at if job.heartbeat_at is not None
+                       else InferenceJob.heartbeat_at.is_(None))
+                )
+                .values(status="queued", owner=None)
+            ).rowcount
+            if reclaimed:
+                job_ids.append(job.id)
+        session.commit()
+    for job_id in job_ids:
+        enqueue_job(job_id)
+
+
+def job_progress(job: InferenceJob) -> dict:
+    elapsed = None
+    throughput = None
+    eta = None
+    if job.started_at:
+        end = job.finished_at or datetime.utcnow()
+        elapsed = max((end - job.started_at).total_seconds(), 0.0)
+        if elapsed > 0 and job.done:
+            throughput = job.done / elapsed
+            if job.status == "running":
+                eta = (job.total - job.done) / throughput
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "topic_id": job.topic_id,
+        "status": job.status,
+        "done": job.done,
+        "total": job.total,
+        "elapsed_seconds": elapsed,
+        "images_per_second": throughput,
+        "eta_seconds": eta,
+        "error": job.error,
+        "output_path": job.output_path,
+        "stage_timings": json.loads(job.stage_timings) if job.stage_timings else None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+# === İşçi süreci ===
+
+def run_job(job_id: int):
+    with Session(engine) as session:
+        claimed = session.exec(
+            update(InferenceJob)
+            .where((InferenceJob.id == job_id) & (InferenceJob.status == "queued"))
+            .values(status="running", owner=_worker_id(), heartbeat_at=datetime.utcnow())
+        ).rowcount
+        session.commit()
+        if not claimed:
+            return
+        job = session.get(InferenceJob, job_id)
+        if job.started_at is None:
+            job.started_at = datetime.utcnow()
+        session.add(job)
+        session.commit()
+        # İşçi süreci aynı anda tek iş çalıştırır; bu süredeki tüm aşama süreleri işe yazılır
+        with metrics.capture() as recorder:
+            try:
+                if job.kind == "auto_annotate":
+                    _run_auto_annotate(session, job)
+                elif job.kind == "ingest":
+                    _run_ingest(session, job)
+                else:
+                    raise ValueError(f"Bilinmeyen iş türü: {job.kind}")
+            except Exception as e:
+                session.rollback()
+                job = session.get(InferenceJob, job_id)
+                job.status = "failed"
+                job.error = str(e)
+                job.finished_at = datetime.utcnow()
+                session.add(job)
+                session.commit()
+        job = session.get(InferenceJob, job_id)
+        job.stage_timings = json.dumps(recorder.snapshot())
+        session.add(job)
+        session.commit()
+
+
+def _check_in(session: Session, job_id: int) -> bool:
+    """
+    Canlılık bildirimini günceller (sonraki commit ile yazılır) ve iptal istenip
+    istenmediğini döndürür; tek UPDATE ... RETURNING.
+    """
+    with metrics.span("db.cancel_check"):
+        return bool(session.exec(
+            update(InferenceJob)
+            .where(InferenceJob.id == job_id)
+            .values(heartbeat_at=datetime.utcnow())
+            .returning(InferenceJob.cancel_requested)
+        ).scalar_one())
+
+
+def _finish(session: Session, job: InferenceJob, status: str):
+    job.status = status
+    job.finished_at = datetime.utcnow()
+    session.add(job)
+    session.commit()
+
+
+def _run_auto_annotate(session: Session, job: InferenceJob):
+    from app.services.auto_annotate import annotate_image, write_export
+    from app.services.quality import check_quality
+
+    topic = session.get(Topic, job.topic_id)
+    if not topic:
+        raise ValueError("Konu bulunamadı.")
+    candidate_labels = topic.get_candidate_labels()
+    images = session.exec(select(Image).where(Image.topic_id == job.topic_id).order_by(Image.id)).all()
+    processed = set(session.exec(
+        select(InferenceJobResult.image_id).where(InferenceJobResult.job_id == job.id)
+    ).all())
+
+    job.total = len(images)
+    job.done = len(processed)
+    session.add(job)
+    session.commit()
+
+    for image in images:
+        if image.id in processed:
+            continue
+        if _check_in(session, job.id):
+            _finish(session, job, "cancelled")
+            return
+        image_path = os.path.join(UPLOAD_DIR, image.filename)
+        # Kalite yalnızca hiç denetlenmemiş (filtreden önce yüklenmiş) görseller için hesaplanır ve
+        # saklanır; yüklemede denetlenenler yeniden çözülmez. Takılanlar YOLO'ya gönderilmez.
+        if not image.quality_checked and image.quality_reason is None:
+            quality = check_quality(image_path)
+            if quality.checked:
+                image.quality_reason = quality.reason
+                image.quality_checked = True
+                session.add(image)
+        quality_reason = image.quality_reason
+        payload = {
+            "image_id": image.filename,
+            "annotations": annotate_image(image_path, candidate_labels) if quality_reason is None else [],
+        }
+        if quality_reason is not None:
+            payload["skipped"] = quality_reason
+        session.add(InferenceJobResult(job_id=job.id, image_id=image.id, payload=json.dumps(payload, ensure_ascii=False)))
+        job.done += 1
+        session.add(job)
+        with metrics.span("db.commit"):
+            session.commit()
+
+    with metrics.span("db.read_results"):
+        rows = session.exec(
+            select(InferenceJobResult.payload).where(InferenceJobResult.job_id == job.id).order_by(InferenceJobResult.id)
+        ).all()
+    with metrics.span("disk.write_export"):
+        job.output_path = write_export(topic.id, topic.title, candidate_labels, [json.loads(r) for r in rows])
+    _finish(session, job, "completed")
+
+
+def _run_ingest(session: Session, job: InferenceJob):
+    from app.services.clip_labeler import encode_images, relevance_from_features
+    from app.services.embedding_store import save_embeddings
+
+    topic = session.get(Topic, job.topic_id)
+    if not topic:
+        raise ValueError("Konu bulunamadı.")
+    candidate_labels = topic.get_candidate_labels()
+    images = session.exec(select(Image).where(Image.ingest_job_id == job.id).order_by(Image.id)).all()
+    processed = set(session.exec(
+        select(InferenceJobResult.image_id).where(InferenceJobResult.job_id == job.id)
+    ).all())
+    pending = [img for img in images if img.id not in processed]
+
+    job.total = len(images)
+    job.done = len(processed)
+    session.add(job)
+    session.commit()
+
+    for start in range(0, len(pending), CLIP_BATCH_SIZE):
+        if _check_in(session, job.id):
+            _finish(session, job, "cancelled")
+            return
+        batch = pending[start:start + CLIP_BATCH_SIZE]
+        paths = [os.path.join(UPLOAD_DIR, img.filename) for img in batch]
+        features = encode_images(paths)
+        scores = relevance_from_features(features, candidate_labels)
+        save_embeddings(session, [img.id for img in batch], features)
+        for img, (is_relevant, ai_score, auto_label) in zip(batch, scores):
+            img.is_relevant = is_relevant
+            img.ai_score = ai_score
+            img.auto_label = auto_label
+            img.status = "approved" if is_relevant else "pending"
+            img.points_awarded = 5 if is_relevant else 0
+            session.add(img)
+            if img.points_awarded:
+                session.exec(
+                    update(User).where(User.id == img.uploader_id).values(points=User.points + img.points_awarded)
+                )
+            payload = {
+                "image_id": img.id,
+                "filename": img.filename,
+                "is_relevant": is_relevant,
+                "ai_score": ai_score,
+                "auto_label": auto_label,
+                "status": img.status,
+                "points_awarded": img.points_awarded,
+            }
+            session.add(InferenceJobResult(job_id=job.id, image_id=img.id, payload=json.dumps(payload, ensure_ascii=False)))
+        job.done += len(batch)
+        session.add(job)
+        with metrics.span("db.commit"):
+            session.commit()
+
+    _finish(session, job, "completed")
@@ -0,0 +1,19 @@
+from typing import Sequence, Tuple
+
+from app.core.config import TEXT_FEATURE_CACHE_SIZE
+from app.utils.cache import LRUCache, labels_hash
+
+# (model adı, etiket kümesi hash'i) -> normalize edilmiş metin öznitelikleri
+text_feature_cache = LRUCache(maxsize=TEXT_FEATURE_CACHE_SIZE)
+
+
+def text_cache_key(model_name: str, labels: Sequence[str]) -> Tuple[str, str]:
+    return model_name, labels_hash(labels)
+
+
+def invalidate_label_set(labels: Sequence[str]) -> int:
+    """
+    Verilen etiket kümesine ait tüm modellerin önbellek kayıtlarını siler.
+    """
+    digest = labels_hash(labels)
+    return text_feature_cache.discard_where(lambda key: key[1] == digest)
@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, List
+
+import numpy as np
+
+SAMPLE_SIZE = 1024  # yüzdelikler için aşama başına son örnek sayısı
+
+
+class SpanStats:
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: Deque[float] = deque(maxlen=SAMPLE_SIZE)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    def summary(self) -> dict:
+        samples = np.asarray(self.samples) * 1000.0
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000.0,
+            "mean_ms": self.total * 1000.0 / self.count if self.count else 0.0,
+            "p50_ms": float(np.percentile(samples, 50)) if len(samples) else 0.0,
+            "p95_ms": float(np.percentile(samples, 95)) if len(samples) else 0.0,
+            "max_ms": self.max * 1000.0,
+        }
+
+
+class SpanRecorder:
+    """Aşama adı -> süre istatistikleri; thread-safe."""
+
+    def __init__(self):
+        self._stats: Dict[str, SpanStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = SpanStats()
+            stats.add(seconds)
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {name: stats.summary() for name, stats in sorted(self._stats.items())}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+# Süreç genelindeki kayıt; capture() ile açılan ek kayıtlar (ör. tek bir iş için) aynı anda beslenir
+registry = SpanRecorder()
+_captures: List[SpanRecorder] = []
+_captures_lock = threading.Lock()
+
+
+@contextmanager
+def span(name: str):
+    """
+    Bir aşamanın duvar saati süresini ölçer: `with span("yolo.infer"): ...`
+    Aşama adları "model.aşama" biçimindedir (clip.preprocess, yolo.nms, db.commit ...).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        registry.record(name, elapsed)
+        if _captures:
+            with _captures_lock:
+                for recorder in _captures:
+                    recorder.record(name, elapsed)
+
+
+@contextmanager
+def capture():
+    """Blok süresince kaydedilen tüm aşamaları ayrıca toplar (iş bazında döküm için)."""
+    recorder = SpanRecorder()
+    with _captures_lock:
+        _captures.append(recorder)
+    try:
+        yield recorder
+    finally:
+        with _captures_lock:
+            _captures.remove(recorder)
@@ -0,0 +1,118 @@
+import queue
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from app.core.config import ORT_POOL_SIZE
+from app.services.metrics import span
+from app.services.runtime_profiles import RuntimeProfile, get_profile, ort_session_options
+
+if TYPE_CHECKING:
+    import onnxruntime as ort
+
+
+class OnnxSessionPool:
+    """
+    Tek bir ONNX modeli için sınırlı sayıda sıcak InferenceSession tutar.
+    Oturumlar ihtiyaç oldukça (en fazla `size` adet) oluşturulur ve tekrar kullanılır.
+    """
+
+    def __init__(self, model_path: str, size: int = ORT_POOL_SIZE,
+                 intra_op_threads: Optional[int] = None,
+                 inter_op_threads: Optional[int] = None,
+                 profile: Optional[RuntimeProfile] = None):
+        self.model_path = model_path
+        self.size = max(1, size)
+        # İş parçacığı sayıları verilmezse çalışma zamanı profilinden (RUNTIME_PROFILE) alınır
+        self.profile = profile or get_profile()
+        self.intra_op_threads = intra_op_threads or self.profile.intra_op_threads
+        self.inter_op_threads = inter_op_threads or self.profile.inter_op_threads
+        self._idle: "queue.Queue[ort.InferenceSession]" = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._input_name: Optional[str] = None
+
+    def _new_session(self) -> "ort.InferenceSession":
+        import onnxruntime as ort  # ilk oturumda yüklenir; API açılışını yavaşlatmaz
+
+        opts = ort_session_options(self.profile, self.intra_op_threads, self.inter_op_threads)
+        with span("ort.session_create"):
+            session = ort.InferenceSession(self.model_path, sess_options=opts, providers=["CPUExecutionProvider"])
+        if self._input_name is None:
+            self._input_name = session.get_inputs()[0].name
+        return session
+
+    @contextmanager
+    def acquire(self):
+        try:
+            session = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    session = self._new_session()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                # Havuz dolu: boşa çıkan bir oturumu bekle
+                session = self._idle.get()
+        try:
+            yield session
+        finally:
+            self._idle.put(session)
+
+    @property
+    def input_name(self) -> str:
+        if self._input_name is None:
+            with self.acquire():
+                pass
+        return self._input_name
+
+    def input_shape(self) -> List:
+        with self.acquire() as session:
+            return list(session.get_inputs()[0].shape)
+
+    def run(self, inputs, output_names: Optional[List[str]] = None):
+        """
+        `inputs` tek bir dizi ise modelin ilk girdisine verilir; dict ise olduğu gibi kullanılır.
+        """
+        with self.acquire() as session:
+            feed = inputs if isinstance(inputs, dict) else {self._input_name: inputs}
+            return session.run(output_names, feed)
+
+    def warmup(self):
+        """Havuzdaki tüm oturumları önceden oluşturur."""
+        while True:
+            with self._lock:
+                if self._created >= self.size:
+                    return
+                self._created += 1
+            try:
+                self._idle.put(self._new_session())
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+
+_pools: Dict[str, OnnxSessionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_session_pool(model_path: str) -> OnnxSessionPool:
+    """
+    Süreç genelindeki model kaydı: her model dosyası için tek bir havuz döndürür.
+    """
+    pool = _pools.get(model_path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(model_path)
+            if pool is None:
+                pool = OnnxSessionPool(model_path)
+                _pools[model_path] = pool
+    return pool
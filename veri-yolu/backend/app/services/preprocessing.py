@@ -0,0 +1,170 @@
+"""
+CLIP ve YOLO için ortak, tek çözümlü görsel ön işleme.
+
+- Görsel bir kez açılır; hedef küçükse JPEG'ler küçültülmüş (draft) çözülür.
+- CLIP ve YOLO girdileri aynı RGB tamponundan üretilir.
+- Float dönüşümü ve normalizasyon, iş parçacığına özel önceden ayrılmış NCHW batch
+  tamponlarına yerinde yazılır.
+"""
+import io
+import threading
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from app.services.metrics import span
+
+ImageSource = Union[str, bytes, Image.Image]
+
+# CLIP'in eğitimde kullandığı normalizasyon değerleri
+CLIP_MEAN = np.array([0.48145466, 0.4578275, 0.40821073], dtype=np.float32)
+CLIP_STD = np.array([0.26862954, 0.26130258, 0.27577711], dtype=np.float32)
+# (x / 255 - mean) / std = x * scale - bias; tek çarpma + tek çıkarma
+_CLIP_SCALE = (1.0 / (255.0 * CLIP_STD))[:, None, None]
+_CLIP_BIAS = (CLIP_MEAN / CLIP_STD)[:, None, None]
+
+YOLO_PAD_VALUE = 114
+
+
+class LetterboxMeta(NamedTuple):
+    ratio: float
+    pad_x: float
+    pad_y: float
+    orig_w: int
+    orig_h: int
+
+
+class DecodedImage(NamedTuple):
+    image: Image.Image  # RGB
+    orig_w: int
+    orig_h: int
+
+    @property
+    def scale(self) -> float:
+        # Çözülen boyutun orijinal boyuta oranı (draft çözmede < 1)
+        return self.image.size[0] / self.orig_w
+
+
+def open_image(source: ImageSource) -> Image.Image:
+    """Dosya yolu, bayt dizisi ya da PIL görselini tembel olarak açar (pikseller henüz çözülmez)."""
+    if isinstance(source, Image.Image):
+        return source
+    if isinstance(source, (bytes, bytearray)):
+        return Image.open(io.BytesIO(source))
+    return Image.open(source)
+
+
+def decode(source: ImageSource, min_size: Optional[Tuple[int, int]] = None) -> DecodedImage:
+    """
+    Görseli RGB olarak bir kez çözer. `min_size` (genişlik, yükseklik) verilirse JPEG'ler
+    bu boyutun altına düşmeyecek en küçük DCT ölçeğinde (1/2, 1/4, 1/8) çözülür.
+    """
+    with span("image.decode"):
+        img = open_image(source)
+        orig_w, orig_h = img.size
+        if min_size is not None and img.format == "JPEG" and img.mode in ("RGB", "L", "YCbCr"):
+            img.draft("RGB", (max(1, int(min_size[0])), max(1, int(min_size[1]))))
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        else:
+            img.load()
+    return DecodedImage(img, orig_w, orig_h)
+
+
+def decode_for_clip(source: ImageSource, resolution: int = 224) -> Image.Image:
+    img = open_image(source)
+    return decode(img, clip_min_size(img.size, resolution)).image
+
+
+def clip_min_size(size: Tuple[int, int], resolution: int) -> Tuple[int, int]:
+    # Kısa kenar CLIP çözünürlüğüne ölçeklendiğinde gereken boyut
+    w, h = size
+    scale = resolution / min(w, h)
+    return int(np.ceil(w * scale)), int(np.ceil(h * scale))
+
+
+def yolo_min_size(size: Tuple[int, int], input_size: int) -> Tuple[int, int]:
+    # Letterbox sonrası görselin kaplayacağı boyut
+    w, h = size
+    ratio = min(input_size / w, input_size / h)
+    return int(np.ceil(w * ratio)), int(np.ceil(h * ratio))
+
+
+_local = threading.local()
+
+
+def batch_buffer(name: str, batch: int, shape: Sequence[int], dtype=np.float32) -> np.ndarray:
+    """
+    İş parçacığına özel, yeniden kullanılan (batch, *shape) tampon görünümü döndürür.
+    Tampon aynı iş parçacığındaki bir sonraki çağrıda üzerine yazılır; çağıran sonucu
+    kullanıp bitirmeden (ör. çıkarım dönmeden) aynı adla yeni tampon istememelidir.
+    """
+    buffers: Dict[str, np.ndarray] = getattr(_local, "buffers", None)
+    if buffers is None:
+        buffers = _local.buffers = {}
+    buf = buffers.get(name)
+    if buf is None or buf.shape[1:] != tuple(shape) or buf.dtype != dtype or buf.shape[0] < batch:
+        capacity = max(batch, buf.shape[0] if buf is not None and buf.shape[1:] == tuple(shape) else 0)
+        buf = buffers[name] = np.empty((capacity, *shape), dtype=dtype)
+    return buf[:batch]
+
+
+def clip_input(image: Image.Image, resolution: int = 224, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    torchvision'lı CLIP ön işlemesinin NumPy karşılığı: kısa kenarı `resolution`
+    boyutuna bicubic ölçekle, ortadan kırp, [0, 1] aralığına al ve normalize et.
+    Sonuç (3, H, W) olarak `out` tamponuna (verilmezse yeni diziye) yazılır.
+    """
+    image = image if image.mode == "RGB" else image.convert("RGB")
+    w, h = image.size
+    new_w, new_h = (resolution, int(resolution * h / w)) if w <= h else (int(resolution * w / h), resolution)
+    left = int(round((new_w - resolution) / 2.0))
+    top = int(round((new_h - resolution) / 2.0))
+    if (new_w, new_h) != (w, h):
+        image = image.resize((new_w, new_h), Image.BICUBIC)
+    pixels = np.asarray(image.crop((left, top, left + resolution, top + resolution))).transpose(2, 0, 1)
+    if out is None:
+        out = np.empty((3, resolution, resolution), dtype=np.float32)
+    np.multiply(pixels, _CLIP_SCALE, out=out, casting="unsafe")
+    out -= _CLIP_BIAS
+    return out
+
+
+def clip_batch(images: Sequence[Image.Image], resolution: int = 224) -> np.ndarray:
+    """Görselleri paylaşılan (N, 3, R, R) tampona ön işler."""
+    batch = batch_buffer("clip", len(images), (3, resolution, resolution))
+    for i, image in enumerate(images):
+        clip_input(image, resolution, out=batch[i])
+    return batch
+
+
+def letterbox(img: Image.Image, input_size: int = 640, canvas: Optional[np.ndarray] = None) -> Tuple[np.ndarray, LetterboxMeta]:
+    # En-boy oranını koruyarak küçült, kalan alanı YOLO'nun gri (114) dolgusuyla doldur
+    w, h = img.size
+    ratio = min(input_size / w, input_size / h)
+    new_w, new_h = max(1, int(round(w * ratio))), max(1, int(round(h * ratio)))
+    pad_x = (input_size - new_w) / 2
+    pad_y = (input_size - new_h) / 2
+    if canvas is None:
+        canvas = np.empty((input_size, input_size, 3), dtype=np.uint8)
+    canvas.fill(YOLO_PAD_VALUE)
+    left, top = int(round(pad_x - 0.1)), int(round(pad_y - 0.1))
+    resized = img if (new_w, new_h) == (w, h) else img.resize((new_w, new_h), Image.BILINEAR)
+    canvas[top:top + new_h, left:left + new_w] = np.asarray(resized)
+    return canvas, LetterboxMeta(ratio, left, top, w, h)
+
+
+def yolo_input(decoded: DecodedImage, input_size: int = 640, out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, LetterboxMeta]:
+    """
+    Letterbox + [0, 1] ölçekleme ile (3, S, S) YOLO girdisi üretir. Meta, kutuların
+    draft çözmeden bağımsız olarak orijinal piksel koordinatlarına dönmesi için
+    orijinal boyuta göre hesaplanır.
+    """
+    canvas = batch_buffer("yolo_canvas", 1, (input_size, input_size, 3), np.uint8)[0]
+    canvas, meta = letterbox(decoded.image, input_size, canvas)
+    if out is None:
+        out = np.empty((3, input_size, input_size), dtype=np.float32)
+    np.multiply(canvas.transpose(2, 0, 1), np.float32(1.0 / 255.0), out=out, casting="unsafe")
+    meta = LetterboxMeta(meta.ratio * decoded.scale, meta.pad_x, meta.pad_y, decoded.orig_w, decoded.orig_h)
+    return out, meta
@@ -0,0 +1,108 @@
+"""
+Modellerden önce çalışan ucuz görsel kalite ön filtresi.
+
+Görsel küçültülmüş (JPEG'lerde draft) olarak gri tonlamada çözülür; bozuk, çok küçük,
+neredeyse tek renk ve aşırı bulanık görseller CLIP/YOLO çalıştırılmadan ayıklanır.
+Küçültme kısa kenara göre yapılır ve çok uzun/ince görseller ortadan kırpılır; uzun
+kenara göre küçültmek panoramaları birkaç piksel yüksekliğe indirip dokuyu yok eder.
+"""
+import math
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from app.core.config import (
+    QUALITY_FILTER, QUALITY_MIN_SIDE, QUALITY_BLUR_THRESHOLD, QUALITY_UNIFORM_STD, QUALITY_ANALYSIS_SIZE,
+    QUALITY_MAX_ASPECT,
+)
+from app.services.metrics import span
+from app.services.preprocessing import ImageSource, open_image
+
+# Neden -> görselin alacağı durum. Bulanık görseller insan incelemesine bırakılır.
+REASON_STATUS = {
+    "corrupt": "rejected",
+    "too_small": "rejected",
+    "blank": "rejected",
+    "blurry": "pending",
+}
+
+
+class QualityResult(NamedTuple):
+    reason: Optional[str]  # None: görsel modellere gönderilebilir
+    width: Optional[int] = None
+    height: Optional[int] = None
+    blur_score: Optional[float] = None  # Laplace varyansı (analiz boyutunda)
+    std: Optional[float] = None  # gri ton standart sapması
+
+    @property
+    def ok(self) -> bool:
+        return self.reason is None
+
+    @property
+    def status(self) -> Optional[str]:
+        return REASON_STATUS.get(self.reason)
+
+    @property
+    def checked(self) -> bool:
+        # QUALITY_FILTER kapalıyken görsel çözülmeden geçer; bu sonuç kalıcı işaretlenmemeli
+        return self.reason is not None or self.width is not None
+
+
+def laplacian_variance(gray: np.ndarray) -> Optional[float]:
+    # 4 komşulu Laplace çekirdeği dilimlerle uygulanır; kenar pikselleri hesaba katılmaz.
+    # 3 satır/sütundan küçük dizide iç piksel yoktur, ölçüm yapılamaz (None).
+    if gray.ndim != 2 or min(gray.shape) < 3:
+        return None
+    g = gray.astype(np.float32)
+    lap = g[:-2, 1:-1] + g[2:, 1:-1] + g[1:-1, :-2] + g[1:-1, 2:] - 4.0 * g[1:-1, 1:-1]
+    return float(lap.var())
+
+
+def _analysis_box(width: int, height: int, max_aspect: float) -> Tuple[int, int, int, int]:
+    # En-boy oranı max_aspect'i aşıyorsa uzun kenar ortadan kırpılır
+    if width >= height:
+        keep = min(width, max(1, math.floor(height * max_aspect)))
+        left = (width - keep) // 2
+        return left, 0, left + keep, height
+    keep = min(height, max(1, math.floor(width * max_aspect)))
+    top = (height - keep) // 2
+    return 0, top, width, top + keep
+
+
+def check_quality(source: ImageSource, analysis_size: int = QUALITY_ANALYSIS_SIZE,
+                  max_aspect: float = QUALITY_MAX_ASPECT) -> QualityResult:
+    """
+    Görseli kısa kenarı analiz boyutuna küçültülmüş (en-boy oranı max_aspect ile sınırlı)
+    gri tonlamada çözüp kalite kontrollerini yapar. QUALITY_FILTER kapalıysa görsel hiç
+    çözülmeden geçer.
+    """
+    if not QUALITY_FILTER:
+        return QualityResult(None)
+    with span("quality.check"):
+        try:
+            img = open_image(source)
+            width, height = img.size
+            scale = min(1.0, analysis_size / max(1, min(width, height)))
+            if img.format == "JPEG" and scale < 1.0:
+                img.draft("L", (math.ceil(width * scale), math.ceil(height * scale)))
+            gray = img.convert("L")
+            gray = gray.crop(_analysis_box(gray.width, gray.height, max_aspect))
+            # draft boyutu değiştirmiş olabilir; oran çözülen boyuta göre yeniden hesaplanır
+            factor = scale * width / img.width
+            target = (max(1, round(gray.width * factor)), max(1, round(gray.height * factor)))
+            if target != gray.size:
+                gray = gray.resize(target, Image.BILINEAR)
+            pixels = np.asarray(gray)
+        except Exception:
+            return QualityResult("corrupt")
+
+        if min(width, height) < QUALITY_MIN_SIDE:
+            return QualityResult("too_small", width, height)
+        std = float(pixels.std())
+        if std < QUALITY_UNIFORM_STD:
+            return QualityResult("blank", width, height, std=std)
+        blur_score = laplacian_variance(pixels)
+        if blur_score is not None and blur_score < QUALITY_BLUR_THRESHOLD:
+            return QualityResult("blurry", width, height, blur_score, std)
+        return QualityResult(None, width, height, blur_score, std)
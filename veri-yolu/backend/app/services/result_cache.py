@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Optional, Sequence
+
+from app.core.config import RESULT_CACHE_SIZE, RESULT_CACHE_DIR
+from app.services.metrics import span
+from app.utils.cache import LRUCache, labels_hash
+
+_MISSING = object()
+
+# (yol, mtime_ns, boyut) -> içerik hash'i; aynı dosya her sorguda yeniden okunmaz
+_digest_cache = LRUCache(maxsize=max(RESULT_CACHE_SIZE, 1024))
+
+
+def file_digest(path: str) -> str:
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+    def compute() -> str:
+        h = hashlib.sha256()
+        with span("disk.hash"), open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    return _digest_cache.get_or_set(key, compute)
+
+
+def model_version(path: str) -> str:
+    # Model dosyası değiştirildiğinde eski sonuçlar kendiliğinden geçersiz olur
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return os.path.basename(path)
+    return f"{os.path.basename(path)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def result_key(kind: str, content_hash: str, labels: Optional[Sequence[str]], model_id: str, *params) -> str:
+    """
+    (işlem türü, dosya içeriği, etiket kümesi, model sürümü, eşikler) üzerinden içerik adresli anahtar.
+    """
+    payload = json.dumps([kind, content_hash, labels_hash(labels), model_id, list(params)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Çıkarım sonuçları için iki katmanlı önbellek: sınırlı bellek içi LRU ve
+    isteğe bağlı disk katmanı (RESULT_CACHE_DIR). Değerler JSON ile saklanır.
+    """
+
+    def __init__(self, maxsize: int = RESULT_CACHE_SIZE, disk_dir: Optional[str] = RESULT_CACHE_DIR):
+        self.memory = LRUCache(maxsize=maxsize)
+        self.disk_dir = disk_dir or None
+        self.disk_hits = 0
+        self._lock = threading.Lock()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), encoding="utf-8") as f:
+                    value = json.load(f)
+            except (OSError, ValueError):
+                return default
+            with self._lock:
+                self.disk_hits += 1
+            self.memory.set(key, value)
+            return value
+        return default
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, path)  # okuyucular yarım yazılmış dosya görmez
+
+    def get_or_set(self, key: str, factory: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def stats(self) -> dict:
+        return {**self.memory.stats(), "disk_dir": self.disk_dir, "disk_hits": self.disk_hits}
+
+
+result_cache = ResultCache()
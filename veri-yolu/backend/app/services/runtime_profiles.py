@@ -0,0 +1,91 @@
+import json
+import os
+from typing import Dict, NamedTuple, Optional
+
+from app.core.config import (
+    ORT_INTRA_OP_THREADS, ORT_INTER_OP_THREADS, ORT_POOL_SIZE, RUNTIME_PROFILE, PROFILE_BENCHMARK_PATH,
+)
+
+_CPUS = os.cpu_count() or 2
+
+
+class RuntimeProfile(NamedTuple):
+    """
+    Çıkarım çalışma zamanı ayarları. ORT alanları onnx_pool oturumlarına, torch alanları
+    PyTorch CLIP modeline uygulanır.
+    """
+    name: str
+    intra_op_threads: int
+    inter_op_threads: int
+    graph_optimization: str  # 'disabled' | 'basic' | 'extended' | 'all'
+    execution_mode: str  # 'sequential' | 'parallel'
+    torch_threads: Optional[int]  # None: torch varsayılanı
+    inference_mode: bool  # torch.inference_mode (False: torch.no_grad)
+    channels_last: bool
+
+
+PROFILES: Dict[str, RuntimeProfile] = {
+    # Ortam değişkenleriyle ayarlanan mevcut davranış
+    "default": RuntimeProfile("default", ORT_INTRA_OP_THREADS, ORT_INTER_OP_THREADS, "all", "sequential",
+                              None, True, False),
+    # Tek istek gecikmesi: her oturum tüm çekirdekleri kullanır
+    "latency": RuntimeProfile("latency", _CPUS, 1, "all", "sequential", _CPUS, True, False),
+    # Toplu iş/ingest düğümleri: çekirdekler havuzdaki oturumlar arasında paylaştırılır
+    "throughput": RuntimeProfile("throughput", max(1, _CPUS // max(1, ORT_POOL_SIZE)), 1, "all", "sequential",
+                                 max(1, _CPUS // max(1, ORT_POOL_SIZE)), True, True),
+    # Küçük düğümler: tek iş parçacığı, hafif grafik optimizasyonu (daha az bellek ve açılış süresi)
+    "low-memory": RuntimeProfile("low-memory", 1, 1, "basic", "sequential", 1, True, False),
+    # Dallı grafikler için operatörleri paralel çalıştırır
+    "parallel": RuntimeProfile("parallel", max(1, _CPUS // 2), 2, "all", "parallel", max(1, _CPUS // 2), True, False),
+}
+
+
+def get_profile(name: Optional[str] = None) -> RuntimeProfile:
+    name = name or RUNTIME_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Bilinmeyen çalışma zamanı profili: {name} (seçenekler: {', '.join(PROFILES)})")
+    return PROFILES[name]
+
+
+def ort_session_options(profile: RuntimeProfile, intra_op_threads: Optional[int] = None,
+                        inter_op_threads: Optional[int] = None):
+    import onnxruntime as ort
+
+    opts = ort.SessionOptions()
+    opts.intra_op_num_threads = intra_op_threads or profile.intra_op_threads
+    opts.inter_op_num_threads = inter_op_threads or profile.inter_op_threads
+    opts.execution_mode = (
+        ort.ExecutionMode.ORT_PARALLEL if profile.execution_mode == "parallel" else ort.ExecutionMode.ORT_SEQUENTIAL
+    )
+    opts.graph_optimization_level = {
+        "disabled": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+        "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+        "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+        "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+    }[profile.graph_optimization]
+    return opts
+
+
+def torch_grad_context(profile: RuntimeProfile):
+    import torch
+    return torch.inference_mode() if profile.inference_mode else torch.no_grad()
+
+
+def profile_benchmarks() -> Optional[dict]:
+    """
+    benchmarks/bench_inference.py --profiles ile üretilen sonuçların profil bazında özeti.
+    Dosya yoksa None döner.
+    """
+    try:
+        with open(PROFILE_BENCHMARK_PATH, encoding="utf-8") as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return None
+    summary: Dict[str, Dict[str, dict]] = {}
+    for row in report.get("results", []):
+        profile = row.get("profile") or "default"
+        key = f"{row['stage']}@b{row['batch_size']}" + (f"/{row['image_size']}" if row.get("image_size") else "")
+        summary.setdefault(profile, {})[key] = {
+            "p50_ms": row["p50_ms"], "p95_ms": row["p95_ms"], "images_per_sec": row["images_per_sec"],
+        }
+    return {"meta": report.get("meta", {}), "profiles": summary}
@@ -1,4 +1,5 @@
-from sqlmodel import Session, select, func
+from sqlmodel import Session, select
+from app.models.topic import Topic
 from app.models.user import User
 from datetime import datetime
 
@@ -32,7 +33,10 @@ def track_unique_view(session: Session, user_id: int, topic_id: int):
     ).first()
 
     if not exists:
+        # counters bu modülün tablolarını içe aktardığından döngüsel içe aktarımı önlemek için burada
+        from app.services.counters import increment
         session.add(TopicView(user_id=user_id, topic_id=topic_id))
+        increment(session, Topic, topic_id, "view_count")
         session.commit()
 
 
@@ -47,20 +51,19 @@ def track_unique_download(session: Session, user_id: int, topic_id: int):
     ).first()
 
     if not exists:
+        from app.services.counters import increment
         session.add(TopicDownload(user_id=user_id, topic_id=topic_id))
+        increment(session, Topic, topic_id, "download_count")
         session.commit()
 
 
 def get_metrics(session: Session, topic_id: int):
     """
-    İlgili konunun toplam unique görüntülenme ve indirme sayısını döndür.
+    İlgili konunun toplam unique görüntülenme ve indirme sayısını döndür
+    (Topic üzerindeki sayaç sütunlarından; COUNT(*) çalıştırılmaz).
     """
-    views = session.exec(
-        select(func.count()).select_from(TopicView).where(TopicView.topic_id == topic_id)
-    ).one()
-
-    downloads = session.exec(
-        select(func.count()).select_from(TopicDownload).where(TopicDownload.topic_id == topic_id)
-    ).one()
-
+    row = session.exec(
+        select(Topic.view_count, Topic.download_count).where(Topic.id == topic_id)
+    ).first()
+    views, downloads = row if row else (0, 0)
     return {"views": views, "downloads": downloads}
@@ -0,0 +1,40 @@
+import os
+import threading
+import time
+
+from app.core.config import YOLOV8_ONNX_PATH
+
+_warmup_lock = threading.Lock()
+
+
+def warmup_models() -> dict:
+    """
+    CLIP ve YOLO modellerini yükleyip ısıtır; model başına süreyi (sn) ya da hatayı döndürür.
+    """
+    from app.services import clip_labeler, yolo_labeler
+
+    report = {}
+    with _warmup_lock:
+        start = time.perf_counter()
+        try:
+            clip_labeler.warmup()
+            report["clip"] = {"ok": True, "seconds": time.perf_counter() - start}
+        except Exception as e:
+            report["clip"] = {"ok": False, "error": str(e)}
+
+        start = time.perf_counter()
+        if not os.path.exists(YOLOV8_ONNX_PATH):
+            report["yolo"] = {"ok": False, "error": f"Model bulunamadı: {YOLOV8_ONNX_PATH}"}
+        else:
+            try:
+                yolo_labeler.warmup()
+                report["yolo"] = {"ok": True, "seconds": time.perf_counter() - start}
+            except Exception as e:
+                report["yolo"] = {"ok": False, "error": str(e)}
+    return report
+
+
+def warmup_in_background() -> threading.Thread:
+    thread = threading.Thread(target=warmup_models, name="model-warmup", daemon=True)
+    thread.start()
+    return thread
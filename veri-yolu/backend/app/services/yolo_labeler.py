@@ -1,10 +1,14 @@
-import onnxruntime as ort
 import numpy as np
 from PIL import Image
-import cv2
-from typing import List, Tuple
+import math
+from typing import List, Optional, Tuple, Union
 
-YOLOV8_ONNX_PATH = "C:/Users/mmy/veri-yolu/backend/app/services/yolov8n.onnx"  # You should place this file in your backend/app/services directory or update the path
+from app.core.config import YOLOV8_ONNX_PATH, YOLO_TILED, YOLO_TILE_OVERLAP, YOLO_MAX_TILES
+from app.services.metrics import span
+from app.services.onnx_pool import get_session_pool
+from app.services.preprocessing import (
+    DecodedImage, ImageSource, LetterboxMeta, batch_buffer, decode, open_image, yolo_input, yolo_min_size,
+)
 
 COCO_CLASSES = [
     "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat", "traffic light",
@@ -18,48 +22,198 @@ COCO_CLASSES = [
     "hair drier", "toothbrush"
 ]
 
-def preprocess_yolo_image(image_path: str, input_size: int = 640) -> np.ndarray:
-    img = Image.open(image_path).convert("RGB")
-    img = img.resize((input_size, input_size))
-    img_np = np.array(img)
-    img_np = img_np.astype(np.float32) / 255.0
-    img_np = np.transpose(img_np, (2, 0, 1))  # HWC to CHW
-    img_np = np.expand_dims(img_np, axis=0)  # Add batch dim
-    return img_np
-
-def run_yolov8_onnx(image_path: str, conf_threshold: float = 0.25, iou_threshold: float = 0.45) -> List[dict]:
-    session = ort.InferenceSession(YOLOV8_ONNX_PATH, providers=["CPUExecutionProvider"])
-    input_name = session.get_inputs()[0].name
-    img = preprocess_yolo_image(image_path)
-    outputs = session.run(None, {input_name: img})
-    preds = outputs[0]
-    boxes = []
-    preds_arr = np.array(preds)
-    if preds_arr.ndim == 3:
-        preds_arr = preds_arr[0]
-    for pred in preds_arr:
-        x, y, w, h, conf = pred[:5]
-        class_scores = pred[5:]
-        class_id = int(np.argmax(class_scores))
-        score = class_scores[class_id] * conf
-        if score < conf_threshold:
-            continue
-        # Convert xywh to xyxy
-        x1 = x - w / 2
-        y1 = y - h / 2
-        x2 = x + w / 2
-        y2 = y + h / 2
-        boxes.append({
-            "bbox": [float(x1), float(y1), float(x2), float(y2)],
-            "class_id": class_id,
+def preprocess_yolo_image(image: ImageSource, input_size: int = 640) -> Tuple[np.ndarray, LetterboxMeta]:
+    """
+    Tek görsel için (1, 3, S, S) girdi; JPEG'ler letterbox boyutuna yetecek kadar küçültülmüş
+    çözülür. Dönen dizi iş parçacığına özel tampondur, bir sonraki çağrıda üzerine yazılır.
+    """
+    with span("yolo.preprocess"):
+        img = open_image(image)
+        decoded = decode(img, yolo_min_size(img.size, input_size))
+        batch = batch_buffer("yolo", 1, (3, input_size, input_size))
+        _, meta = yolo_input(decoded, input_size, out=batch[0])
+    return batch, meta
+
+
+def tile_grid(width: int, height: int, input_size: int = 640, overlap: float = YOLO_TILE_OVERLAP,
+              max_tiles: int = YOLO_MAX_TILES) -> List[Tuple[int, int, int, int]]:
+    """
+    Görseli örtüşen kare karolara böler ve (x1, y1, x2, y2) listesi döndürür.
+    Karo kenarı model girdisiyle başlar; karo sayısı `max_tiles`'ı aşarsa büyütülür.
+    Tek karoya sığan görseller için boş liste döner (tek geçiş yeterli).
+    """
+    side = input_size
+    while True:
+        if max(width, height) <= side * (1 + overlap):
+            return []
+        step = max(1, int(side * (1 - overlap)))
+        cols = max(1, math.ceil((width - side) / step) + 1) if width > side else 1
+        rows = max(1, math.ceil((height - side) / step) + 1) if height > side else 1
+        if cols * rows <= max_tiles:
+            break
+        side = int(side * 1.25)
+    tiles = []
+    for r in range(rows):
+        for c in range(cols):
+            # Son satır/sütun görsel sınırına yaslanır; karolar görselin dışına taşmaz
+            x1 = min(c * step, max(0, width - side))
+            y1 = min(r * step, max(0, height - side))
+            tiles.append((x1, y1, min(width, x1 + side), min(height, y1 + side)))
+    return tiles
+
+
+def decode_yolo_output(preds: np.ndarray, conf_threshold: float, num_classes: int = len(COCO_CLASSES)) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Ham model çıktısını (xyxy kutular, skorlar, sınıf id'leri) dizilerine çevirir.
+    YOLOv8 çıktısı (1, 4+nc, N) düzenindedir; (N, 4+nc) ve objectness içeren
+    YOLOv5 tarzı (N, 5+nc) çıktılar da desteklenir.
+    """
+    preds = np.asarray(preds, dtype=np.float32)
+    if preds.ndim == 3:
+        preds = preds[0]
+    if preds.shape[0] in (4 + num_classes, 5 + num_classes) and preds.shape[0] < preds.shape[1]:
+        preds = preds.T  # (84, 8400) -> (8400, 84)
+
+    if preds.shape[1] == 5 + num_classes:
+        class_scores = preds[:, 5:] * preds[:, 4:5]
+    else:
+        class_scores = preds[:, 4:]
+
+    class_ids = class_scores.argmax(axis=1)
+    scores = class_scores[np.arange(len(class_scores)), class_ids]
+    keep = scores >= conf_threshold
+    xywh = preds[keep, :4]
+    boxes = np.empty_like(xywh)
+    boxes[:, 0] = xywh[:, 0] - xywh[:, 2] / 2
+    boxes[:, 1] = xywh[:, 1] - xywh[:, 3] / 2
+    boxes[:, 2] = xywh[:, 0] + xywh[:, 2] / 2
+    boxes[:, 3] = xywh[:, 1] + xywh[:, 3] / 2
+    return boxes, scores[keep], class_ids[keep]
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray, iou_threshold: float, max_det: int = 300) -> np.ndarray:
+    """
+    Sınıf bazlı NMS: kutular sınıf id'sine göre kaydırılarak tek geçişte işlenir.
+    Tutulan kutuların indekslerini skor sırasıyla döndürür.
+    """
+    if len(boxes) == 0:
+        return np.empty((0,), dtype=np.int64)
+    offset = class_ids.astype(np.float32)[:, None] * (float(boxes.max() - boxes.min()) + 1.0)
+    b = boxes + offset
+    areas = (b[:, 2] - b[:, 0]).clip(0) * (b[:, 3] - b[:, 1]).clip(0)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size > 0 and len(keep) < max_det:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        xx1 = np.maximum(b[i, 0], b[rest, 0])
+        yy1 = np.maximum(b[i, 1], b[rest, 1])
+        xx2 = np.minimum(b[i, 2], b[rest, 2])
+        yy2 = np.minimum(b[i, 3], b[rest, 3])
+        inter = (xx2 - xx1).clip(0) * (yy2 - yy1).clip(0)
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def scale_boxes(boxes: np.ndarray, meta: LetterboxMeta) -> np.ndarray:
+    # Letterbox uzayından orijinal görsel piksel koordinatlarına dönüştür
+    out = boxes.copy()
+    out[:, [0, 2]] = ((out[:, [0, 2]] - meta.pad_x) / meta.ratio).clip(0, meta.orig_w)
+    out[:, [1, 3]] = ((out[:, [1, 3]] - meta.pad_y) / meta.ratio).clip(0, meta.orig_h)
+    return out
+
+
+def run_yolov8_onnx(image: Union[str, Image.Image], conf_threshold: float = 0.25, iou_threshold: float = 0.45,
+                    tiled: Optional[bool] = None) -> List[dict]:
+    """
+    `tiled` (varsayılan YOLO_TILED) açıkken büyük görseller örtüşen karolarla işlenir;
+    tek karoya sığan görseller yine tek geçişte çalışır.
+    """
+    tiled = YOLO_TILED if tiled is None else tiled
+    if isinstance(image, str):
+        # Dosya yolları içerik hash'iyle önbelleklenir; bellek içi görseller her seferinde çalıştırılır
+        from app.services.result_cache import file_digest, model_version, result_cache, result_key
+        key = result_key("yolo", file_digest(image), None, model_version(YOLOV8_ONNX_PATH), conf_threshold, iou_threshold, tiled)
+        return result_cache.get_or_set(key, lambda: _run_yolov8_onnx(image, conf_threshold, iou_threshold, tiled))
+    return _run_yolov8_onnx(image, conf_threshold, iou_threshold, tiled)
+
+def _run_batch(batch: np.ndarray) -> List[np.ndarray]:
+    # Sabit batch boyutu 1 olan modeller için karolar tek tek çalıştırılır
+    pool = get_session_pool(YOLOV8_ONNX_PATH)
+    with span("yolo.infer"):
+        if pool.input_shape()[0] == 1:
+            return [pool.run(batch[i:i + 1])[0][0] for i in range(len(batch))]
+        return list(pool.run(batch)[0])
+
+
+def _detect_tiled(img: Image.Image, tiles: List[Tuple[int, int, int, int]], conf_threshold: float,
+                  iou_threshold: float, input_size: int = 640) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Tüm görselin küçültülmüş hali ve karolar tek batch'te çalıştırılır; kutular küresel
+    koordinatlara taşınıp sınıf bazlı NMS ile birleştirilir. Tam görünüm karolara
+    bölünen büyük nesneleri yakalar.
+    """
+    views = [(img, 0, 0)] + [(img.crop(tile), tile[0], tile[1]) for tile in tiles]
+    with span("yolo.preprocess"):
+        batch = batch_buffer("yolo_tiles", len(views), (3, input_size, input_size))
+        metas = [
+            yolo_input(DecodedImage(view, *view.size), input_size, out=batch[i])[1]
+            for i, (view, _, _) in enumerate(views)
+        ]
+    outputs = _run_batch(batch)
+    with span("yolo.postprocess"):
+        all_boxes, all_scores, all_classes = [], [], []
+        for preds, meta, (_, x0, y0) in zip(outputs, metas, views):
+            boxes, scores, class_ids = decode_yolo_output(preds, conf_threshold)
+            boxes = scale_boxes(boxes, meta)
+            boxes[:, [0, 2]] += x0
+            boxes[:, [1, 3]] += y0
+            all_boxes.append(boxes)
+            all_scores.append(scores)
+            all_classes.append(class_ids)
+        boxes, scores, class_ids = np.concatenate(all_boxes), np.concatenate(all_scores), np.concatenate(all_classes)
+        keep = nms(boxes, scores, class_ids, iou_threshold)
+    return boxes[keep], scores[keep], class_ids[keep]
+
+
+def _run_yolov8_onnx(image: Union[str, Image.Image], conf_threshold: float, iou_threshold: float,
+                     tiled: bool = YOLO_TILED) -> List[dict]:
+    img = open_image(image)
+    tiles = tile_grid(*img.size) if tiled else []
+    if tiles:
+        # Karolar tam çözünürlük ister; draft çözme yalnızca tek geçişte kullanılır
+        boxes, scores, class_ids = _detect_tiled(decode(img).image, tiles, conf_threshold, iou_threshold)
+    else:
+        batch, meta = preprocess_yolo_image(img)
+        with span("yolo.infer"):
+            outputs = get_session_pool(YOLOV8_ONNX_PATH).run(batch)
+        with span("yolo.postprocess"):
+            boxes, scores, class_ids = decode_yolo_output(outputs[0], conf_threshold)
+            keep = nms(boxes, scores, class_ids, iou_threshold)
+            boxes = scale_boxes(boxes[keep], meta)
+            scores, class_ids = scores[keep], class_ids[keep]
+    return [
+        {
+            "bbox": [float(v) for v in box],
+            "class_id": int(class_id),
             "class_name": COCO_CLASSES[class_id] if class_id < len(COCO_CLASSES) else str(class_id),
             "score": float(score)
-        })
-    return boxes
+        }
+        for box, score, class_id in zip(boxes, scores, class_ids)
+    ]
 
 def map_yolo_to_candidates(yolo_class_name: str, candidate_labels: List[str]) -> str:
     # Simple mapping: if YOLO class in candidate labels, use it; else "other objects"
     for label in candidate_labels:
         if label.lower() == yolo_class_name.lower():
             return label
-    return "other objects" 
\ No newline at end of file
+    return "other objects"
+
+
+def warmup():
+    """Oturum havuzunu doldurur ve boş bir görselle bir çıkarım yapar."""
+    pool = get_session_pool(YOLOV8_ONNX_PATH)
+    pool.warmup()
+    run_yolov8_onnx(Image.new("RGB", (640, 640)))
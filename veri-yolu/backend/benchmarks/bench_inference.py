@@ -0,0 +1,294 @@
+"""
+clip_labeler / yolo_labeler sıcak yolları için kıyaslama aracı.
+
+Ön işleme, CLIP görsel/metin kodlama, YOLO çıkarımı ve son işleme ayrı ayrı ve uçtan uca
+(çözme -> YOLO -> kırpıntılar -> CLIP) ölçülür. Her senaryo için p50/p95 gecikme,
+görsel/sn ve tepe RSS raporlanır. Gerçek modeller verilmezse rastgele ağırlıklı
+sentetik modeller kullanılır; ağ erişimi gerekmez.
+
+Kullanım (backend dizininde):
+    python benchmarks/bench_inference.py [--batch-sizes 1 8 32] [--threads 1 4] \
+        [--image-sizes 640x480 4000x3000] [--yolo-model yolov8n.onnx] [--clip-dir app/services/clip_onnx] \
+        [--output sonuc.json] [--compare onceki.json --max-regression 0.10]
+
+Profil karşılaştırması (/admin/metrics'te gösterilir, PROFILE_BENCHMARK_PATH):
+    python benchmarks/bench_inference.py --profiles default latency throughput low-memory \
+        --output benchmarks/profiles.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.clip_labeler import crop_boxes  # noqa: E402
+from app.services.clip_onnx import ClipOnnxEncoder, TEXT_FILE, VISUAL_FILE  # noqa: E402
+from app.services.preprocessing import clip_batch, clip_input, decode, decode_for_clip  # noqa: E402
+from app.services.onnx_pool import OnnxSessionPool  # noqa: E402
+from app.services.runtime_profiles import PROFILES, RuntimeProfile  # noqa: E402
+from app.services.yolo_labeler import decode_yolo_output, nms, preprocess_yolo_image, scale_boxes  # noqa: E402
+
+from benchmarks.synthetic_models import make_clip_model_dir, make_images, make_yolo_model  # noqa: E402
+
+LABELS = ["dog", "cat", "car", "person", "bicycle", "bird", "tree", "building"]
+
+
+def peak_rss_mb() -> float:
+    # Linux'ta ru_maxrss KB, macOS'ta bayt cinsindendir; süreç ömrü boyunca tepe değerdir
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def measure(fn: Callable[[], object], items: int, repeats: int, warmup: int) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    lat = np.asarray(latencies) * 1000.0
+    return {
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p95_ms": float(np.percentile(lat, 95)),
+        "mean_ms": float(lat.mean()),
+        "images_per_sec": float(items / (lat.mean() / 1000.0)) if lat.mean() > 0 else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _jpeg_bytes(images) -> List[bytes]:
+    encoded = []
+    for img in images:
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=90)
+        encoded.append(buf.getvalue())
+    return encoded
+
+
+def _decode(data: bytes):
+    return decode(data).image
+
+
+class Models:
+    """Seçilen profil ve iş parçacığı sayısıyla kurulan YOLO havuzu ve CLIP kodlayıcısı."""
+
+    def __init__(self, yolo_path: str, clip_dir: str, profile: RuntimeProfile, threads: Optional[int] = None):
+        def pool(path: str) -> OnnxSessionPool:
+            return OnnxSessionPool(path, size=1, intra_op_threads=threads, profile=profile)
+
+        self.yolo = pool(yolo_path)
+        self.clip = ClipOnnxEncoder(clip_dir)
+        # Kayıt defterindeki paylaşılan havuzlar yerine profile özel havuzlar
+        self.clip.visual = pool(self.clip.visual.model_path)
+        self.clip.text = pool(self.clip.text.model_path)
+        self.threads = self.yolo.intra_op_threads
+        self.yolo_input = int(self.yolo.input_shape()[2])
+        batch_dim = self.yolo.input_shape()[0]
+        self.yolo_fixed_batch = batch_dim if isinstance(batch_dim, int) else None
+
+    def run_yolo(self, batch: np.ndarray) -> List[np.ndarray]:
+        if self.yolo_fixed_batch == 1:
+            return [self.yolo.run(batch[i:i + 1])[0][0] for i in range(len(batch))]
+        return list(self.yolo.run(batch)[0])
+
+
+def end_to_end(models: Models, data: bytes, conf_threshold: float = 0.25, max_crops: int = 16):
+    img = _decode(data)
+    batch, meta = preprocess_yolo_image(img, models.yolo_input)
+    preds = models.run_yolo(batch)[0]
+    boxes, scores, class_ids = decode_yolo_output(preds, conf_threshold)
+    keep = nms(boxes, scores, class_ids, 0.45)[:max_crops]
+    boxes = scale_boxes(boxes[keep], meta)
+    crops = crop_boxes(img, boxes.tolist()) if len(boxes) else [img]
+    image_features = models.clip.encode_images(crops)
+    text_features = models.clip.encode_text(LABELS)
+    return image_features @ text_features.T
+
+
+def run_suite(yolo_path: str, clip_dir: str, batch_sizes: List[int], configs: List[Tuple[RuntimeProfile, Optional[int]]],
+              image_sizes: List[tuple], repeats: int, warmup: int, stages: Optional[List[str]] = None) -> List[dict]:
+    """`configs`: (profil, iş parçacığı sayısı) çiftleri; sayı None ise profilinki kullanılır."""
+    results = []
+    wanted = set(stages or [])
+
+    def enabled(stage: str) -> bool:
+        return not wanted or stage in wanted
+
+    def record(stage: str, threads: int, batch_size: int, image_size, stats: Dict[str, float]):
+        row = {"stage": stage, "profile": profile.name, "threads": threads, "batch_size": batch_size,
+               "image_size": f"{image_size[0]}x{image_size[1]}" if image_size else None, **stats}
+        results.append(row)
+        print(f"{stage:<22} {profile.name:<10} t={threads:<2} b={batch_size:<3} {row['image_size'] or '-':<10} "
+              f"p50={row['p50_ms']:8.2f}ms p95={row['p95_ms']:8.2f}ms {row['images_per_sec']:8.1f} img/s "
+              f"rss={row['peak_rss_mb']:.0f}MB")
+
+    max_batch = max(batch_sizes)
+    for profile, thread_override in configs:
+        models = Models(yolo_path, clip_dir, profile, thread_override)
+        threads = models.threads
+        for width, height in image_sizes:
+            images = make_images(max_batch, width, height)
+            encoded = _jpeg_bytes(images)
+            for batch_size in batch_sizes:
+                subset, subset_bytes = images[:batch_size], encoded[:batch_size]
+                if enabled("decode"):
+                    record("decode", threads, batch_size, (width, height),
+                           measure(lambda: [_decode(d) for d in subset_bytes], batch_size, repeats, warmup))
+                if enabled("clip_preprocess"):
+                    record("clip_preprocess", threads, batch_size, (width, height),
+                           measure(lambda: [clip_input(im, models.clip.resolution) for im in subset], batch_size, repeats, warmup))
+                if enabled("clip_decode_preprocess"):
+                    # JPEG baytlarından draft çözme + paylaşılan tampona ön işleme (upload yolu)
+                    record("clip_decode_preprocess", threads, batch_size, (width, height),
+                           measure(lambda: clip_batch([decode_for_clip(d, models.clip.resolution) for d in subset_bytes],
+                                                      models.clip.resolution), batch_size, repeats, warmup))
+                if enabled("yolo_decode_preprocess"):
+                    record("yolo_decode_preprocess", threads, batch_size, (width, height),
+                           measure(lambda: [preprocess_yolo_image(d, models.yolo_input) for d in subset_bytes], batch_size, repeats, warmup))
+                if enabled("yolo_preprocess"):
+                    record("yolo_preprocess", threads, batch_size, (width, height),
+                           measure(lambda: [preprocess_yolo_image(im, models.yolo_input) for im in subset], batch_size, repeats, warmup))
+                if enabled("end_to_end"):
+                    record("end_to_end", threads, batch_size, (width, height),
+                           measure(lambda: [end_to_end(models, d) for d in subset_bytes], batch_size, repeats, warmup))
+
+        # Model çalıştırma süreleri görsel boyutundan bağımsızdır (girdi sabit boyuta getirilir)
+        for batch_size in batch_sizes:
+            if enabled("clip_image_encode"):
+                pixels = np.random.default_rng(0).standard_normal(
+                    (batch_size, 3, models.clip.resolution, models.clip.resolution)).astype(np.float32)
+                record("clip_image_encode", threads, batch_size, None,
+                       measure(lambda: models.clip.encode_pixels(pixels), batch_size, repeats, warmup))
+            if enabled("clip_text_encode"):
+                labels = [LABELS[i % len(LABELS)] + f" {i}" for i in range(batch_size)]
+                record("clip_text_encode", threads, batch_size, None,
+                       measure(lambda: models.clip.encode_text(labels), batch_size, repeats, warmup))
+            yolo_batch = np.random.default_rng(0).random(
+                (batch_size, 3, models.yolo_input, models.yolo_input)).astype(np.float32)
+            if enabled("yolo_infer"):
+                record("yolo_infer", threads, batch_size, None,
+                       measure(lambda: models.run_yolo(yolo_batch), batch_size, repeats, warmup))
+            if enabled("yolo_postprocess"):
+                outputs = models.run_yolo(yolo_batch)
+
+                def postprocess():
+                    for preds in outputs:
+                        boxes, scores, class_ids = decode_yolo_output(preds, 0.25)
+                        nms(boxes, scores, class_ids, 0.45)
+
+                record("yolo_postprocess", threads, batch_size, None,
+                       measure(postprocess, batch_size, repeats, warmup))
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _key(row: dict) -> tuple:
+    return row["stage"], row.get("profile", "default"), row["threads"], row["batch_size"], row["image_size"]
+
+
+def compare(current: List[dict], baseline_path: str, max_regression: float) -> int:
+    """p50 gecikmeyi önceki bir JSON çıktısıyla karşılaştırır; eşiği aşan gerilemede 1 döner."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {_key(row): row for row in json.load(f)["results"]}
+    regressions = 0
+    print(f"\nKarşılaştırma: {baseline_path}")
+    for row in current:
+        old = baseline.get(_key(row))
+        if not old or old["p50_ms"] <= 0:
+            continue
+        change = row["p50_ms"] / old["p50_ms"] - 1.0
+        flag = "GERİLEME" if change > max_regression else ""
+        regressions += bool(flag)
+        print(f"  {row['stage']:<22} {row.get('profile', 'default'):<10} t={row['threads']:<2} b={row['batch_size']:<3} {row['image_size'] or '-':<10} "
+              f"{old['p50_ms']:8.2f} -> {row['p50_ms']:8.2f} ms ({change:+.1%}) {flag}")
+    return 1 if regressions else 0
+
+
+def _parse_size(value: str) -> tuple:
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--threads", type=int, nargs="+", default=sorted({1, max(1, (os.cpu_count() or 2) // 2)}))
+    parser.add_argument("--profiles", nargs="+", default=None, choices=sorted(PROFILES),
+                        help="Verilirse her çalışma zamanı profili kendi ayarlarıyla ölçülür (--threads yok sayılır)")
+    parser.add_argument("--image-sizes", type=_parse_size, nargs="+", default=[(640, 480), (1920, 1080)])
+    parser.add_argument("--stages", nargs="+", default=None,
+                        help="decode clip_preprocess clip_decode_preprocess yolo_preprocess yolo_decode_preprocess clip_image_encode clip_text_encode "
+                             "yolo_infer yolo_postprocess end_to_end")
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--yolo-model", default=None, help="Verilmezse sentetik model kullanılır")
+    parser.add_argument("--clip-dir", default=None, help="export_clip_onnx.py çıktısı; verilmezse sentetik model")
+    parser.add_argument("--output", default=None, help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--compare", default=None, help="Karşılaştırılacak önceki JSON çıktısı")
+    parser.add_argument("--max-regression", type=float, default=0.10)
+    args = parser.parse_args()
+    # Yinelenen değerler aynı yapılandırmayı iki kez ölçer ve compare() içinde aynı anahtara düşer
+    args.threads = sorted(set(args.threads))
+    args.batch_sizes = list(dict.fromkeys(args.batch_sizes))
+    args.image_sizes = list(dict.fromkeys(args.image_sizes))
+    if args.profiles:
+        args.profiles = list(dict.fromkeys(args.profiles))
+
+    import onnxruntime
+
+    with tempfile.TemporaryDirectory() as tmp:
+        yolo_path = args.yolo_model or make_yolo_model(os.path.join(tmp, "yolo.onnx"))
+        clip_dir = args.clip_dir
+        if not clip_dir or not os.path.exists(os.path.join(clip_dir, VISUAL_FILE)) or not os.path.exists(os.path.join(clip_dir, TEXT_FILE)):
+            clip_dir = make_clip_model_dir(os.path.join(tmp, "clip"))
+        if args.profiles:
+            configs = [(PROFILES[name], None) for name in args.profiles]
+        else:
+            configs = [(PROFILES["default"], threads) for threads in args.threads]
+        results = run_suite(yolo_path, clip_dir, args.batch_sizes, configs, args.image_sizes,
+                            args.repeats, args.warmup, args.stages)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "onnxruntime": onnxruntime.__version__,
+            "numpy": np.__version__,
+            "yolo_model": args.yolo_model or "synthetic",
+            "clip_model": args.clip_dir if clip_dir == args.clip_dir else "synthetic",
+            "repeats": args.repeats,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSonuçlar yazıldı: {args.output}")
+    if args.compare:
+        return compare(results, args.compare, args.max_regression)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
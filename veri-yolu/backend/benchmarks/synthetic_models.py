@@ -0,0 +1,137 @@
+"""
+Gerçek ağırlıklar olmadan kıyaslama yapabilmek için rastgele ağırlıklı küçük ONNX modelleri.
+Çıktı biçimleri gerçek modellerle aynıdır; böylece ön/son işleme kodu değişmeden çalışır.
+
+- YOLO: (N, 3, S, S) -> (N, 4 + nc, (S/8)^2), YOLOv8 çıktı düzeni
+- CLIP: clip_onnx.ClipOnnxEncoder'ın okuduğu dizin (visual.onnx, text.onnx, meta.json, BPE sözlüğü)
+"""
+import gzip
+import json
+import os
+
+import numpy as np
+
+from app.services.clip_onnx import META_FILE, TEXT_FILE, VISUAL_FILE, VOCAB_FILE
+from app.services.clip_tokenizer import SimpleTokenizer, bytes_to_unicode
+
+OPSET = 17
+
+
+def _save(graph, path: str):
+    import onnx
+    from onnx import helper
+
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", OPSET)])
+    model.ir_version = 8  # eski onnxruntime sürümleriyle uyum
+    onnx.checker.check_model(model)
+    onnx.save(model, path)
+
+
+def make_yolo_model(path: str, input_size: int = 640, num_classes: int = 80, dynamic_batch: bool = True, seed: int = 0) -> str:
+    """Stride 8 tek Conv + Sigmoid; gerçek YOLOv8n'den hafif ama aynı biçimde çıktı üretir."""
+    from onnx import TensorProto, helper, numpy_helper
+
+    rng = np.random.default_rng(seed)
+    channels = 4 + num_classes
+    weight = numpy_helper.from_array((rng.standard_normal((channels, 3, 8, 8)) * 0.05).astype(np.float32), "W")
+    shape = numpy_helper.from_array(np.array([0, channels, -1], dtype=np.int64), "shape")
+    batch = "batch" if dynamic_batch else 1
+    graph = helper.make_graph(
+        [
+            helper.make_node("Conv", ["images", "W"], ["conv"], strides=[8, 8]),
+            helper.make_node("Sigmoid", ["conv"], ["act"]),
+            helper.make_node("Reshape", ["act", "shape"], ["output0"]),
+        ],
+        "synthetic_yolo",
+        [helper.make_tensor_value_info("images", TensorProto.FLOAT, [batch, 3, input_size, input_size])],
+        [helper.make_tensor_value_info("output0", TensorProto.FLOAT, [batch, channels, (input_size // 8) ** 2])],
+        [weight, shape],
+    )
+    _save(graph, path)
+    return path
+
+
+def _write_vocab(path: str, merges: int = 256):
+    # SimpleTokenizer biçimi: başlık satırı + "a b" birleştirme satırları
+    letters = [c for c in bytes_to_unicode().values() if c.isalpha() and c.isascii() and c.islower()]
+    lines = ["#version: synthetic"]
+    for i in range(merges):
+        a, b = letters[i % len(letters)], letters[(i // len(letters)) % len(letters)]
+        lines.append(f"{a} {b}</w>" if i % 2 else f"{a} {b}")
+    seen, unique = set(), []
+    for line in lines:
+        if line not in seen:
+            seen.add(line)
+            unique.append(line)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write("\n".join(unique) + "\n")
+
+
+def make_clip_model_dir(model_dir: str, resolution: int = 224, embed_dim: int = 512,
+                        context_length: int = 77, seed: int = 0) -> str:
+    """
+    Patch gömme (Conv stride 32) + ortalama havuzlama görsel kodlayıcı ve token gömme
+    ortalaması metin kodlayıcısı. ViT-B/32 ile aynı girdi/çıktı boyutlarını kullanır.
+    """
+    from onnx import TensorProto, helper, numpy_helper
+
+    os.makedirs(model_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    vocab_path = os.path.join(model_dir, VOCAB_FILE)
+    _write_vocab(vocab_path)
+    vocab_size = len(SimpleTokenizer(vocab_path).encoder)
+
+    patch = numpy_helper.from_array((rng.standard_normal((embed_dim, 3, 32, 32)) * 0.02).astype(np.float32), "patch")
+    visual = helper.make_graph(
+        [
+            helper.make_node("Conv", ["pixel_values", "patch"], ["tokens"], strides=[32, 32]),
+            helper.make_node("GlobalAveragePool", ["tokens"], ["pooled"]),
+            helper.make_node("Flatten", ["pooled"], ["image_embeds"]),
+        ],
+        "synthetic_clip_visual",
+        [helper.make_tensor_value_info("pixel_values", TensorProto.FLOAT, ["batch", 3, resolution, resolution])],
+        [helper.make_tensor_value_info("image_embeds", TensorProto.FLOAT, ["batch", embed_dim])],
+        [patch],
+    )
+    _save(visual, os.path.join(model_dir, VISUAL_FILE))
+
+    table = numpy_helper.from_array((rng.standard_normal((vocab_size, embed_dim)) * 0.02).astype(np.float32), "token_embedding")
+    text = helper.make_graph(
+        [
+            helper.make_node("Gather", ["token_embedding", "input_ids"], ["embedded"], axis=0),
+            helper.make_node("ReduceMean", ["embedded"], ["text_embeds"], axes=[1], keepdims=0),
+        ],
+        "synthetic_clip_text",
+        [helper.make_tensor_value_info("input_ids", TensorProto.INT64, ["batch", context_length])],
+        [helper.make_tensor_value_info("text_embeds", TensorProto.FLOAT, ["batch", embed_dim])],
+        [table],
+    )
+    _save(text, os.path.join(model_dir, TEXT_FILE))
+
+    with open(os.path.join(model_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump({
+            "model_name": "synthetic",
+            "logit_scale": 100.0,
+            "input_resolution": resolution,
+            "context_length": context_length,
+            "embed_dim": embed_dim,
+            "opset": OPSET,
+        }, f, indent=2)
+    return model_dir
+
+
+def make_images(count: int, width: int, height: int, seed: int = 0):
+    """Düz bölgeler ve gürültü karışımı sentetik RGB görseller (JPEG sıkıştırması gerçekçi olsun diye)."""
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    images = []
+    for _ in range(count):
+        base = np.zeros((height, width, 3), dtype=np.float32)
+        for _ in range(6):
+            x1, y1 = rng.integers(0, width), rng.integers(0, height)
+            x2, y2 = x1 + rng.integers(width // 8, width // 2), y1 + rng.integers(height // 8, height // 2)
+            base[y1:y2, x1:x2] = rng.uniform(0, 255, size=3)
+        noisy = base + rng.normal(0, 12, size=base.shape)
+        images.append(Image.fromarray(noisy.clip(0, 255).astype(np.uint8)))
+    return images
@@ -0,0 +1,97 @@
+"""
+API modülünün içe aktarma süresini ölçer ve bütçeyi aşarsa ya da ağır ML
+kütüphaneleri (torch, clip, onnxruntime, cv2) açılışta yüklenirse hata verir.
+
+Makineden bağımsız olması için bütçe, uygulamanın her durumda ihtiyaç duyduğu
+çatı kütüphanelerinin (BASELINE_MODULES) aynı makinedeki içe aktarma süresine
+eklenen pay olarak verilir. --budget ile mutlak bir sınır da konabilir.
+
+Kullanım (backend dizininde):
+    python scripts/check_import_time.py [--overhead 0.5] [--budget SN] [--module app.main]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = ("torch", "clip", "onnxruntime", "cv2")
+BASELINE_MODULES = ("fastapi", "sqlmodel", "numpy", "PIL.Image")
+RUNS = 3  # gürültüyü azaltmak için en iyi ölçüm alınır
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {modules}
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def slowest_imports(module: str, top: int = 10):
+    # -X importtime çıktısı: "import time: self [us] | cumulative | imported package"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split(":", 1)[1].split("|")
+        rows.append((int(cumulative_us), name.strip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def measure(modules) -> dict:
+    """Modülleri taze yorumlayıcılarda RUNS kez içe aktarır; en hızlı ölçümü döndürür."""
+    best = None
+    for _ in range(RUNS):
+        proc = subprocess.run(
+            [sys.executable, "-c", PROBE.format(modules=", ".join(modules), heavy=HEAVY_MODULES)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr)
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--overhead", type=float, default=float(os.getenv("IMPORT_TIME_OVERHEAD", "0.5")),
+                        help="Çatı kütüphanelerinin içe aktarma süresine eklenen izinli pay (sn)")
+    parser.add_argument("--budget", type=float, default=float(os.getenv("IMPORT_TIME_BUDGET", "0")) or None,
+                        help="Mutlak bütçe (sn); verilirse --overhead yerine kullanılır")
+    parser.add_argument("--module", default="app.main")
+    args = parser.parse_args()
+
+    try:
+        result = measure([args.module])
+        baseline = measure(BASELINE_MODULES)["seconds"] if args.budget is None else None
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    budget = args.budget if args.budget is not None else baseline + args.overhead
+
+    if baseline is not None:
+        print(f"Çatı kütüphaneleri ({', '.join(BASELINE_MODULES)}): {baseline:.3f} sn")
+    print(f"{args.module} içe aktarma süresi: {result['seconds']:.3f} sn (bütçe {budget:.3f} sn)")
+    failed = False
+    if result["heavy"]:
+        print(f"HATA: açılışta ağır modüller yüklendi: {', '.join(result['heavy'])}")
+        failed = True
+    if result["seconds"] > budget:
+        print("HATA: içe aktarma bütçesi aşıldı. En yavaş modüller:")
+        for cumulative_us, name in slowest_imports(args.module):
+            print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
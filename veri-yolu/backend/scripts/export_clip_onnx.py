@@ -0,0 +1,167 @@
+"""
+CLIP görsel ve metin kodlayıcılarını ONNX'e (FP32 + dinamik nicemlenmiş INT8) aktarır
+ve PyTorch modeliyle etiket uyumunu karşılaştırır. torch, clip ve onnx yalnızca
+bu betik için gerekir; çıkarım işçileri CLIP_BACKEND=onnx / onnx-int8 ile torch'suz çalışır.
+
+Kullanım (backend dizininde):
+    python scripts/export_clip_onnx.py [--out app/services/clip_onnx] [--images klasör] \
+        [--labels dog cat car] [--min-agreement 0.95]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.config import CLIP_MODEL_NAME, CLIP_ONNX_DIR  # noqa: E402
+from app.services.clip_onnx import (  # noqa: E402
+    META_FILE, TEXT_FILE, VISUAL_FILE, VOCAB_FILE, ClipOnnxEncoder, quantized_name,
+)
+
+OPSET = 17
+DEFAULT_LABELS = ["dog", "cat", "car", "person", "bicycle", "bird", "tree", "building"]
+
+
+def export(model_name: str, out_dir: str):
+    import torch
+    import clip
+
+    model, _ = clip.load(model_name, device="cpu", jit=False)
+    model = model.float().eval()
+    resolution = model.visual.input_resolution
+    context_length = model.context_length
+
+    class VisualEncoder(torch.nn.Module):
+        def __init__(self, clip_model):
+            super().__init__()
+            self.clip_model = clip_model
+
+        def forward(self, pixel_values):
+            return self.clip_model.encode_image(pixel_values)
+
+    class TextEncoder(torch.nn.Module):
+        def __init__(self, clip_model):
+            super().__init__()
+            self.clip_model = clip_model
+
+        def forward(self, input_ids):
+            return self.clip_model.encode_text(input_ids)
+
+    os.makedirs(out_dir, exist_ok=True)
+    with torch.no_grad():
+        torch.onnx.export(
+            VisualEncoder(model), torch.randn(1, 3, resolution, resolution),
+            os.path.join(out_dir, VISUAL_FILE),
+            input_names=["pixel_values"], output_names=["image_embeds"],
+            dynamic_axes={"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}},
+            opset_version=OPSET,
+        )
+        torch.onnx.export(
+            TextEncoder(model), clip.tokenize(["a photo"]).long(),
+            os.path.join(out_dir, TEXT_FILE),
+            input_names=["input_ids"], output_names=["text_embeds"],
+            dynamic_axes={"input_ids": {0: "batch"}, "text_embeds": {0: "batch"}},
+            opset_version=OPSET,
+        )
+
+    # Tokenizer sözlüğü ve skaler parametreler çalışma zamanında torch'suz okunur
+    vocab_src = os.path.join(os.path.dirname(clip.__file__), VOCAB_FILE)
+    shutil.copyfile(vocab_src, os.path.join(out_dir, VOCAB_FILE))
+    with open(os.path.join(out_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump({
+            "model_name": model_name,
+            "logit_scale": float(model.logit_scale.exp()),
+            "input_resolution": int(resolution),
+            "context_length": int(context_length),
+            "embed_dim": int(model.visual.output_dim),
+            "opset": OPSET,
+        }, f, indent=2)
+    return model
+
+
+def quantize(out_dir: str):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    for filename in (VISUAL_FILE, TEXT_FILE):
+        quantize_dynamic(
+            os.path.join(out_dir, filename),
+            os.path.join(out_dir, quantized_name(filename)),
+            weight_type=QuantType.QInt8,
+        )
+
+
+def _load_images(images_dir, count: int = 32):
+    if images_dir:
+        names = sorted(n for n in os.listdir(images_dir) if n.lower().endswith((".jpg", ".jpeg", ".png", ".webp")))
+        return [Image.open(os.path.join(images_dir, n)).convert("RGB") for n in names[:count]]
+    # Gerçek görsel yoksa sayısal uyum için sentetik görseller
+    rng = np.random.default_rng(0)
+    return [Image.fromarray((rng.random((256, 320, 3)) * 255).astype(np.uint8)) for _ in range(count)]
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    return x / np.linalg.norm(x, axis=-1, keepdims=True).clip(1e-12)
+
+
+def parity(model, out_dir: str, images, labels):
+    import torch
+    import clip
+    from torchvision import transforms  # clip bağımlılığı
+
+    preprocess = transforms.Compose([
+        transforms.Resize(model.visual.input_resolution, interpolation=transforms.InterpolationMode.BICUBIC),
+        transforms.CenterCrop(model.visual.input_resolution),
+        transforms.ToTensor(),
+        transforms.Normalize((0.48145466, 0.4578275, 0.40821073), (0.26862954, 0.26130258, 0.27577711)),
+    ])
+    with torch.no_grad():
+        ref_img = model.encode_image(torch.stack([preprocess(im) for im in images])).numpy()
+        ref_txt = model.encode_text(clip.tokenize(labels)).numpy()
+    ref_labels = (_normalize(ref_img) @ _normalize(ref_txt).T).argmax(axis=1)
+
+    report = {}
+    for variant, quantized in (("fp32", False), ("int8", True)):
+        if not os.path.exists(os.path.join(out_dir, quantized_name(VISUAL_FILE) if quantized else VISUAL_FILE)):
+            continue
+        encoder = ClipOnnxEncoder(out_dir, quantized=quantized)
+        img = encoder.encode_images(images)
+        txt = encoder.encode_text(labels)
+        onnx_labels = (_normalize(img) @ _normalize(txt).T).argmax(axis=1)
+        report[variant] = {
+            "label_agreement": float((onnx_labels == ref_labels).mean()),
+            "image_cosine_min": float((_normalize(img) * _normalize(ref_img)).sum(axis=1).min()),
+            "text_cosine_min": float((_normalize(txt) * _normalize(ref_txt)).sum(axis=1).min()),
+        }
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=CLIP_MODEL_NAME)
+    parser.add_argument("--out", default=CLIP_ONNX_DIR)
+    parser.add_argument("--images", default=None, help="Uyum kontrolü için görsel klasörü")
+    parser.add_argument("--labels", nargs="+", default=DEFAULT_LABELS)
+    parser.add_argument("--min-agreement", type=float, default=0.95)
+    parser.add_argument("--skip-quantize", action="store_true")
+    args = parser.parse_args()
+
+    model = export(args.model, args.out)
+    if not args.skip_quantize:
+        quantize(args.out)
+
+    report = parity(model, args.out, _load_images(args.images), args.labels)
+    print(json.dumps(report, indent=2))
+    failed = [v for v, r in report.items() if r["label_agreement"] < args.min_agreement]
+    if failed:
+        print(f"HATA: etiket uyumu {args.min_agreement:.0%} altında: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine
+
+import app.db.init_db  # noqa: F401  tüm tablolar metadata'ya kaydolsun
+from app.db.session import get_session
+from app.main import app
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(session):
+    # Startup olayları (init_db, recover_jobs) çalışmasın diye context manager kullanılmaz
+    app.dependency_overrides[get_session] = lambda: session
+    yield TestClient(app)
+    app.dependency_overrides.clear()
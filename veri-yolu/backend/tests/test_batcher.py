@@ -0,0 +1,99 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.services.batcher import MicroBatcher
+
+
+class _Recorder:
+    """İleri geçiş yerine geçer: her çağrının batch boyutunu kaydeder, satırları iki katına çıkarır."""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    def __call__(self, batch):
+        self.calls.append(len(batch))
+        if self.error is not None:
+            raise self.error
+        return batch * 2
+
+
+def _submit_concurrently(batcher, inputs):
+    results, errors = [None] * len(inputs), [None] * len(inputs)
+    start = threading.Barrier(len(inputs))
+
+    def worker(i):
+        start.wait()
+        try:
+            results[i] = batcher.submit(inputs[i])
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(inputs))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results, errors
+
+
+def test_concurrent_submits_coalesce_into_one_forward_pass():
+    fn = _Recorder()
+    batcher = MicroBatcher(fn, max_batch_size=8, max_wait_ms=500)
+    a, b = np.arange(2.0).reshape(2, 1), np.arange(10.0, 13.0).reshape(3, 1)
+    results, errors = _submit_concurrently(batcher, [a, b])
+    assert errors == [None, None]
+    assert fn.calls == [5]
+    # Her çağıran yalnızca kendi satırlarını alır
+    np.testing.assert_array_equal(results[0], a * 2)
+    np.testing.assert_array_equal(results[1], b * 2)
+    assert batcher.stats()["requests"] == 2 and batcher.stats()["batches"] == 1
+
+
+def test_lone_request_waits_at_most_max_wait():
+    fn = _Recorder()
+    batcher = MicroBatcher(fn, max_batch_size=8, max_wait_ms=50)
+    started = time.monotonic()
+    np.testing.assert_array_equal(batcher.submit(np.ones((1, 2))), np.full((1, 2), 2.0))
+    elapsed = time.monotonic() - started
+    assert 0.04 <= elapsed < 1.0
+    assert fn.calls == [1]
+
+
+def test_full_batch_runs_without_waiting():
+    fn = _Recorder()
+    batcher = MicroBatcher(fn, max_batch_size=4, max_wait_ms=10_000)
+    started = time.monotonic()
+    batcher.submit(np.ones((4, 1)))
+    assert time.monotonic() - started < 1.0
+
+
+def test_large_request_is_split_into_max_batch_size_chunks():
+    fn = _Recorder()
+    batcher = MicroBatcher(fn, max_batch_size=4, max_wait_ms=0)
+    x = np.arange(10.0).reshape(10, 1)
+    np.testing.assert_array_equal(batcher.submit(x), x * 2)
+    assert fn.calls == [4, 4, 2]
+
+
+def test_error_propagates_to_every_waiting_submitter():
+    fn = _Recorder(error=RuntimeError("model çöktü"))
+    batcher = MicroBatcher(fn, max_batch_size=8, max_wait_ms=500)
+    results, errors = _submit_concurrently(batcher, [np.ones((1, 1)), np.ones((2, 1))])
+    assert fn.calls == [3]
+    assert results == [None, None]
+    assert all(isinstance(e, RuntimeError) and str(e) == "model çöktü" for e in errors)
+
+    # İşçi iş parçacığı hatadan sonra da çalışmaya devam eder
+    fn.error = None
+    np.testing.assert_array_equal(batcher.submit(np.ones((1, 1))), [[2.0]])
+
+
+def test_empty_input_bypasses_queue():
+    fn = _Recorder()
+    batcher = MicroBatcher(fn)
+    assert batcher.submit(np.empty((0, 3))).shape == (0, 3)
+    assert batcher._threads == []
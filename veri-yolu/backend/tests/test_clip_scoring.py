@@ -0,0 +1,61 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image as PILImage
+from sqlmodel import select
+
+from app.api import image as image_api
+from app.api.deps import get_current_user
+from app.main import app
+from app.models.category import Category
+from app.models.image import Image
+from app.models.topic import Topic
+from app.models.user import User
+from app.services import clip_labeler
+
+
+def _no_model(*args, **kwargs):
+    raise AssertionError("CLIP modeli yüklenmemeliydi")
+
+
+@pytest.fixture
+def no_clip(monkeypatch):
+    monkeypatch.setattr(clip_labeler, "load_model", _no_model)
+    monkeypatch.setattr(clip_labeler, "_encode_pixels", _no_model)
+    monkeypatch.setattr(clip_labeler, "_preprocess_images", _no_model)
+    monkeypatch.setattr(clip_labeler, "encode_text", _no_model)
+
+
+def test_encode_images_empty_does_not_touch_model(no_clip, monkeypatch):
+    monkeypatch.setattr(clip_labeler, "CLIP_BACKEND", "torch")
+    features = clip_labeler.encode_images([])
+    assert features.shape == (0, 512)
+    assert features.dtype == np.float32
+    assert clip_labeler.relevance_from_features(features, ["kedi", "köpek"]) == []
+
+
+def test_upload_of_only_rejected_images_skips_scoring(session, client, no_clip, monkeypatch, tmp_path):
+    monkeypatch.setattr(image_api, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(image_api, "encode_images", _no_model)
+    monkeypatch.setattr(image_api, "relevance_from_features", _no_model)
+    user = User(email="u@veriyolu.com", hashed_password="x")
+    category = Category(name_tr="Genel")
+    session.add_all([user, category])
+    session.commit()
+    topic = Topic(title="Kediler", category_id=category.id, owner_id=user.id)
+    session.add(topic)
+    session.commit()
+    app.dependency_overrides[get_current_user] = lambda: user
+
+    buf = io.BytesIO()
+    PILImage.new("RGB", (256, 256), (128, 128, 128)).save(buf, format="PNG")
+    response = client.post(
+        f"/images/{topic.id}/upload",
+        files=[("files", ("gri.png", buf.getvalue(), "image/png"))],
+    )
+    app.dependency_overrides.pop(get_current_user)
+
+    assert response.status_code == 200, response.text
+    assert [r["quality_reason"] for r in response.json()["results"]] == ["blank"]
+    assert session.exec(select(Image)).one().status == "rejected"
@@ -0,0 +1,88 @@
+import random
+
+import pytest
+from PIL import Image as PILImage
+
+from app.models.image import Image
+from app.services.dedup import BKTree, TopicHashIndex, dhash, hamming, to_signed64, to_unsigned64
+
+
+def _flip(value, bits):
+    for bit in bits:
+        value ^= 1 << bit
+    return value
+
+
+def test_bktree_exact_lookup():
+    tree = BKTree()
+    tree.add(0b1010, "a")
+    tree.add(0b1010, "b")
+    tree.add(0b0101, "c")
+    assert tree.size == 3
+    assert tree.search(0b1010, 0) == [(0, "a"), (0, "b")]
+    assert tree.search(0b1111, 1) == []
+
+
+def test_bktree_empty():
+    assert BKTree().search(123, 64) == []
+
+
+@pytest.mark.parametrize("radius", [0, 1, 3, 8, 20])
+def test_bktree_radius_search_matches_brute_force(radius):
+    rng = random.Random(radius)
+    values = [rng.getrandbits(64) for _ in range(300)]
+    # Birbirine yakın kümeler: yarıçap sorguları gerçekten birden çok öğe döndürsün
+    values += [_flip(values[i], rng.sample(range(64), rng.randint(1, 6))) for i in range(100)]
+    tree = BKTree()
+    for i, value in enumerate(values):
+        tree.add(value, i)
+    for query in values[:50] + [rng.getrandbits(64) for _ in range(20)]:
+        expected = sorted((hamming(query, v), i) for i, v in enumerate(values) if hamming(query, v) <= radius)
+        found = tree.search(query, radius)
+        assert sorted(found) == expected
+        assert [d for d, _ in found] == sorted(d for d, _ in found)
+
+
+def test_signed_roundtrip():
+    for value in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+        assert -(1 << 63) <= to_signed64(value) < (1 << 63)
+        assert to_unsigned64(to_signed64(value)) == value
+
+
+def test_dhash_stable_under_resize():
+    img = PILImage.radial_gradient("L").resize((300, 200))
+    assert hamming(dhash(img), dhash(img.resize((150, 100)))) <= 2
+
+
+@pytest.fixture
+def topic_images(session):
+    def add(image_id, value, topic_id=1):
+        session.add(Image(id=image_id, filename=f"{image_id}.jpg", topic_id=topic_id, uploader_id=1,
+                          dhash=to_signed64(value)))
+        session.commit()
+    return add
+
+
+def test_index_finds_late_committed_lower_id(session, topic_images):
+    index = TopicHashIndex(1)
+    topic_images(10, 0xFFFF)
+    assert index.find(session, 0xFFFF, 0) == 10
+    # Daha küçük id'li satır sonradan commit edildi
+    topic_images(7, 0xF0F0F0F0)
+    assert index.find(session, 0xF0F0F0F0, 2) == 7
+
+
+def test_index_rebuilds_when_row_count_disagrees(session, topic_images):
+    index = TopicHashIndex(1)
+    index.REFRESH_WINDOW = 1
+    topic_images(500, 0xFFFF)
+    topic_images(501, 0xAAAA, topic_id=2)
+    assert index.find(session, 0xFFFF, 0) == 500
+    topic_images(3, 1 << 40)  # pencerenin çok altında
+    assert index.find(session, 1 << 40, 0) == 3
+    assert index._ids == {3, 500}
+
+    session.delete(session.get(Image, 500))
+    session.commit()
+    assert index.find(session, 0xFFFF, 0) is None
+    assert index._ids == {3}
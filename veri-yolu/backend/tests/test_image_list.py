@@ -0,0 +1,73 @@
+import pytest
+
+from app.models.category import Category
+from app.models.image import Image
+from app.models.topic import Topic
+from app.models.user import User
+
+
+@pytest.fixture
+def topic_id(session):
+    user = User(email="uploader@veriyolu.com", hashed_password="x")
+    category = Category(name_tr="Genel")
+    session.add(user)
+    session.add(category)
+    session.commit()
+    topic = Topic(title="Kediler", category_id=category.id, owner_id=user.id)
+    session.add(topic)
+    session.commit()
+    for i in range(5):
+        session.add(Image(filename=f"{i}.jpg", topic_id=topic.id, uploader_id=user.id,
+                          status="approved", annotation_count=i))
+    session.add(Image(filename="pending.jpg", topic_id=topic.id, uploader_id=user.id))
+    session.commit()
+    return topic.id
+
+
+def test_all_fields(client, topic_id):
+    response = client.get(f"/images/{topic_id}/list")
+    assert response.status_code == 200
+    body = response.json()
+    assert [row["filename"] for row in body] == [f"{i}.jpg" for i in range(5)]
+    assert body[0] == {
+        "id": body[0]["id"], "filename": "0.jpg", "uploader_name": "uploader@veriyolu.com",
+        "annotation_count": 0, "type": None, "is_relevant": None,
+    }
+    assert "X-Next-After-Id" not in response.headers
+
+
+@pytest.mark.parametrize("fields", ["id", "type", "filename", "type,annotation_count"])
+def test_projection_always_returns_id(client, topic_id, fields):
+    response = client.get(f"/images/{topic_id}/list", params={"fields": fields})
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == 5
+    expected = {"id"} | set(fields.split(","))
+    assert all(set(row) == expected for row in body)
+
+
+def test_unknown_fields_rejected(client, topic_id):
+    response = client.get(f"/images/{topic_id}/list", params={"fields": "nope"})
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("fields", [None, "id"])
+def test_cursor_walks_all_pages(client, topic_id, fields):
+    seen, after_id = [], None
+    while True:
+        params = {"limit": 2}
+        if fields:
+            params["fields"] = fields
+        if after_id is not None:
+            params["after_id"] = after_id
+        response = client.get(f"/images/{topic_id}/list", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 2
+        seen.extend(row["id"] for row in page)
+        after_id = response.headers.get("X-Next-After-Id")
+        if after_id is None:
+            break
+        assert int(after_id) == page[-1]["id"]
+    assert len(seen) == 5
+    assert seen == sorted(seen)
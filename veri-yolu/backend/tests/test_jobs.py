@@ -0,0 +1,107 @@
+import os
+
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+
+from app.services import jobs
+
+
+def _fake_run_job(job_id):
+    # Havuz işçisinde çalışır (spawn ile bu modül yeniden içe aktarılır)
+    if job_id < 0:
+        os._exit(1)  # OOM/çökme benzetimi: işçi aniden ölür
+    return job_id * 10
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    lost = []
+    monkeypatch.setattr(jobs, "run_job", _fake_run_job)
+    monkeypatch.setattr(jobs, "_handle_lost_job", lambda job_id, retries: lost.append((job_id, retries)))
+    monkeypatch.setattr(jobs, "_executor", None)
+    yield lost
+    if jobs._executor is not None:
+        jobs._executor.shutdown(wait=True)
+
+
+def test_next_job_runs_after_worker_dies(pool):
+    assert jobs.enqueue_job(1).result(timeout=60) == 10
+
+    broken = jobs._executor
+    crashed = jobs.enqueue_job(-1)
+    with pytest.raises(BrokenProcessPool):
+        crashed.result(timeout=60)
+
+    assert jobs.enqueue_job(2).result(timeout=60) == 20
+    assert jobs._executor is not broken
+    assert pool == [(-1, 1)]
+
+
+def test_submit_to_broken_pool_rebuilds_once(pool):
+    jobs.enqueue_job(1).result(timeout=60)
+    broken = jobs._executor
+    with pytest.raises(BrokenProcessPool):
+        jobs.enqueue_job(-1).result(timeout=60)
+    # Sıfırlama geri çağrıdan önce yapılmamış gibi: bozuk havuz hâlâ kayıtlı
+    jobs._executor = broken
+    assert jobs.enqueue_job(3).result(timeout=60) == 30
+    assert jobs._executor is not broken
+
+
+@pytest.mark.parametrize("retries, status", [(1, "queued"), (0, "failed")])
+def test_lost_job_requeued_once_then_failed(session, monkeypatch, retries, status):
+    from app.models.job import InferenceJob
+
+    sent = []
+    monkeypatch.setattr(jobs, "engine", session.get_bind())
+    monkeypatch.setattr(jobs, "enqueue_job", lambda job_id, lost_retries=1: sent.append((job_id, lost_retries)))
+    job = InferenceJob(kind="ingest", user_id=1, status="running", owner="host:1")
+    session.add(job)
+    session.commit()
+
+    jobs._handle_lost_job(job.id, retries)
+
+    session.refresh(job)
+    assert job.status == status
+    assert sent == ([(job.id, 0)] if retries else [])
+
+
+def test_auto_annotate_checks_quality_only_for_unchecked_images(session, monkeypatch):
+    from app.models.category import Category
+    from app.models.image import Image
+    from app.models.job import InferenceJob
+    from app.models.topic import Topic
+    from app.services import auto_annotate, quality
+
+    category = Category(name_tr="Genel")
+    session.add(category)
+    session.commit()
+    topic = Topic(title="Kediler", category_id=category.id, owner_id=1)
+    session.add(topic)
+    session.commit()
+    passed = Image(filename="passed.jpg", topic_id=topic.id, uploader_id=1, quality_checked=True)
+    rejected = Image(filename="blank.jpg", topic_id=topic.id, uploader_id=1, quality_reason="blank", quality_checked=True)
+    legacy = Image(filename="legacy.jpg", topic_id=topic.id, uploader_id=1)
+    job = InferenceJob(kind="auto_annotate", user_id=1, topic_id=topic.id, status="running")
+    session.add_all([passed, rejected, legacy, job])
+    session.commit()
+
+    checked, annotated = [], []
+    monkeypatch.setattr(quality, "check_quality",
+                        lambda path: checked.append(path) or quality.QualityResult("blurry", 100, 100))
+    monkeypatch.setattr(auto_annotate, "annotate_image", lambda path, labels: annotated.append(path) or [])
+    monkeypatch.setattr(auto_annotate, "write_export", lambda *args: "export.json")
+
+    jobs._run_auto_annotate(session, job)
+    assert checked == [os.path.join(jobs.UPLOAD_DIR, "legacy.jpg")]
+    assert annotated == [os.path.join(jobs.UPLOAD_DIR, "passed.jpg")]
+    session.refresh(legacy)
+    assert (legacy.quality_reason, legacy.quality_checked) == ("blurry", True)
+
+    # İkinci çalıştırmada hiçbir görsel yeniden denetlenmez
+    checked.clear()
+    job2 = InferenceJob(kind="auto_annotate", user_id=1, topic_id=topic.id, status="running")
+    session.add(job2)
+    session.commit()
+    jobs._run_auto_annotate(session, job2)
+    assert checked == []
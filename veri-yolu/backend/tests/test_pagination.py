@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlmodel import select
+
+from app.api.pagination import PageParams, decode_cursor, paginate
+from app.models.user import User
+
+
+@pytest.fixture
+def users(session):
+    base = datetime(2024, 1, 1)
+    # Aynı created_at'e sahip satırlar id ile ayrışmalı
+    for i in range(7):
+        session.add(User(email=f"u{i}@veriyolu.com", hashed_password="x", created_at=base + timedelta(days=i // 2)))
+    session.commit()
+    return session.exec(select(User)).all()
+
+
+def _walk(session, query, descending=True):
+    seen, cursor = [], None
+    while True:
+        response = Response()
+        rows = paginate(session, query, User, PageParams(cursor, 3, False), response, descending=descending)
+        seen.extend(rows)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_model_select(session, users, descending):
+    rows = _walk(session, select(User), descending)
+    keys = [(u.created_at, u.id) for u in rows]
+    assert keys == sorted(keys, reverse=descending)
+    assert len(keys) == len(users)
+
+
+def test_tuple_select_uses_model_key(session, users):
+    rows = _walk(session, select(User, User.email))
+    assert [user.id for user, _ in rows] == [u.id for u in sorted(users, key=lambda u: (u.created_at, u.id), reverse=True)]
+
+
+def test_total_header(session, users):
+    response = Response()
+    paginate(session, select(User), User, PageParams(None, 2, True), response)
+    assert response.headers["X-Total-Count"] == str(len(users))
+
+
+def test_bad_cursor():
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("bozuk")
+    assert exc.value.status_code == 400
@@ -0,0 +1,85 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image, ImageFilter
+
+from app.services.quality import check_quality, laplacian_variance
+
+rng = np.random.default_rng(0)
+
+
+def _noise(width, height):
+    return Image.fromarray(rng.integers(0, 256, (height, width), dtype=np.uint8), "L")
+
+
+def _encode(img, fmt="PNG"):
+    buf = io.BytesIO()
+    img.save(buf, format=fmt)
+    return buf.getvalue()
+
+
+def test_corrupt():
+    result = check_quality(b"resim degil")
+    assert result.reason == "corrupt"
+    assert result.status == "rejected"
+
+
+def test_too_small():
+    result = check_quality(_encode(_noise(32, 32)))
+    assert result.reason == "too_small"
+    assert result.status == "rejected"
+    assert (result.width, result.height) == (32, 32)
+
+
+def test_blank():
+    result = check_quality(_encode(Image.new("L", (512, 512), 128)))
+    assert result.reason == "blank"
+    assert result.status == "rejected"
+
+
+def test_blurry():
+    # Kontrastlı ama keskin kenarı olmayan görsel: bulanıklaştırılmış iri dama tahtası
+    squares = (np.indices((512, 512)) // 128).sum(axis=0) % 2 * 255
+    blurred = Image.fromarray(squares.astype(np.uint8), "L").filter(ImageFilter.GaussianBlur(8))
+    result = check_quality(_encode(blurred))
+    assert result.reason == "blurry"
+    assert result.status == "pending"
+
+
+@pytest.mark.parametrize("fmt", ["PNG", "JPEG"])
+def test_sharp_image_passes(fmt):
+    result = check_quality(_encode(_noise(1024, 768).convert("RGB"), fmt))
+    assert result.ok
+    assert result.status is None
+
+
+@pytest.mark.parametrize("size", [(4000, 64), (64, 4000), (20000, 300)])
+@pytest.mark.parametrize("fmt", ["PNG", "JPEG"])
+def test_extreme_aspect_keeps_texture(size, fmt):
+    # Uzun kenara göre küçültme bu görselleri birkaç piksele indirip 'blank' sayıyordu
+    result = check_quality(_encode(_noise(*size), fmt))
+    assert result.ok, result
+    assert result.std > 30
+
+
+def test_pil_source():
+    assert check_quality(_noise(300, 300)).ok
+
+
+@pytest.mark.parametrize("shape", [(2, 100), (100, 2), (1, 1), (0, 5)])
+def test_laplacian_needs_three_rows_and_columns(shape):
+    assert laplacian_variance(np.zeros(shape, dtype=np.uint8)) is None
+
+
+def test_laplacian_flat_is_zero():
+    assert laplacian_variance(np.full((3, 3), 7, dtype=np.uint8)) == 0.0
+
+
+def test_checked_marker(monkeypatch):
+    from app.services import quality
+
+    assert check_quality(_encode(_noise(300, 300))).checked
+    assert check_quality(b"resim degil").checked
+    monkeypatch.setattr(quality, "QUALITY_FILTER", False)
+    assert not check_quality(_encode(_noise(300, 300))).checked
@@ -0,0 +1,115 @@
+import os
+
+import pytest
+
+from app.services.result_cache import ResultCache, file_digest, model_version, result_key
+from app.utils import cache as cache_module
+from app.utils.cache import LRUCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=3)
+    for key in "abc":
+        cache.set(key, key.upper())
+    assert cache.get("a") == "A"  # a en son kullanılan olur; sıra: b, c, a
+    cache.set("d", "D")
+    assert cache.get("b") is None
+    cache.set("e", "E")
+    assert cache.get("c") is None
+    assert [k for k in "ade" if cache.get(k) is not None] == ["a", "d", "e"]
+    assert len(cache) == 3
+
+
+def test_lru_set_existing_key_refreshes_recency():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("a", 3)
+    cache.set("c", 4)
+    assert cache.get("a") == 3 and cache.get("b") is None
+
+
+def test_lru_hit_miss_counters_and_get_or_set():
+    cache = LRUCache(maxsize=4)
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return "değer"
+
+    assert cache.get_or_set("k", factory) == "değer"
+    assert cache.get_or_set("k", factory) == "değer"
+    assert len(calls) == 1
+    assert cache.get("yok") is None
+    assert cache.stats() == {"size": 1, "maxsize": 4, "hits": 1, "misses": 2}
+
+
+def test_lru_ttl_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = LRUCache(maxsize=4, ttl=10)
+    cache.set("k", 1)
+    now[0] = 109.0
+    assert cache.get("k") == 1
+    now[0] = 110.0
+    assert cache.get("k") is None and len(cache) == 0
+
+
+def test_result_key_covers_every_input():
+    base = result_key("yolo", "h", ["cat", "dog"], "m:1", 0.25, 0.45)
+    assert base == result_key("yolo", "h", ["cat", "dog"], "m:1", 0.25, 0.45)
+    assert len({
+        base,
+        result_key("clip", "h", ["cat", "dog"], "m:1", 0.25, 0.45),
+        result_key("yolo", "h2", ["cat", "dog"], "m:1", 0.25, 0.45),
+        result_key("yolo", "h", ["dog", "cat"], "m:1", 0.25, 0.45),
+        result_key("yolo", "h", ["cat", "dog"], "m:2", 0.25, 0.45),
+        result_key("yolo", "h", ["cat", "dog"], "m:1", 0.3, 0.45),
+    }) == 6
+
+
+def test_file_digest_is_content_addressed(tmp_path):
+    a, b = tmp_path / "a.jpg", tmp_path / "b.jpg"
+    a.write_bytes(b"ayni")
+    b.write_bytes(b"ayni")
+    assert file_digest(str(a)) == file_digest(str(b))
+    b.write_bytes(b"farkli")
+    os.utime(b, ns=(1, 1))  # mtime değişsin; önbellek anahtarı (yol, mtime, boyut)
+    assert file_digest(str(a)) != file_digest(str(b))
+
+
+def test_model_version_tracks_file_changes(tmp_path):
+    path = tmp_path / "model.onnx"
+    assert model_version(str(path)) == "model.onnx"
+    path.write_bytes(b"v1")
+    v1 = model_version(str(path))
+    path.write_bytes(b"v2-daha-uzun")
+    assert model_version(str(path)) != v1
+
+
+def test_result_cache_memory_hit_and_miss():
+    cache = ResultCache(maxsize=2, disk_dir=None)
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return [{"bbox": [0, 0, 1, 1]}]
+
+    assert cache.get_or_set("k", factory) == cache.get_or_set("k", factory)
+    assert len(calls) == 1
+    assert cache.get("yok", "varsayılan") == "varsayılan"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["disk_hits"]) == (1, 2, 0)
+
+
+def test_result_cache_disk_layer_survives_memory_eviction(tmp_path):
+    cache = ResultCache(maxsize=1, disk_dir=str(tmp_path))
+    cache.set("a" * 64, {"v": 1})
+    cache.set("b" * 64, {"v": 2})  # a bellekten atılır, diskte kalır
+    assert cache.get("a" * 64) == {"v": 1}
+    assert cache.disk_hits == 1
+
+    # Yeni süreç (boş bellek) aynı dizinden okur
+    fresh = ResultCache(maxsize=1, disk_dir=str(tmp_path))
+    assert fresh.get_or_set("b" * 64, lambda: pytest.fail("factory çağrılmamalı")) == {"v": 2}
+    assert fresh.disk_hits == 1
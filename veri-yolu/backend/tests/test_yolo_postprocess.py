@@ -0,0 +1,141 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from app.services.preprocessing import DecodedImage, LetterboxMeta, letterbox, yolo_input
+from app.services.yolo_labeler import COCO_CLASSES, decode_yolo_output, nms, scale_boxes
+
+NC = len(COCO_CLASSES)
+
+
+def _raw(candidates, objectness=None, n=100):
+    """
+    (cx, cy, w, h, sınıf, skor) listesinden (N, 4+nc) ya da (N, 5+nc) ham çıktı.
+    Gerçek çıktılardaki gibi N > 4+nc olsun diye kalan satırlar sıfır skorla doldurulur.
+    """
+    width = 4 + NC + (objectness is not None)
+    rows = np.zeros((n, width), dtype=np.float32)
+    offset = 5 if objectness is not None else 4
+    for row, (cx, cy, w, h, cls, score) in zip(rows, candidates):
+        row[:4] = (cx, cy, w, h)
+        row[offset + cls] = score
+    if objectness is not None:
+        rows[:len(objectness), 4] = objectness
+    return rows
+
+
+CANDIDATES = [
+    (100, 100, 40, 20, 0, 0.9),   # kişi
+    (102, 101, 40, 20, 0, 0.8),   # aynı kişinin kopyası (yüksek IoU)
+    (102, 101, 40, 20, 16, 0.7),  # aynı yerde köpek: farklı sınıf, tutulmalı
+    (300, 200, 10, 10, 2, 0.1),   # eşik altı
+]
+
+
+def test_decode_yolov8_layout():
+    preds = _raw(CANDIDATES).T[None]  # (1, 84, N)
+    boxes, scores, class_ids = decode_yolo_output(preds, conf_threshold=0.25)
+    np.testing.assert_allclose(boxes[0], [80, 90, 120, 110])
+    np.testing.assert_allclose(scores, [0.9, 0.8, 0.7], rtol=1e-6)
+    assert class_ids.tolist() == [0, 0, 16]
+
+
+def test_decode_row_major_matches_channel_major():
+    raw = _raw(CANDIDATES)
+    for a, b in zip(decode_yolo_output(raw, 0.25), decode_yolo_output(raw.T[None], 0.25)):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_decode_yolov5_objectness_scales_scores():
+    raw = _raw(CANDIDATES, objectness=np.array([1.0, 0.5, 0.2, 1.0], dtype=np.float32))
+    _, scores, class_ids = decode_yolo_output(raw, conf_threshold=0.25)
+    np.testing.assert_allclose(scores, [0.9, 0.4], rtol=1e-6)
+    assert class_ids.tolist() == [0, 0]
+
+
+def test_decode_nms_known_boxes():
+    boxes, scores, class_ids = decode_yolo_output(_raw(CANDIDATES).T[None], 0.25)
+    keep = nms(boxes, scores, class_ids, iou_threshold=0.45)
+    assert keep.tolist() == [0, 2]
+
+
+def test_nms_empty_and_max_det():
+    assert nms(np.zeros((0, 4), np.float32), np.zeros(0), np.zeros(0, int), 0.5).shape == (0,)
+    boxes = np.array([[i * 100, 0, i * 100 + 50, 50] for i in range(5)], dtype=np.float32)
+    keep = nms(boxes, np.linspace(0.9, 0.5, 5), np.zeros(5, int), 0.5, max_det=3)
+    assert keep.tolist() == [0, 1, 2]
+
+
+def _reference_nms(boxes, scores, class_ids, iou_threshold):
+    keep = []
+    for i in np.argsort(-scores, kind="stable"):
+        ok = True
+        for j in keep:
+            if class_ids[i] != class_ids[j]:
+                continue
+            xx1, yy1 = max(boxes[i, 0], boxes[j, 0]), max(boxes[i, 1], boxes[j, 1])
+            xx2, yy2 = min(boxes[i, 2], boxes[j, 2]), min(boxes[i, 3], boxes[j, 3])
+            inter = max(0, xx2 - xx1) * max(0, yy2 - yy1)
+            area = lambda b: (b[2] - b[0]) * (b[3] - b[1])
+            if inter / (area(boxes[i]) + area(boxes[j]) - inter) > iou_threshold:
+                ok = False
+                break
+        if ok:
+            keep.append(i)
+    return keep
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_nms_matches_reference(seed):
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, 500, (200, 2))
+    wh = rng.uniform(10, 120, (200, 2))
+    boxes = np.hstack([xy, xy + wh]).astype(np.float32)
+    scores = rng.permutation(200).astype(np.float32) / 200  # eşit skor yok
+    class_ids = rng.integers(0, 3, 200)
+    assert nms(boxes, scores, class_ids, 0.45).tolist() == _reference_nms(boxes, scores, class_ids, 0.45)
+
+
+def test_scale_boxes_inverts_letterbox():
+    meta = LetterboxMeta(ratio=0.5, pad_x=0, pad_y=160, orig_w=1280, orig_h=640)
+    original = np.array([[100, 50, 400, 300], [0, 0, 1280, 640]], dtype=np.float32)
+    letterboxed = original * meta.ratio + [meta.pad_x, meta.pad_y, meta.pad_x, meta.pad_y]
+    np.testing.assert_allclose(scale_boxes(letterboxed, meta), original)
+    # Dolgu alanına taşan kutular görsel sınırına kırpılır
+    np.testing.assert_allclose(scale_boxes(np.array([[-10, 0, 700, 640]], np.float32), meta), [[0, 0, 1280, 640]])
+
+
+def _white_rect(size, rect):
+    img = Image.new("RGB", size, (0, 0, 0))
+    ImageDraw.Draw(img).rectangle(rect, fill=(255, 255, 255))
+    return img
+
+
+def _bright_bounds(chw):
+    ys, xs = np.nonzero(chw[0] > 0.9)
+    return np.array([[xs.min(), ys.min(), xs.max() + 1, ys.max() + 1]], dtype=np.float32)
+
+
+@pytest.mark.parametrize("size", [(1280, 640), (480, 960), (640, 640)])
+def test_letterbox_round_trip(size):
+    rect = (size[0] // 4, size[1] // 3, size[0] // 2 - 1, size[1] // 2 - 1)
+    img = _white_rect(size, rect)
+    chw, meta = yolo_input(DecodedImage(img, *size), 640)
+    back = scale_boxes(_bright_bounds(chw), meta)
+    np.testing.assert_allclose(back, [[rect[0], rect[1], rect[2] + 1, rect[3] + 1]], atol=3)
+
+
+def test_letterbox_pads_with_gray():
+    canvas, meta = letterbox(Image.new("RGB", (1280, 640), (0, 0, 0)), 640)
+    assert (meta.pad_x, meta.pad_y, meta.ratio) == (0, 160, 0.5)
+    assert (canvas[:160] == 114).all() and (canvas[480:] == 114).all()
+    assert (canvas[160:480] == 0).all()
+
+
+def test_yolo_input_maps_draft_decoded_image_to_original_pixels():
+    # JPEG draft ile yarı boyutta çözülmüş görsel: kutular yine orijinal piksellere dönmeli
+    size, rect = (2560, 1280), (640, 400, 1279, 799)
+    half = _white_rect(size, rect).resize((1280, 640), Image.NEAREST)
+    chw, meta = yolo_input(DecodedImage(half, *size), 640)
+    assert meta.orig_w == 2560 and meta.ratio == pytest.approx(0.25)
+    np.testing.assert_allclose(scale_boxes(_bright_bounds(chw), meta), [[640, 400, 1280, 800]], atol=4)
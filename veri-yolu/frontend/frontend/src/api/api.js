@@ -10,4 +10,31 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// Sayfalanan liste ucunun tek sayfasını getirir; nextCursor son sayfada null'dır.
+// Büyüyen listeler ("Daha fazla yükle") bunu kullanmalı.
+export async function getPage(url, cursor = null, config = {}) {
+  const params = { ...(config.params || {}), ...(cursor ? { cursor } : {}) };
+  const res = await api.get(url, { ...config, params });
+  return {
+    data: Array.isArray(res.data) ? res.data : [],
+    nextCursor: res.headers?.["x-next-cursor"] || null,
+  };
+}
+
+// Sayfalanan liste uçlarının tüm sayfalarını X-Next-Cursor başlığını izleyerek toplar.
+// Yalnızca listenin tamamı gerçekten gerektiğinde (ör. başlığın gönderileri) kullanılmalı.
+// Dönen nesne axios yanıtı gibi { data } içerir; mevcut çağrılar aynen kullanabilir.
+export async function getAllPages(url, config = {}) {
+  const items = [];
+  let cursor = null;
+  let res;
+  do {
+    const params = { ...(config.params || {}), limit: 500, ...(cursor ? { cursor } : {}) };
+    res = await api.get(url, { ...config, params });
+    if (Array.isArray(res.data)) items.push(...res.data);
+    cursor = res.headers?.["x-next-cursor"] || null;
+  } while (cursor);
+  return { ...res, data: items };
+}
+
 export default api;
@@ -1,5 +1,5 @@
 import { useEffect, useState, useContext } from "react";
-import api from "../api/api";
+import api, { getPage } from "../api/api";
 import { AuthContext } from "../context/AuthContext";
 import { useNavigate } from "react-router-dom";
 
@@ -7,16 +7,20 @@ const AdminPanel = () => {
   const { user } = useContext(AuthContext);
   const [categories, setCategories] = useState([]);
   const [users, setUsers] = useState([]);
+  const [usersCursor, setUsersCursor] = useState(null);
   const [showCatModal, setShowCatModal] = useState(false);
   const [newCatTr, setNewCatTr] = useState("");
   const [catToDelete, setCatToDelete] = useState(null);
   const [toast, setToast] = useState("");
   const [pendingImages, setPendingImages] = useState([]);
+  const [pendingCursor, setPendingCursor] = useState(null);
   const [imgToast, setImgToast] = useState("");
 
-  const fetchUsers = async () => {
-    const res = await api.get("/admin/users");
-    setUsers(res.data);
+  // Listeler sayfa sayfa yüklenir; cursor verilirse sonraki sayfa mevcut listeye eklenir
+  const fetchUsers = async (cursor = null) => {
+    const page = await getPage("/admin/users", cursor);
+    setUsers((prev) => (cursor ? [...prev, ...page.data] : page.data));
+    setUsersCursor(page.nextCursor);
   };
 
   const fetchCategories = async () => {
@@ -52,28 +56,30 @@ const AdminPanel = () => {
     await api.put(`/admin/users/${id}/role`, null, {
       params: { new_role: role },
     });
-    fetchUsers();
+    setUsers((prev) => prev.map((u) => (u.id === id ? { ...u, role } : u)));
     setToast("Rol güncellendi!");
   };
 
-  const fetchPendingImages = async () => {
+  const fetchPendingImages = async (cursor = null) => {
     try {
-      const res = await api.get("/images/pending");
-      setPendingImages(res.data);
+      const page = await getPage("/images/pending", cursor);
+      setPendingImages((prev) => (cursor ? [...prev, ...page.data] : page.data));
+      setPendingCursor(page.nextCursor);
     } catch (err) {
-      setPendingImages([]);
+      if (!cursor) setPendingImages([]);
     }
   };
 
+  // İşlenen görsel listeden çıkarılır; imleç anahtara dayandığı için sonraki sayfa kaymaz
   const approveImage = async (id) => {
     await api.post(`/images/${id}/approve`);
-    fetchPendingImages();
+    setPendingImages((prev) => prev.filter((img) => img.id !== id));
     setImgToast("Görsel onaylandı!");
   };
 
   const rejectImage = async (id) => {
     await api.post(`/images/${id}/reject`);
-    fetchPendingImages();
+    setPendingImages((prev) => prev.filter((img) => img.id !== id));
     setImgToast("Görsel reddedildi!");
   };
 
@@ -200,6 +206,16 @@ const AdminPanel = () => {
               )}
             </tbody>
           </table>
+          {usersCursor && (
+            <div className="text-center mt-4">
+              <button
+                onClick={() => fetchUsers(usersCursor)}
+                className="px-4 py-2 rounded-full border border-gray-300 font-semibold hover:bg-gray-100 transition"
+              >
+                Daha fazla yükle
+              </button>
+            </div>
+          )}
         </div>
       </div>
       {/* Kategori Ekle Modal */}
@@ -318,6 +334,16 @@ const AdminPanel = () => {
               )}
             </tbody>
           </table>
+          {pendingCursor && (
+            <div className="text-center my-4">
+              <button
+                onClick={() => fetchPendingImages(pendingCursor)}
+                className="px-4 py-2 rounded-full border border-gray-300 font-semibold hover:bg-gray-100 transition"
+              >
+                Daha fazla yükle
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>
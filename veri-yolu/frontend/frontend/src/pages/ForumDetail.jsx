@@ -1,6 +1,6 @@
 import React, { useEffect, useState, useContext } from "react";
 import { useParams, useNavigate, Link } from "react-router-dom";
-import api from "../api/api";
+import api, { getPage } from "../api/api";
 import { AuthContext } from "../context/AuthContext";
 import { FiSearch, FiTrash } from "react-icons/fi";
 
@@ -11,6 +11,7 @@ const ForumDetail = () => {
 
   const [forum, setForum] = useState(null);
   const [threads, setThreads] = useState([]);
+  const [threadsCursor, setThreadsCursor] = useState(null);
   const [search, setSearch] = useState("");
   const [status, setStatus] = useState(null);
   const [showNewThread, setShowNewThread] = useState(false);
@@ -33,15 +34,21 @@ const ForumDetail = () => {
     return `hsl(${h}, 65%, 60%)`;
   };
 
+  // Konular sayfa sayfa yüklenir; cursor verilirse sonraki sayfa listeye eklenir
+  const fetchThreads = async (cursor = null) => {
+    const page = await getPage(`/discussions/forums/${forumId}/threads`, cursor);
+    setThreads((prev) => (cursor ? [...prev, ...page.data] : page.data));
+    setThreadsCursor(page.nextCursor);
+  };
+
   useEffect(() => {
     const load = async () => {
       try {
-        const [fRes, tRes] = await Promise.all([
+        const [fRes] = await Promise.all([
           api.get(`/discussions/forums/${forumId}`),
-          api.get(`/discussions/forums/${forumId}/threads`),
+          fetchThreads(),
         ]);
         setForum(fRes.data);
-        setThreads(tRes.data || []);
       } catch (err) {
         setStatus({ type: "error", text: "Forum yüklenemedi." });
       }
@@ -61,8 +68,7 @@ const ForumDetail = () => {
       setTitle("");
       setContent("");
       setShowNewThread(false);
-      const tRes = await api.get(`/discussions/forums/${forumId}/threads`);
-      setThreads(tRes.data || []);
+      await fetchThreads();
       setStatus({ type: "success", text: "Konu oluşturuldu." });
     } catch (err) {
       setStatus({ type: "error", text: "Konu oluşturulamadı." });
@@ -97,9 +103,8 @@ const ForumDetail = () => {
       // setThreads(tRes.data || []);
     } catch (err) {
       setStatus({ type: "error", text: "Konu silinemedi." });
-      // hata olduysa eski listeyi geri yükle
-      const tRes = await api.get(`/discussions/forums/${forumId}/threads`);
-      setThreads(tRes.data || []);
+      // hata olduysa listeyi baştan yükle
+      await fetchThreads();
     }
   };
 
@@ -324,6 +329,20 @@ const ForumDetail = () => {
         )}
       </div>
 
+      {/* Arama yalnızca yüklenen sayfalarda yapılır */}
+      {threadsCursor && (
+        <div className="text-center mt-4">
+          <button
+            onClick={() => fetchThreads(threadsCursor).catch(() =>
+              setStatus({ type: "error", text: "Konular yüklenemedi." })
+            )}
+            className="px-4 py-2 border border-gray-400 rounded-full font-semibold hover:bg-gray-100 cursor-pointer"
+          >
+            Daha fazla yükle
+          </button>
+        </div>
+      )}
+
       {!user && (
         <div className="mt-4 text-sm text-gray-600">
           Yeni konu açmak için giriş yapın.
@@ -72,9 +72,15 @@ const Home = () => {
       });
     } else {
       // Kullanıcıya özel istatistikler
+      // Liste sayfalı; sayı için tek satırlık sayfa istenip X-Total-Count okunur
       api
-        .get("/images/me")
-        .then((res) => setMyStats((s) => ({ ...s, images: res.data.length })))
+        .get("/images/me", { params: { total: true, limit: 1 } })
+        .then((res) =>
+          setMyStats((s) => ({
+            ...s,
+            images: Number(res.headers?.["x-total-count"] ?? res.data.length),
+          }))
+        )
         .catch(() => setMyStats((s) => ({ ...s, images: 0 })));
 
       api
@@ -2,7 +2,7 @@ import React, { useContext, useEffect, useState, useMemo } from "react";
 import { AuthContext } from "../context/AuthContext";
 import { useTranslation } from "react-i18next";
 import { useNavigate } from "react-router-dom";
-import api from "../api/api";
+import api, { getPage } from "../api/api";
 
 const MyImages = () => {
   const { user, token } = useContext(AuthContext);
@@ -11,6 +11,8 @@ const MyImages = () => {
   const [topics, setTopics] = useState({});
   const [error, setError] = useState("");
   const [showMineOnly, setShowMineOnly] = useState(false); // sadece admin için
+  const [nextCursor, setNextCursor] = useState(null); // sayfalı uçta sonraki sayfa
+  const [loadingMore, setLoadingMore] = useState(false);
   const { t } = useTranslation();
   const navigate = useNavigate();
 
@@ -27,6 +29,50 @@ const MyImages = () => {
       return (Number(b?.id) || 0) - (Number(a?.id) || 0);
     });
 
+  const primaryUrl = user?.role === "admin" ? "/images/all" : "/images/me";
+
+  // Yalnızca henüz adı bilinmeyen konular istenir; sonuç mevcut haritaya eklenir
+  const hydrateTopics = async (imgs, known, ignoreFlag = false) => {
+    const topicIds = [
+      ...new Set((imgs || []).map((i) => i.topic_id).filter(Boolean)),
+    ].filter((id) => !(id in known));
+    if (topicIds.length === 0) return;
+    try {
+      const arr = await Promise.all(
+        topicIds.map((id) =>
+          api
+            .get(`/topics/${id}`)
+            .then((r) => r.data)
+            .then((d) => ({ id, name: d?.title || d?.name || "-" }))
+            .catch(() => ({ id, name: String(id) }))
+        )
+      );
+      if (!ignoreFlag) {
+        const map = {};
+        arr.forEach((t) => (map[t.id] = t.name));
+        setTopics((prev) => ({ ...prev, ...map }));
+      }
+    } catch {
+      /* ignore */
+    }
+  };
+
+  const loadMore = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await getPage(primaryUrl, nextCursor);
+      // Sunucu zaten yeni→eski sıralı döndürür; sayfa sona eklenir
+      setImages((prev) => [...prev, ...page.data]);
+      setNextCursor(page.nextCursor);
+      await hydrateTopics(page.data, topics);
+    } catch {
+      setError("Görseller yüklenemedi.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     if (!token || !user) return;
 
@@ -35,16 +81,14 @@ const MyImages = () => {
     const fetchImages = async () => {
       setLoading(true);
       setError("");
-
-      const primaryUrl = user?.role === "admin" ? "/images/all" : "/images/me";
+      setNextCursor(null);
 
       try {
-        const res = await api.get(primaryUrl);
+        const page = await getPage(primaryUrl);
         if (!ignore) {
-          const data = Array.isArray(res.data) ? res.data : [];
-          const sorted = sortByCreatedDesc(data);
-          setImages(sorted);
-          await hydrateTopics(sorted, ignore);
+          setImages(page.data);
+          setNextCursor(page.nextCursor);
+          await hydrateTopics(page.data, {}, ignore);
         }
       } catch {
         // Fallback 1: /images?uploader_id=
@@ -56,7 +100,7 @@ const MyImages = () => {
             const data = Array.isArray(res2.data) ? res2.data : [];
             const sorted = sortByCreatedDesc(data);
             setImages(sorted);
-            await hydrateTopics(sorted, ignore);
+            await hydrateTopics(sorted, {}, ignore);
           }
         } catch {
           // Fallback 2: /images?owner_id=
@@ -68,7 +112,7 @@ const MyImages = () => {
               const data = Array.isArray(res3.data) ? res3.data : [];
               const sorted = sortByCreatedDesc(data);
               setImages(sorted);
-              await hydrateTopics(sorted, ignore);
+              await hydrateTopics(sorted, {}, ignore);
             }
           } catch {
             if (!ignore) setError("Görseller yüklenemedi.");
@@ -79,31 +123,6 @@ const MyImages = () => {
       }
     };
 
-    const hydrateTopics = async (imgs, ignoreFlag) => {
-      const topicIds = [
-        ...new Set((imgs || []).map((i) => i.topic_id).filter(Boolean)),
-      ];
-      if (topicIds.length === 0) return;
-      try {
-        const arr = await Promise.all(
-          topicIds.map((id) =>
-            api
-              .get(`/topics/${id}`)
-              .then((r) => r.data)
-              .then((d) => ({ id, name: d?.title || d?.name || "-" }))
-              .catch(() => ({ id, name: String(id) }))
-          )
-        );
-        if (!ignoreFlag) {
-          const map = {};
-          arr.forEach((t) => (map[t.id] = t.name));
-          setTopics(map);
-        }
-      } catch {
-        /* ignore */
-      }
-    };
-
     fetchImages();
     return () => {
       ignore = true;
@@ -265,6 +284,20 @@ const MyImages = () => {
             ))}
           </div>
         )}
+
+        {/* Filtre/arama yalnızca yüklenen sayfalara uygulanır; eşleşme yoksa da sonraki sayfa istenebilir */}
+        {!loading && nextCursor && (
+          <div className="text-center pt-4">
+            <button
+              type="button"
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="px-4 py-2 rounded-full border border-gray-300 font-semibold hover:bg-gray-100 transition disabled:opacity-50"
+            >
+              {loadingMore ? "Yükleniyor..." : "Daha fazla yükle"}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
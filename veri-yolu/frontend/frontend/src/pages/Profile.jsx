@@ -3,7 +3,7 @@ import { AuthContext } from "../context/AuthContext";
 import { useTranslation } from "react-i18next";
 import { useNavigate, useParams, useLocation } from "react-router-dom";
 import { FiEdit2 } from "react-icons/fi";
-import api from "../api/api";
+import api, { getPage } from "../api/api";
 import { FiMessageSquare } from "react-icons/fi";
 
 const Profile = () => {
@@ -27,6 +27,7 @@ const Profile = () => {
   const [userLoading, setUserLoading] = useState(!viewingSelf && !prefillUser);
 
   const [myImages, setMyImages] = useState([]);
+  const [imagesCursor, setImagesCursor] = useState(null); // sunucudaki sonraki sayfa
   const [imgLoading, setImgLoading] = useState(true);
   const [activeTab, setActiveTab] = useState("about");
 
@@ -47,6 +48,7 @@ const Profile = () => {
 
   // 🔹 KULLANICININ KONUŞMALARI
   const [myThreads, setMyThreads] = useState([]);
+  const [threadsCursor, setThreadsCursor] = useState(null);
   const [threadsLoading, setThreadsLoading] = useState(false);
   const [threadsError, setThreadsError] = useState("");
 
@@ -134,14 +136,13 @@ const Profile = () => {
     setImgLoading(true);
 
     const fetchImages = async () => {
+      setImagesCursor(null);
       try {
         if (viewingSelf) {
-          const me = await tryGet([
-            { url: "/images/me" },
-            { url: "/api/images/me" },
-          ]);
-          console.log("images(me) sonucu:", me?.config?.url, me?.data);
-          setMyImages(Array.isArray(me?.data) ? me.data : []);
+          // Sayfalı uç: ilk sayfa gelir, sonrakiler "Sonraki" ile istenir
+          const first = await getPage("/images/me");
+          setMyImages(first.data);
+          setImagesCursor(first.nextCursor);
         } else if (ownerUserId) {
           const res = await tryGet([
             { url: `/users/${ownerUserId}/images` },
@@ -180,6 +181,35 @@ const Profile = () => {
     fetchImages();
   }, [user, viewingSelf, ownerUserId]);
 
+  // Yerel son sayfadayken "Sonraki", sunucudan bir sonraki sayfayı ekleyip ona geçer
+  const nextImagesPage = async () => {
+    if (page < totalPages) return setPage(page + 1);
+    if (!imagesCursor) return;
+    try {
+      const more = await getPage("/images/me", imagesCursor);
+      setMyImages((prev) => [...prev, ...more.data]);
+      setImagesCursor(more.nextCursor);
+      if (more.data.length) setPage(page + 1);
+    } catch {
+      /* sessiz geç */
+    }
+  };
+
+  const nextThreadsPage = async () => {
+    if (threadsPage < threadsTotalPages) return setThreadsPage(threadsPage + 1);
+    if (!threadsCursor) return;
+    try {
+      const more = await getPage("/discussions/threads", threadsCursor, {
+        params: { author_id: Number(ownerUserId) },
+      });
+      setMyThreads((prev) => [...prev, ...more.data]);
+      setThreadsCursor(more.nextCursor);
+      if (more.data.length) setThreadsPage(threadsPage + 1);
+    } catch {
+      setThreadsError("Konuşmalar alınamadı.");
+    }
+  };
+
   // Aktif sekme değişince images'ta başa dön
   useEffect(() => {
     if (activeTab === "images") setPage(1);
@@ -268,41 +298,18 @@ const Profile = () => {
     const fetchMyThreads = async () => {
       setThreadsLoading(true);
       setThreadsError("");
+      setThreadsCursor(null);
       try {
-        const res = await api.get("/discussions/threads", {
+        // author_id süzmesi sunucuda yapılır; tüm konuşmaları indirip süzmeye gerek yok
+        const first = await getPage("/discussions/threads", null, {
           params: { author_id: Number(ownerUserId) },
         });
-        if (!ignore) setMyThreads(Array.isArray(res.data) ? res.data : []);
-
-        if (!ignore && (!res.data || res.data.length === 0)) {
-          try {
-            const all = await api.get("/discussions/threads");
-            if (!ignore) {
-              const mine = (all.data || []).filter(
-                (th) =>
-                  Number(th.author?.id) === Number(ownerUserId) ||
-                  Number(th.author_id) === Number(ownerUserId)
-              );
-              setMyThreads(mine);
-            }
-          } catch (err2) {
-            if (!ignore) setThreadsError("Konuşmalar alınamadı (fallback).");
-          }
+        if (!ignore) {
+          setMyThreads(first.data);
+          setThreadsCursor(first.nextCursor);
         }
       } catch (err) {
-        try {
-          const all = await api.get("/discussions/threads");
-          if (!ignore) {
-            const mine = (all.data || []).filter(
-              (th) =>
-                Number(th.author?.id) === Number(ownerUserId) ||
-                Number(th.author_id) === Number(ownerUserId)
-            );
-            setMyThreads(mine);
-          }
-        } catch (err2) {
-          if (!ignore) setThreadsError("Konuşmalar alınamadı.");
-        }
+        if (!ignore) setThreadsError("Konuşmalar alınamadı.");
       } finally {
         if (!ignore) setThreadsLoading(false);
       }
@@ -803,13 +810,12 @@ const Profile = () => {
                       </button>
                       <span className="text-sm text-gray-600">
                         Sayfa {page} / {totalPages}
+                        {imagesCursor ? "+" : ""}
                       </span>
                       <button
                         className="px-3 py-1 rounded-full border border-gray-300 bg-white hover:bg-gray-100 disabled:opacity-50"
-                        disabled={page === totalPages}
-                        onClick={() =>
-                          setPage((p) => Math.min(totalPages, p + 1))
-                        }
+                        disabled={page === totalPages && !imagesCursor}
+                        onClick={nextImagesPage}
                       >
                         Sonraki
                       </button>
@@ -900,15 +906,14 @@ const Profile = () => {
                       </button>
                       <span className="text-sm text-gray-600">
                         Sayfa {threadsPage} / {threadsTotalPages}
+                        {threadsCursor ? "+" : ""}
                       </span>
                       <button
                         className="px-3 py-1 rounded-full border border-gray-300 bg-white hover:bg-gray-100 disabled:opacity-50"
-                        disabled={threadsPage === threadsTotalPages}
-                        onClick={() =>
-                          setThreadsPage((p) =>
-                            Math.min(threadsTotalPages, p + 1)
-                          )
+                        disabled={
+                          threadsPage === threadsTotalPages && !threadsCursor
                         }
+                        onClick={nextThreadsPage}
                       >
                         Sonraki
                       </button>
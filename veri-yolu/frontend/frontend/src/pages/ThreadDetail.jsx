@@ -1,6 +1,6 @@
 import React, { useEffect, useState, useContext, useMemo, useRef } from "react";
 import { useParams, useNavigate } from "react-router-dom";
-import api from "../api/api";
+import api, { getAllPages } from "../api/api";
 import { AuthContext } from "../context/AuthContext";
 
 const ThreadDetail = () => {
@@ -74,7 +74,7 @@ const ThreadDetail = () => {
 
   const load = async () => {
     try {
-      const res = await api.get(`/discussions/threads/${threadId}/posts`);
+      const res = await getAllPages(`/discussions/threads/${threadId}/posts`);
       setPosts(res.data || []);
     } catch (err) {
       console.error("Postlar yüklenemedi:", err);
@@ -2,7 +2,7 @@
 import React, { useState, useEffect, useContext } from "react";
 import { useParams, Link, useNavigate, useLocation } from "react-router-dom";
 import { AuthContext } from "../context/AuthContext";
-import api from "../api/api";
+import api, { getPage } from "../api/api";
 import { saveAs } from "file-saver";
 import { useRef } from "react";
 
@@ -27,6 +27,7 @@ const TopicDetail = () => {
   const [selectedLabelingLoading, setSelectedLabelingLoading] = useState(false);
   const [selectedLabelingResult, setSelectedLabelingResult] = useState(null);
   const [topicThreads, setTopicThreads] = useState([]);
+  const [threadsCursor, setThreadsCursor] = useState(null);
   const [newTopicThreadTitle, setNewTopicThreadTitle] = useState("");
   const [newTopicThreadContent, setNewTopicThreadContent] = useState("");
   const [threadStatus, setThreadStatus] = useState(null);
@@ -83,10 +84,12 @@ const TopicDetail = () => {
     }
   };
 
-  const fetchTopicThreads = async () => {
+  // Konuşmalar sayfa sayfa yüklenir; cursor verilirse sonraki sayfa listeye eklenir
+  const fetchTopicThreads = async (cursor = null) => {
     try {
-      const res = await api.get(`/discussions/topic/${id}/threads`);
-      setTopicThreads(res.data || []);
+      const page = await getPage(`/discussions/topic/${id}/threads`, cursor);
+      setTopicThreads((prev) => (cursor ? [...prev, ...page.data] : page.data));
+      setThreadsCursor(page.nextCursor);
     } catch (err) {
       // silent
     }
@@ -211,7 +214,16 @@ const TopicDetail = () => {
     setAutoLabelResult(null);
     try {
       const res = await api.post(`/annotation/topic/${id}/auto_annotate`);
-      setAutoLabelResult({ success: true, count: res.data.results.length });
+      // Etiketleme arka plan işi olarak çalışır; bitene kadar durumu yokla
+      let job = res.data;
+      while (job.status === "queued" || job.status === "running") {
+        await new Promise((r) => setTimeout(r, 2000));
+        job = (await api.get(`/annotation/jobs/${job.job_id}`)).data;
+      }
+      if (job.status !== "completed") {
+        throw new Error(job.error || job.status);
+      }
+      setAutoLabelResult({ success: true, count: job.done });
       await fetchImages();
     } catch (err) {
       setAutoLabelResult({
@@ -990,6 +1002,16 @@ const TopicDetail = () => {
                 </div>
               )}
             </div>
+            {threadsCursor && (
+              <div className="text-center mt-4">
+                <button
+                  onClick={() => fetchTopicThreads(threadsCursor)}
+                  className="px-4 py-2 border border-gray-400 rounded-full font-semibold hover:bg-gray-100 cursor-pointer"
+                >
+                  Daha fazla yükle
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>